@@ -13,6 +13,7 @@ import sys
 from structure.base import Base
 from simulator.simulator import Simulator
 from simulator.time import compute_time
+from simulator.watchdog import Watchdog
 from physics.stairs import Stair
 import readXML
 
@@ -44,7 +45,10 @@ structure = Base(structure_size, wheels_radius, stair)  # , check_max_size)
 # Read simulator data.
 dynamics_data, sample_data = readXML.read_dynamics(settings_name)
 simulator = Simulator(dynamics_data, sample_data)
+# Read the limits of the computation (optional).
+limits = readXML.read_limits(settings_name)
+watchdog = None if limits is None else Watchdog(**limits)
 
-total_time = compute_time(structure, simulator)
+total_time = compute_time(structure, simulator, watchdog=watchdog)
 
 print("Total:", total_time, "seconds")
@@ -0,0 +1,54 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to compute the time to cross a set of stairs for the structure given
+in the settings file, using all the cpus (see simulator.suite).
+
+The structure and dynamics are read from the settings file. The stairs are
+read from the rest of xml files given (the stairs tag, see settings.xml), or
+the default suite is used if no file is given.
+
+Examples:
+    python evaluate_suite.py settings.xml
+    python evaluate_suite.py settings.xml up.xml down.xml double.xml
+
+"""
+
+import argparse
+
+from simulator.suite import evaluate_suite
+import readXML
+
+parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[2])
+parser.add_argument("settings", nargs="?", default="settings.xml")
+parser.add_argument("stairs", nargs="*", help="xml files with the stairs")
+parser.add_argument("--workers", type=int, default=None,
+                    help="Number of processes (default: all the cpus)")
+args = parser.parse_args()
+
+# Read the design.
+__, structure_size, wheels_radius = readXML.read_structure(args.settings)
+design = dict(structure_size)
+design.update(wheels_radius)
+# Read simulator data.
+dynamics_data, sample_data = readXML.read_dynamics(args.settings)
+# Read stairs data.
+suite = None
+if args.stairs:
+    suite = {name: readXML.read_stairs(name) for name in args.stairs}
+
+results = evaluate_suite(design, dynamics_data, sample_data, suite,
+                         args.workers)
+for name, total_time in results['times'].items():
+    if total_time is None:
+        print(name, "Failed:", results['errors'][name])
+    else:
+        print(name, "Total:", total_time, "seconds")
+print("Crossed: %i of %i" % (results['feasible'], len(results['times'])))
+print("Worst:", results['worst'], "Mean:", results['mean'])
+
+###############################################################################
+# End of file.
+###############################################################################
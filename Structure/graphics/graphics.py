@@ -13,6 +13,7 @@ import cv2
 import os
 
 from graphics.plots import Plots
+from graphics.writers import frame_writer, AsyncWriter, BufferPool
 
 
 class Graphics:
@@ -43,6 +44,17 @@ class Graphics:
                 the sequence displayed on screen.
             units -- String with the name of the dimension units, for instance,
                 m, cm, mm, ...
+            video_file -- If not None, encode the images in a video file with
+                this name (inside video_dir, and inside the composition
+                directory for the composited video), instead of saving an
+                image sequence. If the video can not be encoded, the image
+                sequence is saved.
+            codec -- FourCC code of the video codec (for instance, mp4v).
+            fps -- Frame rate of the video. If None, it is computed from the
+                sample time, so that the video plays in real time.
+            queue_size -- Number of images and csv rows that can be waiting
+                to be saved in a background thread. If 0, the data is saved
+                when generated, in this thread.
 
         """
         self.sample_time = sample_data['sample_time']
@@ -53,6 +65,9 @@ class Graphics:
         # Create image.
         size = img_data['size']
         self.image = numpy.full((size[0], size[1], 3), 0xFF, numpy.uint8)
+        # Image with the stairs, and the values used to draw it (see draw).
+        self.background = None
+        self.background_key = None
         # OpenCV antialiased line parameter (see OpenCV line() function)
         self.shift = 3      # Number of fractional bits.
         self.scale = img_data['scale']
@@ -69,56 +84,56 @@ class Graphics:
 
         # Frame counter.
         # self.counter = 0
+        # Check whether we also have to generate the composited image, that
+        # is, the image of the structure plus the state of the actuators.
+        if video_data['composition'] is not None:
+            self.save_composition = True
+            # Generate the image where the program is going to compose
+            # the image. The image must be doble in both dimensions (see
+            # images layout).
+            self.composite_image = numpy.full(
+                (2 * size[0], 2 * size[1], 3), 0xFF, numpy.uint8)
+            # Variables to compute images offsets relative to the
+            # composited image.
+            # NOTE: If the height is even, one row of the strucuture
+            # image is lost, but this is not unimportant. However, try to
+            # image size to an odd number in both directions, since this
+            # is the common.
+            h = size[0] // 2
+            w = size[1]
+            # Build RoIs (OpenCV rectangular region of interest) where
+            # each graph must be placed (see image layout).
+            self.RoI = {
+                "video": (slice(0, size[0], 1), slice(0, size[1], 1)),
+                "ac_L1": (slice(1 * 0, 1 * h, 1), slice(1 * w, 2 * w, 1)),
+                "ac_L2": (slice(1 * h, 2 * h, 1), slice(1 * w, 2 * w, 1)),
+                "ac_L3": (slice(2 * h, 3 * h, 1), slice(1 * w, 2 * w, 1)),
+                "ac_L4": (slice(3 * h, 4 * h, 1), slice(1 * w, 2 * w, 1)),
+                "vel_0": (slice(2 * h, 3 * h, 1), slice(1 * 0, 1 * w, 1)),
+                "incli": (slice(3 * h, 4 * h, 1), slice(1 * 0, 1 * w, 1))
+            }
+            self.plots = Plots((w, h), video_data["buffer_size"],
+                               video_data["units"], axis)
+        else:
+            self.save_composition = False
         if video_data['video_dir'] is not None:
-            # If an image sequence need to be created:
-            # Create directory:
+            # If an image sequence or video need to be created:
             self.video_dir = video_data['video_dir']
-            try:
-                os.makedirs(self.video_dir)
-            except FileExistsError:
-                # If the directory already exits, do nothing.
-                pass
+            fps = video_data.get('fps')
+            if fps is None:
+                fps = 1.0 / self.sample_time
+            video_args = (video_data.get('video_file'),
+                          video_data.get('codec', 'mp4v'), fps)
+            self.video = frame_writer(self.video_dir, *video_args, size)
             self.save_video = True
-            # Check whether we also have to save the composited video, that
-            # is, the image of the structure plus the state of the actuators.
-            if video_data['composition'] is not None:
+            if self.save_composition:
                 self.dir_comp = os.path.join(
                     self.video_dir, video_data['composition'])
-                try:
-                    os.makedirs(self.dir_comp)
-                except FileExistsError:
-                    # If the directory already exits, do nothing.
-                    pass
-                self.save_composition = True
-                # Generate the image where the program is going to compose
-                # the image. The image must be doble in both dimensions (see
-                # images layout).
-                self.composite_image = numpy.full(
-                    (2 * size[0], 2 * size[1], 3), 0xFF, numpy.uint8)
-                # Variables to compute images offsets relative to the
-                # composited image.
-                # NOTE: If the height is even, one row of the strucuture
-                # image is lost, but this is not unimportant. However, try to
-                # image size to an odd number in both directions, since this
-                # is the common.
-                h = size[0] // 2
-                w = size[1]
-                # Build RoIs (OpenCV rectangular region of interest) where
-                # each graph must be placed (see image layout).
-                self.RoI = {
-                    "video": (slice(0, size[0], 1), slice(0, size[1], 1)),
-                    "ac_L1": (slice(1 * 0, 1 * h, 1), slice(1 * w, 2 * w, 1)),
-                    "ac_L2": (slice(1 * h, 2 * h, 1), slice(1 * w, 2 * w, 1)),
-                    "ac_L3": (slice(2 * h, 3 * h, 1), slice(1 * w, 2 * w, 1)),
-                    "ac_L4": (slice(3 * h, 4 * h, 1), slice(1 * w, 2 * w, 1)),
-                    "vel_0": (slice(2 * h, 3 * h, 1), slice(1 * 0, 1 * w, 1)),
-                    "incli": (slice(3 * h, 4 * h, 1), slice(1 * 0, 1 * w, 1))
-                }
-                self.plots = Plots((w, h), video_data["buffer_size"],
-                                   video_data["units"], axis)
-            else:
-                self.save_composition = False
+                self.composite_video = frame_writer(
+                    self.dir_comp, *video_args, self.composite_image.shape)
         else:
+            # The images are not saved, but they can still be generated
+            # (see draw_image and compose).
             self.save_video = False
 
         # Configure files to save data to csv files.
@@ -143,6 +158,41 @@ class Graphics:
         else:
             self.save_csv = False
 
+        # Save the images and csv files in a background thread (see
+        # graphics.writers).
+        queue_size = video_data.get('queue_size', 0)
+        self.writer = None
+        self.frames = None
+        self.composites = None
+        if queue_size > 0 and (self.save_video or self.save_csv):
+            self.writer = AsyncWriter(queue_size)
+            if self.save_video:
+                # Three buffers, so that one image can be drawn while the
+                # previous one is being saved and other one is waiting.
+                self.frames = BufferPool(self.image.shape, 3, self.writer)
+                if self.save_composition:
+                    self.composites = BufferPool(
+                        self.composite_image.shape, 3, self.writer)
+
+    def write_csv(self, current_time, values):
+        """Write one row in each csv file."""
+        for f, v in zip(self.csv_files, values):
+            f.write("%0.10f, %.10f\n" % (current_time, v))
+
+    def write_frame(self, image, composite_image, counter):
+        """Save the image and the composited image (if not None)."""
+        try:
+            self.video.write(image, counter)
+            if composite_image is not None:
+                self.composite_video.write(composite_image, counter)
+        finally:
+            # Return the buffers to the pools, if used, even if saving the
+            # images fails.
+            if self.frames is not None:
+                self.frames.release(image)
+            if self.composites is not None:
+                self.composites.release(composite_image)
+
     def set_manual_mode(self):
         """Set to manual mode, so the user can move the structure manually."""
         self.manual_mode = True
@@ -152,25 +202,20 @@ class Graphics:
             # Raise an error to warm the calling function.
             raise ValueError
 
-    def draw(self, stairs, structure, counter, pause=False):
-        """Generate an image of the actual elements.
+    def draw_image(self, stairs, structure, counter):
+        """Draw the stairs and the structure in the image.
 
-        If the object was configured with display set to True, the program can
-        be paused with the Space key.
-        If video was set to a directory, a video image sequence will be created
-        in this directory.
-        Return False is the user press the key to finish the program (escape).
-        Return also the key pressed.
+        The image is neither displayed nor saved (see draw). Return the image,
+        that is only valid until the next call to this function.
 
         Arguments:
         stairs, structure -- Elements to draw.
-        pause -- If True, and display is True, the program pause until the user
-            press a Key. If False, an internal variable check whether to pause
-            or not.
+        counter -- Number of the sample, to print the current time.
 
         """
-        # Clear the image to white.
-        self.image[:] = 0xFF
+        if self.frames is not None:
+            # Draw in a buffer not used by the writer.
+            self.image = self.frames.get()
         # If global scale is not given, compute the scale to fix the whole
         # system into the window.
         if self.scale is None:
@@ -187,8 +232,17 @@ class Graphics:
         origin = (self.image.shape[0] + self.origin) / (2 * self.scale)
         total_height = structure.HEIGHT + stairs.height()
         origin += total_height / 2
-        # Draw the stairs.
-        stairs.draw((0, origin), self.image, aa_scale, self.shift)
+        # The stairs does not change from one image to the next one, so it is
+        # drawn only once in a background image, and copied to each image.
+        # The background is drawn again only if the stairs, the scale, the
+        # position or the size of the image change.
+        background_key = (stairs, aa_scale, origin, self.image.shape)
+        if background_key != self.background_key:
+            self.background = numpy.full(self.image.shape, 0xFF, numpy.uint8)
+            stairs.draw((0, origin), self.background, aa_scale, self.shift)
+            self.background_key = background_key
+        # Clear the image, and draw the stairs.
+        numpy.copyto(self.image, self.background)
         # Draw the structure.
         structure.draw((0, origin), self.image, aa_scale, self.shift)
         # structure.draw_wheel_trajectory(
@@ -198,6 +252,52 @@ class Graphics:
         print_time = "%8.2f %s" % (current_time, self.time_units)
         cv2.putText(self.image, print_time,
                     (20, self.image.shape[0] - 30), 1, 5, 0x00, 4)
+        return self.image
+
+    def compose(self, values, counter):
+        """Compose the image of the structure with the plots of the signals.
+
+        The image of the structure must be drawn before (see draw_image).
+        Return the composited image, that is only valid until the next call
+        to this function.
+
+        Arguments:
+        values -- The six signals to plot (see Plots).
+        counter -- Number of the sample.
+
+        """
+        # Generate the rest of the graphics.
+        figs = self.plots.save_data(values, counter, self.sample_time)
+        if self.composites is not None:
+            self.composite_image = self.composites.get()
+        self.composite_image[self.RoI['video']] = self.image
+        self.composite_image[self.RoI['ac_L1']] = figs[0]
+        self.composite_image[self.RoI['ac_L2']] = figs[1]
+        self.composite_image[self.RoI['ac_L3']] = figs[2]
+        self.composite_image[self.RoI['ac_L4']] = figs[3]
+        self.composite_image[self.RoI['vel_0']] = figs[4]
+        self.composite_image[self.RoI['incli']] = figs[5]
+        return self.composite_image
+
+    def draw(self, stairs, structure, counter, pause=False):
+        """Generate an image of the actual elements.
+
+        If the object was configured with display set to True, the program can
+        be paused with the Space key.
+        If video was set to a directory, a video image sequence will be created
+        in this directory.
+        Return False is the user press the key to finish the program (escape).
+        Return also the key pressed.
+
+        Arguments:
+        stairs, structure -- Elements to draw.
+        pause -- If True, and display is True, the program pause until the user
+            press a Key. If False, an internal variable check whether to pause
+            or not.
+
+        """
+        self.draw_image(stairs, structure, counter)
+        current_time = counter * self.sample_time
         c = 0
         if self.display:
             # If in manual mode, draw a red rim around the image frame.
@@ -267,30 +367,42 @@ class Graphics:
         values.append(speed2)
         values.append(speed3)
         if self.save_csv:
-            for f, v in zip(self.csv_files, values):
-                f.write("%0.10f, %.10f\n" % (current_time, v))
+            if self.writer is None:
+                self.write_csv(current_time, values)
+            else:
+                self.writer.submit(self.write_csv, current_time, values)
 
         if self.save_video:
-            # Save image in the image sequence directory.
-            # Generate image name.
-            aux_name = "image%05i.png" % counter
-            image_name = os.path.join(self.video_dir, aux_name)
-            cv2.imwrite(image_name, self.image)
+            composite_image = None
             if self.save_composition:
-                # Generate the rest of the graphics.
-                figs = self.plots.save_data(
-                    values[0:6], counter, self.sample_time)
-                self.composite_image[self.RoI['video']] = self.image
-                self.composite_image[self.RoI['ac_L1']] = figs[0]
-                self.composite_image[self.RoI['ac_L2']] = figs[1]
-                self.composite_image[self.RoI['ac_L3']] = figs[2]
-                self.composite_image[self.RoI['ac_L4']] = figs[3]
-                self.composite_image[self.RoI['vel_0']] = figs[4]
-                self.composite_image[self.RoI['incli']] = figs[5]
-                composite_name = os.path.join(self.dir_comp, aux_name)
-                cv2.imwrite(composite_name, self.composite_image)
+                composite_image = self.compose(values[0:6], counter)
+            # Save image in the image sequence or video.
+            if self.writer is None:
+                self.write_frame(self.image, composite_image, counter)
+            else:
+                self.writer.submit(self.write_frame, self.image,
+                                   composite_image, counter)
         return True, c
 
+    def close(self):
+        """Finish the video files, and close the csv files.
+
+        The files are closed even if saving the last data fails, so that the
+        video files are not left incomplete.
+        """
+        try:
+            if self.writer is not None:
+                # Wait for all the data to be saved.
+                self.writer.close()
+        finally:
+            if self.save_video:
+                self.video.close()
+                if self.save_composition:
+                    self.composite_video.close()
+            if self.save_csv:
+                for f in self.csv_files:
+                    f.close()
+
 ###############################################################################
 # End of file.
 ###############################################################################
@@ -14,12 +14,16 @@ variables, in this order:
 4 - Inclination of the structure.
 5 - Structure velocity.
 
+The figures are created only once, and for each new sample, only the data
+of the lines and the limits of the time axis are changed. The figures are
+rendered directly into an image buffer (matplotlib Agg canvas), so that they
+are not encoded and decoded again for each sample.
+
 """
 
-import io
 import numpy
-import cv2
-import matplotlib.pyplot as plt
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 
 
 class Plots():
@@ -63,6 +67,23 @@ class Plots():
             "Inclination (" + units + ")",
             "Velocity (" + units + "/s)"
         ]
+        # Create the figures, with all the elements that do not change from
+        # one sample to the next one.
+        self.canvases = []
+        self.axes = []
+        self.lines = []
+        for text, limits in zip(self.texts, self.axis):
+            figure = Figure(figsize=(size[0] / 100, size[1] / 100), dpi=100)
+            canvas = FigureCanvasAgg(figure)
+            ax = figure.add_subplot()
+            line, = ax.plot(self.sample_index, self.data[0], 'b')
+            ax.set_title(text)
+            ax.set_ylim(limits)
+            ax.grid(True)
+            figure.subplots_adjust(left=0.05, right=0.95, top=0.9, bottom=0.1)
+            self.canvases.append(canvas)
+            self.axes.append(ax)
+            self.lines.append(line)
 
     def save_data(self, values, counter, sample_time):
         """Generate a plot for the six signals.
@@ -72,7 +93,19 @@ class Plots():
           The order must be the same as specified above.
 
         Return a list of six figures, each one is a plot of one of the
-        variables.
+        variables. NOTE: The images share the memory with the figures, so
+        they are only valid until the next call to this function.
+
+        """
+        self.add_data(values, counter)
+        return self.render(counter, sample_time)
+
+    def add_data(self, values, counter):
+        """Add a new sample to the signals, without plotting them.
+
+        This is used to fill the signal buffer with the samples previous to
+        the first one plotted, when the plots do not start at the beginning
+        of the simulation (see graphics.render).
 
         """
         # Variable to index the time axis.
@@ -89,6 +122,14 @@ class Plots():
         # axis is the corect one (the value of the time at the rightmost
         # sample on the plots are the current tiem.
         self.sample_index[position] = counter
+
+    def render(self, counter, sample_time):
+        """Plot the signals, being counter the last sample added.
+
+        Return the list of six figures (see save_data).
+
+        """
+        position = counter % self.data.shape[1]
         # Set the axis limits for the time.
         time_axis = [sample_time * (counter - len(self.sample_index) + 1),
                      sample_time * counter]
@@ -98,32 +139,15 @@ class Plots():
              sample_time * self.sample_index[:position + 1]))
         # Generate a list of figures, which are the figures to return.
         figs = []
-        # print("-----------------------------------------------------------")
-        # print(numpy.hstack((self.sample_index[counter+1:],
-        # self.sample_index[:counter+1])))
-        # For each signal, generate its corresponding figure.
-        for signal, text, axis in zip(self.data, self.texts, self.axis):
-            # Plot the figure. Do not forget to set:
-            # matplotlib.use('Agg')
-            # Otherwise, matplotlib can not generate plots that can be
-            # converted to images.
-            plt.figure(figsize=(self.size[0] / 100,
-                                self.size[1] / 100), dpi=100)
-            plt.plot(time_signal, numpy.hstack(
-                    (signal[position + 1:], signal[:position + 1])), 'b')
-            plt.title(text)
-            plt.axis(time_axis + axis)
-            plt.grid(True)
-            plt.subplots_adjust(left=0.05, right=0.95, top=0.9, bottom=0.1)
-            # Convert the matplotlib plot to a opencv image (copied from the
-            # matplotlib web).
-            buf = io.BytesIO()
-            plt.savefig(buf, format="png")
-            plt.close()
-            buf.seek(0)
-            img_arr = numpy.frombuffer(buf.getvalue(), dtype=numpy.uint8)
-            buf.close()
-            img = cv2.imdecode(img_arr, 1)
-            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+        # For each signal, update its corresponding figure.
+        for signal, canvas, ax, line in zip(
+                self.data, self.canvases, self.axes, self.lines):
+            line.set_data(time_signal, numpy.hstack(
+                (signal[position + 1:], signal[:position + 1])))
+            ax.set_xlim(time_axis)
+            canvas.draw()
+            # NOTE: The image is in RGB order (as it was when converting the
+            # plot from a png file).
+            img = numpy.asarray(canvas.buffer_rgba())[:, :, :3]
             figs.append(img)
         return figs
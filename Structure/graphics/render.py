@@ -0,0 +1,206 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to generate the video of a simulation recorded without graphics (see
+simulator.recorder), using a pool of processes.
+
+Each image only depends on the position of the structure in its sample, so
+the samples are split in blocks of consecutive samples, and each process
+draws a complete block. The only exception are the plots of the composited
+image, that show the last samples of the signals: before drawing a block, the
+process adds to the plots the samples previous to the block (see
+Plots.add_data), without plotting them, so that the images are the same as
+the ones generated during the simulation (see Graphics.draw).
+
+If the images are saved as an image sequence, each process saves its own
+images. If they are encoded in a video file, the processes return the images,
+and they are added to the video in order in the main process.
+
+"""
+
+import multiprocessing
+import os
+
+import numpy
+
+from physics.stairs import Stair
+from structure.base import Base
+from graphics.graphics import Graphics
+from graphics.writers import frame_writer, ImageSequence
+
+# Number of consecutive samples drawn by a process at once.
+BLOCK_SIZE = 16
+
+
+def load_recording(file_name):
+    """Read the data saved by Recorder.save.
+
+    Arguments:
+    file_name -- Name of the .npz file, or of the directory with one .npy
+      file for each array. In this case, the arrays are not read completely,
+      but mapped in memory.
+    """
+    if os.path.isdir(file_name):
+        return {name[:-4]: numpy.load(os.path.join(file_name, name),
+                                      mmap_mode='r')
+                for name in os.listdir(file_name) if name.endswith(".npy")}
+    with numpy.load(file_name) as data:
+        return dict(data)
+
+
+###############################################################################
+# Functions run in the processes of the pool.
+###############################################################################
+# Data common to all the blocks, created once for each process.
+_worker_data = {}
+
+
+def _init_worker(recording, stairs_list, landing, structure_size,
+                 wheels_radius, image_data, video_data, sample_data, axis,
+                 directories):
+    data = load_recording(recording)
+    sample_time = sample_data['sample_time']
+    _worker_data['counter'] = numpy.rint(
+        data['time'] / sample_time).astype(numpy.int64)
+    _worker_data['pose'] = data['pose']
+    _worker_data['actuators'] = data['actuators']
+    # Signals of the plots (see Graphics.draw): the five actuators and the
+    # speed of the rear wheel.
+    _worker_data['values'] = numpy.hstack(
+        (data['actuators'], data['speeds'][:, 0:1]))
+    stair = Stair(stairs_list, landing)
+    _worker_data['stair'] = stair
+    _worker_data['structure'] = Base(structure_size, wheels_radius, stair)
+    # The graphics object only draws the images. They are saved here (see
+    # _render), or in the main process.
+    graphics_data = dict(video_data, video_dir=None, display=False,
+                         queue_size=0)
+    _worker_data['graphics'] = Graphics(image_data, graphics_data,
+                                        {'csv_dir': None}, sample_data, axis)
+    # Image sequences saved directly by the process (None if the images are
+    # returned to the main process).
+    _worker_data['writers'] = [
+        None if directory is None else ImageSequence(directory)
+        for directory in directories]
+
+
+def _render(block):
+    start, stop = block
+    counter = _worker_data['counter']
+    values = _worker_data['values']
+    stair = _worker_data['stair']
+    structure = _worker_data['structure']
+    graphics = _worker_data['graphics']
+    video, composite_video = _worker_data['writers']
+    if graphics.save_composition:
+        # Add to the plots the samples shown before the first one of the
+        # block.
+        buffer_len = graphics.plots.data.shape[1]
+        for k in range(max(0, start - buffer_len), start):
+            graphics.plots.add_data(values[k], counter[k])
+    frames = []
+    for k in range(start, stop):
+        structure.set_state(_worker_data['pose'][k],
+                            _worker_data['actuators'][k, 0:4])
+        image = graphics.draw_image(stair, structure, counter[k])
+        composite_image = None
+        if graphics.save_composition:
+            composite_image = graphics.compose(values[k], counter[k])
+        # The images are reused for the next sample, so they are copied if
+        # they have to be returned.
+        if video is None:
+            image = image.copy()
+        else:
+            video.write(image, counter[k])
+            image = None
+        if composite_image is not None:
+            if composite_video is None:
+                composite_image = composite_image.copy()
+            else:
+                composite_video.write(composite_image, counter[k])
+                composite_image = None
+        frames.append((counter[k], image, composite_image))
+    return frames
+###############################################################################
+
+
+def render(recording, stairs_list, landing, structure_size, wheels_radius,
+           image_data, video_data, sample_data, axis, workers=None,
+           block_size=BLOCK_SIZE):
+    """Generate the images of a recorded simulation.
+
+    Arguments:
+    recording -- Name of the file saved by Recorder.save (see
+      load_recording).
+    stairs_list, landing -- Stair definition (see Stair).
+    structure_size, wheels_radius -- Dimensions of the structure (see Base).
+      They must be the same as the ones used in the simulation.
+    image_data, video_data, sample_data, axis -- See Graphics. The images are
+      saved in the video directory (required), but they are never displayed.
+      The csv files are not written, since the recording already has the
+      same data.
+    workers -- Number of processes. If None, use all the cpus. If 1, the
+      images are drawn in this process.
+    block_size -- Number of consecutive samples drawn by a process at once.
+
+    Return the number of images generated.
+    """
+    video_dir = video_data['video_dir']
+    if video_dir is None:
+        raise ValueError("A directory is needed to save the images.")
+    samples = len(load_recording(recording)['time'])
+    # Create the video files here, so that the images are encoded in order.
+    fps = video_data.get('fps')
+    if fps is None:
+        fps = 1.0 / sample_data['sample_time']
+    video_args = (video_data.get('video_file'),
+                  video_data.get('codec', 'mp4v'), fps)
+    size = image_data['size']
+    writers = [frame_writer(video_dir, *video_args, size)]
+    directories = [video_dir]
+    if video_data['composition'] is not None:
+        comp_dir = os.path.join(video_dir, video_data['composition'])
+        writers.append(frame_writer(comp_dir, *video_args,
+                                    (2 * size[0], 2 * size[1], 3)))
+        directories.append(comp_dir)
+    else:
+        writers.append(None)
+        directories.append(None)
+    # The image sequences are saved by the processes.
+    directories = [d if isinstance(w, ImageSequence) else None
+                   for d, w in zip(directories, writers)]
+    init_data = (recording, stairs_list, landing, structure_size,
+                 wheels_radius, image_data, video_data, sample_data, axis,
+                 directories)
+    blocks = [(start, min(start + block_size, samples))
+              for start in range(0, samples, block_size)]
+    if workers == 1:
+        pool = None
+        _init_worker(*init_data)
+        results = map(_render, blocks)
+    else:
+        pool = multiprocessing.Pool(workers, _init_worker, init_data)
+        # The blocks are returned in order.
+        results = pool.imap(_render, blocks)
+    images = 0
+    try:
+        for frames in results:
+            for counter, image, composite_image in frames:
+                if image is not None:
+                    writers[0].write(image, counter)
+                if composite_image is not None:
+                    writers[1].write(composite_image, counter)
+                images += 1
+    finally:
+        if pool is not None:
+            pool.terminate()
+        for writer in writers:
+            if writer is not None:
+                writer.close()
+    return images
+
+###############################################################################
+# End of file.
+###############################################################################
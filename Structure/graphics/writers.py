@@ -0,0 +1,192 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to save the images generated by the graphics module, either as an
+image sequence (one png file for each image) or as a single video file,
+encoded with OpenCV.
+
+The images and the csv data can be saved in a background thread (see
+AsyncWriter), so that the simulation and the drawing of the next image do not
+wait for the compression of the images and the disk. The images are not
+copied: the graphics module draws each image in a buffer taken from a
+BufferPool, and the buffer is returned to the pool once the image is saved.
+
+"""
+
+import os
+import queue
+import threading
+
+import numpy
+import cv2
+
+
+class ImageSequence:
+    """Save each image in a png file."""
+
+    def __init__(self, directory):
+        """Constructor:
+
+        Arguments:
+        directory -- Directory where the images are saved. If it does not
+          exist, it is created.
+        """
+        self.directory = directory
+        try:
+            os.makedirs(self.directory)
+        except FileExistsError:
+            # If the directory already exits, do nothing.
+            pass
+
+    def write(self, image, counter):
+        """Save an image, with the counter in the name of the file."""
+        image_name = os.path.join(self.directory, "image%05i.png" % counter)
+        cv2.imwrite(image_name, image)
+
+    def close(self):
+        pass
+
+
+class VideoFile:
+    """Encode all the images in a video file."""
+
+    def __init__(self, file_name, codec, fps, size):
+        """Constructor:
+
+        Arguments:
+        file_name -- Name of the video file. The container is chosen from the
+          extension of the file (avi, mp4, ...).
+        codec -- FourCC code of the codec (for instance, mp4v or MJPG).
+        fps -- Frame rate of the video.
+        size -- Size of the images (height, width).
+
+        Raises a ValueError exception if OpenCV can not encode the video (for
+        instance, if the codec is not available).
+        """
+        directory = os.path.dirname(file_name)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.writer = cv2.VideoWriter(
+            file_name, cv2.VideoWriter_fourcc(*codec), fps,
+            (size[1], size[0]))
+        if not self.writer.isOpened():
+            raise ValueError("Can not create video file " + file_name)
+
+    def write(self, image, counter):
+        """Add an image to the video (the counter is not used)."""
+        self.writer.write(image)
+
+    def close(self):
+        self.writer.release()
+
+
+class BufferPool:
+    """Set of image buffers shared between the drawing and the writer."""
+
+    def __init__(self, shape, count, writer=None):
+        """Constructor:
+
+        Arguments:
+        shape -- Shape of the images.
+        count -- Number of buffers (at least 2, so that one image can be drawn
+          while the previous one is saved).
+        writer -- AsyncWriter that releases the buffers. If it fails, get
+          raises its error instead of waiting for a buffer that may never be
+          released.
+        """
+        self.free = queue.Queue()
+        self.writer = writer
+        for __ in range(count):
+            self.free.put(numpy.full(shape, 0xFF, numpy.uint8))
+
+    def get(self):
+        """Return a free buffer (wait until one is released if none)."""
+        if self.writer is None:
+            return self.free.get()
+        while True:
+            if self.writer.error is not None:
+                raise self.writer.error
+            try:
+                return self.free.get(timeout=0.1)
+            except queue.Empty:
+                pass
+
+    def release(self, buffer):
+        """Return a buffer to the pool, once it is not needed any more."""
+        self.free.put(buffer)
+
+
+class AsyncWriter:
+    """Run the writing functions in a background thread, in order."""
+
+    def __init__(self, queue_size):
+        """Constructor:
+
+        Arguments:
+        queue_size -- Maximum number of writing functions waiting. When the
+          queue is full, submit waits, so that the program does not go on
+          generating data faster than it can be saved.
+        """
+        self.jobs = queue.Queue(queue_size)
+        # First error raised in the thread (see submit).
+        self.error = None
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, function, *args):
+        """Call the function in the background thread.
+
+        If a previous function has failed, raise its exception here.
+        """
+        if self.error is not None:
+            raise self.error
+        self.jobs.put((function, args))
+
+    def run(self):
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            function, args = job
+            try:
+                function(*args)
+            except Exception as error:
+                # Keep on emptying the queue, so that submit does not wait
+                # forever. The error is raised in the main thread.
+                if self.error is None:
+                    self.error = error
+
+    def close(self):
+        """Wait until all the data is saved, and finish the thread."""
+        self.jobs.put(None)
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+def frame_writer(directory, video_file, codec, fps, size):
+    """Create the object to save the images.
+
+    Arguments:
+    directory -- Directory where the images are saved.
+    video_file -- If None, the images are saved as an image sequence.
+      Otherwise, name of the video file (inside the directory) where the
+      images are encoded.
+    codec, fps, size -- See VideoFile.
+
+    If the video file can not be created, the images are saved as an image
+    sequence.
+    """
+    if video_file is not None:
+        try:
+            return VideoFile(os.path.join(directory, video_file), codec, fps,
+                             size)
+        except ValueError as error:
+            print(error, "Saving image sequence instead.")
+    return ImageSequence(directory)
+
+###############################################################################
+# End of file.
+###############################################################################
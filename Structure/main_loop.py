@@ -5,6 +5,7 @@ Created on 28 ene. 2021
 
 """
 
+from contextlib import nullcontext
 import sys
 
 import readXML
@@ -13,6 +14,7 @@ from structure import base
 from simulator.simulator import Simulator, SimulatorState
 from graphics.graphics import Graphics
 from simulator import control
+from simulator.watchdog import Watchdog, EvaluationStalled
 
 
 # Open and check settings file.
@@ -43,6 +45,10 @@ graphics = Graphics(image_data, video_data, csv_data, sample_data, axis)
 debug = {'graphics': graphics, 'simulator': sm}
 # debug = None
 structure = base.Base(structure_size, wheels_radius, stairs)  # , debug=debug)
+# Limits of the computation of each instruction in automatic mode (optional).
+limits = readXML.read_limits(settings_name)
+if limits is not None:
+    structure.watchdog = Watchdog(**limits)
 
 # instruction = {
 #     'wheel': 3, 'height': -120, 'advance': 300}
@@ -65,85 +71,102 @@ structure = base.Base(structure_size, wheels_radius, stairs)  # , debug=debug)
 # sm.simulate_instruction(structure, instruction)
 
 
-# Draw initial state of the structure.
-continue_loop, key_pressed = graphics.draw(stairs, structure, sm.counter)
-# Continue_loop is a flag to help finish the program. It gets False value when
-# the user press the Esc key (see graphics module).
-# Main loop
-instruction_number = 0
+# Close the video and csv files even if the program fails, so that the
+# images and data saved up to the failure are not lost.
+try:
+    # Draw initial state of the structure.
+    continue_loop, key_pressed = graphics.draw(stairs, structure, sm.counter)
+    # Continue_loop is a flag to help finish the program. It gets False value
+    # when the user press the Esc key (see graphics module).
+    # Main loop
+    instruction_number = 0
 
-while continue_loop:
-    if graphics.manual_mode:
-        # In manual mode, wait for the user to press a instruction.
-        continue_loop, key_pressed = graphics.draw(
-            stairs, structure, sm.counter)
-        instruction = control.manual_control(key_pressed, sm)
-        str_aux = structure
-        sm.simulate_instruction(structure, instruction)
-    else:
-        # Compute instruction:
-        # Compute the next instruction.
-        instruction, str_aux = control.next_instruction(structure)
-        if instruction is None:
-            try:
-                graphics.set_manual_mode()
-            except ValueError:
-                # If the graphics can not be set in manual mode (normally
-                # because we are not displaying images), finish the loop.
-                continue_loop = False
-            continue
-        stop_lentgh = sm.stop_distance(instruction)
-        next_instructions = control.compute_distance(str_aux, stop_lentgh)
-        # Compute and initial estimation of the time requirede to
-        # complete the instruction, and if dynamics is implemented,
-        # compute the instructions that the structure has to suposedly
-        # complete until the structure stop. This is only to check
-        # for collisions when computing the actual profile for the
-        # horizontal motion (if needed).
-        # Compute the actual time required to complete the instruction.
-        sm.compute_time(instruction, next_instructions)
-        # Simulate instruction:
-        instruction_number += 1
-        print(instruction_number, instruction)
-        for res in sm.simulate_step(structure, instruction):
-            if res == SimulatorState.SimulatorError:
-                # The simulation has failed: Set to manual mode, to let the
-                # user check the situation.
-                graphics.set_manual_mode()
-                graphics.draw(stairs, structure, sm, True)
-                # Finish the outermost loop.
-                # continue_loop = False
-                break
-            # The simulation has succeeded, so, continue loop.
-            # elif res == SimulatorState.SimulatorNoIter:
-            #     break
-            continue_loop, key_pressed = \
-                graphics.draw(stairs, structure, sm.counter)
-            if not continue_loop or graphics.manual_mode:
-                # The user has pressed the Esc key to finish the program.
-                # Entering manual mode. Finish the inner while loop and
-                # continue with a new iteration of the outermost while loop.
-                # NOTE: At the end of the for loop, we substitute the current
-                # structure by the one returned by the control module. However,
-                # if we change mode before the instruction is finished, we
-                # have to undo this step. This can easily be done changing
-                # the last structure by the current one, so that when the
-                # structure is substituted, it is substituted by the same.
-                str_aux = structure
-                break
-        if instruction.get("end", False):
+    while continue_loop:
+        if graphics.manual_mode:
+            # In manual mode, wait for the user to press a instruction.
+            continue_loop, key_pressed = graphics.draw(
+                stairs, structure, sm.counter)
+            instruction = control.manual_control(key_pressed, sm)
+            str_aux = structure
+            sm.simulate_instruction(structure, instruction)
+        else:
+            # Compute instruction:
+            # Compute the next instruction.
             try:
-                graphics.set_manual_mode()
-            except ValueError:
-                # If the graphics can not be set in manual mode (normally
-                # because we are not displaying images), finish the loop.
-                continue_loop = False
-    # Substitute the simulated structure by the one returned by the control
-    # module when computing the instruction in automatic mode. In manual mode,
-    # both are just the same object.
-    structure = str_aux
-
-
+                # The limits are applied to the computation of each
+                # instruction.
+                with structure.watchdog or nullcontext():
+                    instruction, str_aux = control.next_instruction(structure)
+                    if instruction is not None:
+                        stop_lentgh = sm.stop_distance(instruction)
+                        next_instructions = control.compute_distance(
+                            str_aux, stop_lentgh)
+            except EvaluationStalled as error:
+                # The control module does not progress. Stop as if no
+                # instruction were found.
+                print("Stalled:", error)
+                instruction = None
+            if instruction is None:
+                try:
+                    graphics.set_manual_mode()
+                except ValueError:
+                    # If the graphics can not be set in manual mode (normally
+                    # because we are not displaying images), finish the loop.
+                    continue_loop = False
+                continue
+            # Compute and initial estimation of the time requirede to
+            # complete the instruction, and if dynamics is implemented,
+            # compute the instructions that the structure has to suposedly
+            # complete until the structure stop. This is only to check
+            # for collisions when computing the actual profile for the
+            # horizontal motion (if needed).
+            # Compute the actual time required to complete the instruction.
+            sm.compute_time(instruction, next_instructions)
+            # Simulate instruction:
+            instruction_number += 1
+            print(instruction_number, instruction)
+            for res in sm.simulate_step(structure, instruction):
+                if res == SimulatorState.SimulatorError:
+                    # The simulation has failed: Set to manual mode, to let the
+                    # user check the situation.
+                    graphics.set_manual_mode()
+                    graphics.draw(stairs, structure, sm, True)
+                    # Finish the outermost loop.
+                    # continue_loop = False
+                    break
+                # The simulation has succeeded, so, continue loop.
+                # elif res == SimulatorState.SimulatorNoIter:
+                #     break
+                continue_loop, key_pressed = \
+                    graphics.draw(stairs, structure, sm.counter)
+                if not continue_loop or graphics.manual_mode:
+                    # The user has pressed the Esc key to finish the program.
+                    # Entering manual mode. Finish the inner while loop and
+                    # continue with a new iteration of the outermost while
+                    # loop.
+                    # NOTE: At the end of the for loop, we substitute the
+                    # current structure by the one returned by the control
+                    # module. However, if we change mode before the
+                    # instruction is finished, we have to undo this step. This
+                    # can easily be done changing the last structure by the
+                    # current one, so that when the structure is substituted,
+                    # it is substituted by the same.
+                    str_aux = structure
+                    break
+            if instruction.get("end", False):
+                try:
+                    graphics.set_manual_mode()
+                except ValueError:
+                    # If the graphics can not be set in manual mode (normally
+                    # because we are not displaying images), finish the loop.
+                    continue_loop = False
+        # Substitute the simulated structure by the one returned by the
+        # control module when computing the instruction in automatic mode. In
+        # manual mode, both are just the same object.
+        structure = str_aux
+finally:
+    # Finish the video and csv files.
+    graphics.close()
 print("End of program.")
 #
 #
@@ -0,0 +1,97 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to search the dimensions of the structure that minimize the time to
+cross the stair, using all the cpus (see simulator.optimizer).
+
+The stair, dynamics and the initial design are read from the settings file.
+The dimensions to optimize are given in the command line. The search can be
+started from the best designs of a previous sweep (see sweep_designs), and
+resumed if interrupted (see --state).
+
+Examples:
+    python optimize_design.py settings.xml a b c r1 r2
+    python optimize_design.py settings.xml a b --seeds sweep.csv --state s.json
+
+"""
+
+import argparse
+
+from simulator.optimizer import Optimizer
+from simulator.sweep import read_seeds, DESIGN_KEYS
+import readXML
+
+
+def check_max_size(size, wheels):
+    """Example of constraint for the optimizer (see Base).
+
+    To check any constrain, simple code here all checkings, and raise a
+    ValueError if not valid.
+
+    """
+    if size['a'] + size['b'] + size['c'] > 700.0:
+        raise ValueError
+
+
+parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[2])
+parser.add_argument("settings")
+parser.add_argument("variables", nargs="+", choices=DESIGN_KEYS,
+                    help="Dimensions to optimize")
+parser.add_argument("--step", type=float, default=0.1,
+                    help="Size of the initial simplex, relative to the "
+                    "initial design")
+parser.add_argument("--seeds", help="csv file with designs to start from "
+                    "(for instance, a sweep: the fastest designs are used)")
+parser.add_argument("--iterations", type=int, default=100)
+parser.add_argument("--tolerance", type=float, default=1e-3)
+parser.add_argument("--workers", type=int, default=None,
+                    help="Number of processes (default: all the cpus)")
+parser.add_argument("--cache", default=None,
+                    help="File where store the results, to reuse them")
+parser.add_argument("--state", default=None,
+                    help="File where save the search, to resume it")
+parser.add_argument("--max-instructions", type=int, default=None,
+                    help="Maximum number of instructions for each design")
+parser.add_argument("--max-checks", type=int, default=None,
+                    help="Maximum number of positions checked for each "
+                    "design")
+parser.add_argument("--max-time", type=float, default=None,
+                    help="Maximum time (seconds) for each design")
+args = parser.parse_args()
+
+# Read stairs data.
+stairs_list, landing = readXML.read_stairs(args.settings)
+# Read the initial design.
+__, structure_size, wheels_radius = readXML.read_structure(args.settings)
+# Read simulator data.
+dynamics_data, sample_data = readXML.read_dynamics(args.settings)
+# Limits of the computation for each design, from the settings file, or from
+# the command line.
+limits = readXML.read_limits(args.settings) or {}
+for key, value in (('max_instructions', args.max_instructions),
+                   ('max_checks', args.max_checks),
+                   ('max_wall_time', args.max_time)):
+    if value is not None:
+        limits[key] = value
+
+start = dict(structure_size)
+start.update(wheels_radius)
+seeds = []
+if args.seeds is not None:
+    seeds = read_seeds(args.seeds, structure_size, wheels_radius)
+
+optimizer = Optimizer(stairs_list, landing, dynamics_data, sample_data,
+                      args.variables, check_max_size, args.workers, args.cache,
+                      limits or None)
+design, total_time = optimizer.minimize(
+    start, args.step, seeds, args.iterations, args.tolerance, args.state)
+print("Total:", total_time, "seconds")
+print("Designs evaluated:", optimizer.evaluations)
+for key in args.variables:
+    print(key, "=", design[key])
+
+###############################################################################
+# End of file.
+###############################################################################
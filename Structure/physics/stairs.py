@@ -8,7 +8,10 @@ interactions with respect to the wheels of the structure (collisions,
 unstabilities and wheel position).
 """
 
+from bisect import bisect_right
+
 from numpy import int as cv_datatype
+import numpy
 import cv2
 
 from physics.wheel_state import WheelState, MAX_GAP
@@ -77,14 +80,75 @@ class Stair:
         # At the very last step, add an additional element of "landing" size
         # (to allow the structure to end beyond the last step.)
         self.STAIR.append((x, y))
+        # Build the index to search steps (see find_step).
+        self.build_index()
+
+    def build_index(self):
+        """Precompute the search index and the neighbor table of the steps.
+
+        For each corner of the stair, the table STEPS stores the values that
+        find_step returns when the wheel lies on that step: (yc, xl, xr, yl,
+        yr). The list KEYS stores the horizontal coordinate from which the
+        wheel is considered to be beyond each corner, so that the step can be
+        found with a binary search instead of walking the whole stair.
+        """
+        self.STEPS = []
+        self.KEYS = []
+        yc = 0.0
+        yl = 0.0
+        xl = 0.0
+        key = float('-inf')
+        for xs, ys in self.STAIR:
+            self.STEPS.append((yc, xl, xs, yl, ys))
+            # See the NOTE in find_step for the MAX_GAP sign. The keys must
+            # be sorted for the binary search, so we store the running maximum,
+            # which does not change the first corner found (see find_step).
+            if ys > yc:
+                key = max(key, xs - MAX_GAP)
+            else:
+                key = max(key, xs + MAX_GAP)
+            self.KEYS.append(key)
+            xl = xs
+            yl = yc
+            yc = ys
+        # Same table as an array, for the batch functions. The last row is
+        # used when the wheel is beyond the last corner (see find_step). In
+        # this case, the value for xr (nan) is replaced by the wheel position.
+        self.STEPS_ARRAY = numpy.array(
+            self.STEPS + [(yc, xl, numpy.nan, yl, yc)], numpy.float64)
+        self.KEYS_ARRAY = numpy.array(self.KEYS, numpy.float64)
 
-    def find_step(self, p):
+    def step_index(self, x, hint=None):
+        """Return the index of the step over which the point x lies.
+
+        The index is the position of the right corner of the step in the
+        STAIR list, or len(STAIR) if the point is beyond the last corner.
+
+        Arguments:
+        x -- Horizontal coordinate of the center of the wheel.
+        hint -- Index returned in a previous call (for instance, the last step
+            of the same wheel). If the wheel is still on that step, or on one
+            of its neighbors, the search takes constant time.
+        """
+        keys = self.KEYS
+        if hint is not None:
+            # The index i is the correct one when KEYS[i-1] <= x < KEYS[i].
+            for i in (hint, hint + 1, hint - 1):
+                if 0 <= i <= len(keys) and \
+                        (i == len(keys) or x < keys[i]) and \
+                        (i == 0 or keys[i - 1] <= x):
+                    return i
+        return bisect_right(keys, x)
+
+    def find_step(self, p, hint=None):
         """Find the step over which the wheel is located.
 
         See figure find_step.svg for more details.
 
         Arguments:
         p -- Coordinates (x,y) of the center of the wheel.
+        hint -- Index of the step where the wheel was located previously (see
+            step_index).
 
         Returns the coordinates for:
           - height of the step where the wheel lies (yc)
@@ -93,45 +157,29 @@ class Stair:
         """
         # Horizontal coordinate for the center of the wheel.
         xc = p[0]
-        # Consider the height of the first step equal to 0.
-        yc = 0.0
-        yl = 0.0
-        xl = 0.0
-        for xs, ys in self.STAIR:
-            # Find the step where the center of the wheel lies.
-            # NOTE: When we move downstairs, we need to check both greater
-            # than or equal to. This happens when we perform a correction
-            # when a wheel is placed in an unstable position, so that the
-            # wheel move back to a position EQUAL to the edge of the step.
-            # In this situation, if none is done, this function will choose
-            # incorrect step.
-            if ys > yc:
-                # Going upstairs:
-                if xs > xc + MAX_GAP:
-                    yr = ys
-                    xr = xs
-                    return yc, xl, xr, yl, yr
-            else:
-                # Going downstairs:
-                if xs > xc - MAX_GAP:
-                    yr = ys
-                    xr = xs
-                    return yc, xl, xr, yl, yr
-
-            # Store previous values as the values for the left step.
-            xl = xs
-            yl = yc
-            yc = ys
-        # If the code does not reach the return instruction, possibly the
-        # wheel is out of the space in which the stairs are defined.
-        return yc, xl, xc, yl, ys
-
-    def check_collision(self, p, r):
+        # NOTE: When we move downstairs, we need to check both greater than or
+        # equal to. This happens when we perform a correction when a wheel is
+        # placed in an unstable position, so that the wheel move back to a
+        # position EQUAL to the edge of the step. In this situation, if none
+        # is done, this function will choose incorrect step. For that reason,
+        # the keys of the index are shifted MAX_GAP to the left for upstairs
+        # steps, and MAX_GAP to the right for downstairs ones.
+        index = self.step_index(xc, hint)
+        try:
+            return self.STEPS[index]
+        except IndexError:
+            # If there is no step, possibly the wheel is out of the space in
+            # which the stairs are defined.
+            yl, __, xl, __, yc = self.STEPS[-1]
+            return yc, xl, xc, yl, yc
+
+    def check_collision(self, p, r, hint=None):
         """Check a possible collision of a wheel with the stairs.
 
         Arguments:
         p -- Coordinates of the center of the wheel.
         r -- Wheel radius.
+        hint -- See find_step.
 
         Return:
           - State of the wheel with respect to the stair (see WheelState).
@@ -140,7 +188,7 @@ class Stair:
             collision in vertical and horizontal directions.
             If there is no colllision, returns 0 for both values.
         """
-        hc, hl, hr, wl, wr = self.get_distances(p, r)
+        hc, hl, hr, wl, wr = self.get_distances(p, r, hint)
         # First part. Ensure that there is no collision, but if so, return
         # distances to allow the calling function to correct it.
         # First ensure that the bottom of the wheel is above the step.
@@ -252,12 +300,13 @@ class Stair:
         # In any other case, the wheel is on air.
         return WheelState.Air, 0.0, 0.0
 
-    def get_distances(self, p, r):
+    def get_distances(self, p, r, hint=None):
         """ Find all the useful distances between the stair and a wheel.
 
         Arguments:
         p -- Coordinates of the center of the wheel.
         r -- Wheel radius.
+        hint -- See find_step.
 
         Return the following values (see get_distances.svg):
           - hc, hl, hr: Vertical distances from the bottom of the wheel with
@@ -278,7 +327,7 @@ class Stair:
         # Find left, central and right step. if the function can not find the
         # step, because the wheel is outside the space where the stairs are
         # defined, this function raises a ValueError exception.
-        yc, xl, xr, yl, yr = self.find_step(p)
+        yc, xl, xr, yl, yr = self.find_step(p, hint)
 
         # Compute the space between the points of the wheel and the steps.
         # A negative value means this point is outside the stair (correct).
@@ -296,6 +345,154 @@ class Stair:
 
         return hc, hl, hr, wl, wr
 
+    def vertical_clearance(self, p, r, hint=None):
+        """Compute the distance a wheel can go down until touching the stair.
+
+        Arguments:
+        p -- Coordinates of the center of the wheel.
+        r -- Wheel radius.
+        hint -- See find_step.
+
+        The wheel is considered a square, as in check_collision, so that the
+        steps to the left and right of the wheel are taken into account only
+        when the edges of the wheel are over them.
+        """
+        hc, hl, hr, wl, wr = self.get_distances(p, r, hint)
+        height = hc
+        if wl > MAX_GAP:
+            height = max(height, hl)
+        if wr > MAX_GAP:
+            height = max(height, hr)
+        # Change the sign, so that the distance is positive when the wheel is
+        # above the stair.
+        return -height
+
+    def horizontal_clearance(self, p, r, direction, hint=None):
+        """Compute the distance a wheel can move horizontally over the stair.
+
+        Arguments:
+        p -- Coordinates of the center of the wheel.
+        r -- Wheel radius.
+        direction -- Positive to move right, negative to move left.
+        hint -- See find_step.
+
+        Return (both distances positive, regardless of the direction):
+          - Distance until the wheel touches the first step higher than the
+            bottom of the wheel (inf if there is no such step).
+          - Distance until the center of the wheel gets over a step lower than
+            the bottom of the wheel, that is, if the wheel is in the ground,
+            the distance from which it is no longer in the ground (inf if
+            there is no such step before the collision).
+        """
+        x, y = p
+        bottom = y - r
+        index = self.step_index(x, hint)
+        ground = float('inf')
+        if direction > 0:
+            # Walk the corners to the right of the wheel. The height of the
+            # stair after each corner is stored in the STAIR list.
+            for j in range(index, len(self.STAIR)):
+                xs, ys = self.STAIR[j]
+                if ys - bottom > MAX_GAP:
+                    return xs - x - r, ground
+                if ys - bottom < -MAX_GAP and ground == float('inf'):
+                    ground = self.KEYS[j] - x
+            return float('inf'), ground
+        # Walk the corners to the left of the wheel. The height of the stair
+        # before each corner is stored in the STEPS table.
+        for j in range(index - 1, -1, -1):
+            xs = self.STAIR[j][0]
+            yl = self.STEPS[j][0]
+            if yl - bottom > MAX_GAP:
+                return x - r - xs, ground
+            if yl - bottom < -MAX_GAP and ground == float('inf'):
+                ground = x - self.KEYS[j]
+        return float('inf'), ground
+
+    def get_distances_batch(self, points, radii):
+        """Same as get_distances, for an array of wheels.
+
+        Arguments:
+        points -- Array (N x 2) with the coordinates of the centers of the
+            wheels.
+        radii -- Wheel radius. Either a scalar, or an array of N elements.
+
+        Return five arrays of N elements: hc, hl, hr, wl, wr (see
+        get_distances).
+        """
+        points = numpy.asarray(points, numpy.float64)
+        x = points[:, 0]
+        y = points[:, 1]
+        radii = numpy.asarray(radii, numpy.float64)
+        # Find the steps for all the wheels at once (see find_step).
+        index = numpy.searchsorted(self.KEYS_ARRAY, x, side='right')
+        steps = self.STEPS_ARRAY[index]
+        yc = steps[:, 0]
+        xl = steps[:, 1]
+        xr = numpy.where(numpy.isnan(steps[:, 2]), x, steps[:, 2])
+        yl = steps[:, 3]
+        yr = steps[:, 4]
+        # See get_distances for the meaning (and sign) of each distance.
+        hc = yc - y + radii
+        hl = yl - y + radii
+        hr = yr - y + radii
+        wl = xl - x + radii
+        wr = x + radii - xr
+        return hc, hl, hr, wl, wr
+
+    def check_collision_batch(self, points, radii):
+        """Same as check_collision, for an array of wheels.
+
+        Arguments:
+        points -- Array (N x 2) with the coordinates of the centers of the
+            wheels.
+        radii -- Wheel radius. Either a scalar, or an array of N elements.
+
+        Return:
+          - Array of N elements with the state of each wheel, coded with the
+            values of the WheelState enum (WheelState(code) gives the state).
+          - Arrays with the horizontal and vertical distances to correct the
+            collision of each wheel (0 if there is no collision).
+        """
+        hc, hl, hr, wl, wr = self.get_distances_batch(points, radii)
+        r = numpy.broadcast_to(numpy.asarray(radii, numpy.float64), hc.shape)
+        # Conditions in the same order as they are checked in check_collision,
+        # since the first condition that holds gives the state of the wheel.
+        # Collisions:
+        in_bottom = hc > MAX_GAP
+        in_right = (wr > MAX_GAP) & (hr > MAX_GAP)
+        in_left = (wl > MAX_GAP) & (hl > MAX_GAP)
+        # Contact gaps:
+        cthc = hc > -MAX_GAP
+        cthl = (hl > -MAX_GAP) & (wl > 0)
+        cthr = (hr > -MAX_GAP) & (wr > 0)
+        ctwl = (MAX_GAP > wl) & (wl > -MAX_GAP) & (hl > 0)
+        ctwr = (MAX_GAP > wr) & (wr > -MAX_GAP) & (hr > 0)
+        # Over the outer corner of a step:
+        over = ((wr >= -MAX_GAP) & (hr > hc)) | ((wl >= -MAX_GAP) & (hl > hc))
+        # Higher than the next step (cases a and d in check_collision). In
+        # any other case the wheel is on air.
+        outer = ((hr > hc) & (hc >= hl) & (wr > -r) & (hr < MAX_GAP)) | \
+            ((hr > hc) & (hl > hc) & (wr > wl) & (wr > -r) & (hr < 0))
+
+        inside = WheelState.Inside.value
+        states = numpy.select(
+            [in_bottom, in_right, in_left,
+             cthc & (ctwr | ctwl), cthc, ctwr | ctwl, cthl | cthr,
+             over, outer],
+            [inside, inside, inside,
+             WheelState.Corner.value, WheelState.Ground.value,
+             WheelState.Contact.value, WheelState.Unstable.value,
+             WheelState.Over.value, WheelState.Outer.value],
+            WheelState.Air.value)
+        # Correction distances (only for wheels inside the stair).
+        horizontal = numpy.select(
+            [in_bottom & (hr > hl), in_bottom, in_right, in_left],
+            [wl - 2 * r, -wr + 2 * r, -wr, wl], 0.0)
+        vertical = numpy.select(
+            [in_bottom, in_right, in_left], [hc, hr, hl], 0.0)
+        return states, horizontal, vertical
+
     def length(self):
         """Return the total length of the list of the stairs."""
         return self.STAIR[-1][0]
@@ -7,6 +7,8 @@ Module to define the ending wheel of each structure actuator. The module
 implements the physical interactions with the stairs: collisions and contacts.
 """
 
+import copy
+
 from numpy import int as cv_datatype
 import numpy
 import cv2
@@ -64,16 +66,27 @@ class Wheel:
                 MAX_GAP)
         self.HOR_MARGIN = margin[0]
         self.VER_MARGIN = margin[1]
+        # Index of the last step where the wheel was found, used as a hint to
+        # find the step in the next check (see Stair.step_index).
+        self.step = None
         if position is None:
             self.state = WheelState.Uncheked
             return
         # Check if it is in a valid position, and if so, update its state
         # (normally, it should be ground, although other values can happen).
-        self.state, __, __ = stairs.check_collision(position, self.RADIUS)
+        self.state, __, __ = stairs.check_collision(
+            position, self.RADIUS, self.find_step(position))
         if self.state == WheelState.Inside:
             raise ValueError("Wheel in an initial forbidden position.\n \
                 Relocate structure.")
 
+    def fork(self):
+        """Return a copy of the wheel (see Base.fork).
+
+        The copy has its own state, but shares the stairs and dimensions.
+        """
+        return copy.copy(self)
+
     def check_wheel(self, position):
         """Function to check the position of a wheel with respect to the stair.
 
@@ -92,8 +105,8 @@ class Wheel:
             (run test_wheel_state.py).
         """
         # Move wheel, and check whether the motion is possible.
-        self.state, w, h = \
-            self.SIMULATOR.check_collision(position, self.RADIUS)
+        self.state, w, h = self.SIMULATOR.check_collision(
+            position, self.RADIUS, self.find_step(position))
         if self.state != WheelState.Inside:
             return True, 0, 0
         # If not in a valid position, return False along with the motion
@@ -129,7 +142,8 @@ class Wheel:
             return HorVerError()
         # Compute the distance for a radius equal 0. With this trick, the
         # function returns the desired distance.
-        hc, hl, hr, wl, wr = self.SIMULATOR.get_distances(position, 0)
+        hc, hl, hr, wl, wr = self.SIMULATOR.get_distances(
+            position, 0, self.find_step(position))
         if hr > hc and hc >= hl:
             # Upstairs direction. The comparison hc = hl happens at the
             # beginning of the stair.
@@ -155,11 +169,44 @@ class Wheel:
 
         return HorVerError(None, None)
 
-    def ground(self, position):
-        """Check whether the wheel is lying in a horizontal place."""
-        self.check_wheel(position)
-        return self.state == WheelState.Ground or \
-            self.state == WheelState.Corner
+    def vertical_clearance(self, position):
+        """Return the distance the wheel can go down (see Stair)."""
+        return self.SIMULATOR.vertical_clearance(
+            position, self.RADIUS, self.find_step(position))
+
+    def horizontal_clearance(self, position, direction):
+        """Return the distances the wheel can move horizontally (see Stair).
+
+        """
+        return self.SIMULATOR.horizontal_clearance(
+            position, self.RADIUS, direction, self.find_step(position))
+
+    def find_step(self, position):
+        """Update and return the index of the step beneath the wheel.
+
+        The previous index is used as a hint, since between two consecutive
+        checks the wheel is normally on the same step, or on the next one.
+        """
+        self.step = self.SIMULATOR.step_index(position[0], self.step)
+        return self.step
+
+    def ground(self, position, update=True):
+        """Check whether the wheel is lying in a horizontal place.
+
+        Arguments:
+        position -- Coordinates (x,y) for the required center of the wheel.
+        update -- If True, update the state of the wheel (see check_wheel).
+          If False, the wheel is not modified (see Base.max_shift).
+        """
+        if update:
+            self.check_wheel(position)
+            state = self.state
+        else:
+            step = self.step
+            state, __, __ = self.SIMULATOR.check_collision(
+                position, self.RADIUS, self.find_step(position))
+            self.step = step
+        return state == WheelState.Ground or state == WheelState.Corner
 
     # =========================================================================
     # Control functions.
@@ -208,7 +255,8 @@ class Wheel:
         """
         # Get the distances to the stair (see getDistances.svg).
         r = self.RADIUS
-        hc, hl, hr, wl, wr = self.SIMULATOR.get_distances(position, r)
+        hc, hl, hr, wl, wr = self.SIMULATOR.get_distances(
+            position, r, self.find_step(position))
 
         res = {'st': self.ground(position), 'end': False}
 
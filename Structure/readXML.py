@@ -127,6 +127,10 @@ def read_dynamics(xml_file):
             dynamics.attrib['decceleration'])
     except KeyError:
         pass
+    try:
+        dynamics_data['cache_size'] = int(dynamics.attrib['cache_size'])
+    except KeyError:
+        pass
 
     samples = element.find('samples')
     sample_data = {'sample_time': float(samples.attrib['sample_time']),
@@ -135,6 +139,34 @@ def read_dynamics(xml_file):
     return dynamics_data, sample_data
 
 
+def read_limits(xml_file):
+    """Read the limits of the computation (optional).
+
+    Returns a dictionary with the arguments of the constructor of class
+    Watchdog (see simulator.watchdog), or None if the tag is not found.
+
+    """
+    try:
+        'Read data structure from XML file'
+        element = ElementTree.parse(xml_file)
+    except ElementTree.ParseError:
+        raise RuntimeError("XML file " + xml_file + " is incorrect.")
+
+    limits = element.find('limits')
+    if limits is None:
+        return None
+    limits_data = {}
+    for key, name, data_type in (
+            ('max_instructions', 'instructions', int),
+            ('max_checks', 'checks', int),
+            ('max_wall_time', 'time', float)):
+        try:
+            limits_data[key] = data_type(limits.attrib[name])
+        except KeyError:
+            limits_data[key] = None
+    return limits_data
+
+
 def read_graphics(xml_file):
     """Read graphics parameters.
 
@@ -209,6 +241,24 @@ def read_graphics(xml_file):
         display = bool(strtobool(video.attrib['display']))
     except (AttributeError, KeyError):
         video_dir = None
+    # Encode a video file instead of an image sequence (optional).
+    try:
+        video_file = video.attrib['file']
+    except (AttributeError, KeyError):
+        video_file = None
+    try:
+        codec = video.attrib['codec']
+    except (AttributeError, KeyError):
+        codec = 'mp4v'
+    try:
+        fps = float(video.attrib['fps'])
+    except (AttributeError, KeyError):
+        fps = None
+    # Save the images in a background thread (optional).
+    try:
+        queue_size = int(video.attrib['queue'])
+    except (AttributeError, KeyError):
+        queue_size = 4
 
     ###########################################################################
     try:
@@ -241,7 +291,11 @@ def read_graphics(xml_file):
         'composition': comp_dir,
         'buffer_size': buffer_size,
         'units': units,
-        'margin': margin}
+        'margin': margin,
+        'video_file': video_file,
+        'codec': codec,
+        'fps': fps,
+        'queue_size': queue_size}
 
     return image_data, video_data, csv_data
 
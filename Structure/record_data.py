@@ -0,0 +1,55 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to simulate the structure and save the data of each sample, without
+any graphics (see simulator.recorder).
+
+Usage: python record_data.py [settings.xml] [output file]
+
+The video of the simulation can be generated afterwards from the output file
+(see render_recording.py).
+
+"""
+
+import sys
+
+from structure.base import Base
+from simulator.simulator import Simulator
+from simulator.recorder import Recorder, record_simulation
+from physics.stairs import Stair
+import readXML
+
+
+# Open and check settings file.
+try:
+    settings_name = sys.argv[1]
+except Exception:
+    settings_name = "settings.xml"
+try:
+    output_name = sys.argv[2]
+except Exception:
+    output_name = "trajectory.npz"
+
+# Read stairs data and create physical stairs object.
+stairs_list, landing = readXML.read_stairs(settings_name)
+stair = Stair(stairs_list, landing)
+
+# Read structure dimensions and create structure.
+__, structure_size, wheels_radius = readXML.read_structure(settings_name)
+structure = Base(structure_size, wheels_radius, stair)
+# Read simulator data.
+dynamics_data, sample_data = readXML.read_dynamics(settings_name)
+simulator = Simulator(dynamics_data, sample_data)
+
+recorder = Recorder(sample_data['sample_time'])
+if not record_simulation(structure, simulator, recorder, True):
+    print("Can not cross the stair.")
+recorder.save(output_name)
+
+print("Samples:", recorder.samples)
+
+###############################################################################
+# End of file.
+###############################################################################
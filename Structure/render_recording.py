@@ -0,0 +1,55 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to generate the video of a simulation saved by record_data.py, using
+all the cpus (see graphics.render).
+
+The structure, stair and graphics configuration (video tag) are read from the
+settings file, that must be the same used to record the simulation. The
+images are never displayed.
+
+Examples:
+    python render_recording.py settings.xml trajectory.npz
+    python render_recording.py settings.xml trajectory.npz --workers 8
+
+"""
+
+import argparse
+
+from graphics.render import render, BLOCK_SIZE
+import readXML
+
+parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[2])
+parser.add_argument("settings", nargs="?", default="settings.xml")
+parser.add_argument("recording", nargs="?", default="trajectory.npz",
+                    help="File (or directory) saved by record_data.py")
+parser.add_argument("--workers", type=int, default=None,
+                    help="Number of processes (default: all the cpus)")
+parser.add_argument("--block", type=int, default=BLOCK_SIZE,
+                    help="Number of consecutive images drawn by a process "
+                    "at once")
+args = parser.parse_args()
+
+# Read stairs data.
+stairs_list, landing = readXML.read_stairs(args.settings)
+# Read structure dimensions.
+__, structure_size, wheels_radius = readXML.read_structure(args.settings)
+# Read simulator data.
+dynamics_data, sample_data = readXML.read_dynamics(args.settings)
+# Read graphical variables (see main_loop).
+image_data, video_data, __ = readXML.read_graphics(args.settings)
+axis = {
+    "height": structure_size["d"] + video_data['margin'],
+    "max_speed": 1.2 * dynamics_data["speed"],
+    "max_incline": structure_size['n'] + video_data['margin']}
+
+images = render(args.recording, stairs_list, landing, structure_size,
+                wheels_radius, image_data, video_data, sample_data, axis,
+                args.workers, args.block)
+print("Images:", images)
+
+###############################################################################
+# End of file.
+###############################################################################
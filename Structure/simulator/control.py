@@ -42,8 +42,6 @@ same time as the elevation.
 # structure.DEBUG['graphics'].draw(structure.STAIRS, structure, structure.DEBUG['simulator'], False)
 
 
-import copy
-
 from physics.wheel_state import MAX_GAP
 
 
@@ -141,13 +139,15 @@ def next_instruction(structure):
 
     Return a dictionary with the instructions to perform.
     """
+    if structure.watchdog is not None:
+        structure.watchdog.instruction()
     # Get the distances each wheel is with respect to its closest step.
     wheel, hor, ver, w_aux, h_aux, v_aux, end = \
         structure.get_wheels_distances()
 
-    # Create a deep copy of the structure, to simulate all the motions computed
+    # Create a copy of the structure, to simulate all the motions computed
     # without modifying the actual structure.
-    st_aux = copy.deepcopy(structure)
+    st_aux = structure.fork()
 
     # Perform the horizontal motion.
     # NOTE that, when pushing the actuator, the structure can be moved more if
@@ -183,6 +183,13 @@ def next_instruction(structure):
         # proportional to the size of the structure.
         k = structure.position.WIDTH / 1000
         v_total = v_aux * (hor + k) / (h_aux + k)
+        # Get the maximum distance the actuator can be shifted (see
+        # Base.max_shift), so that, if the distance required is not possible,
+        # the actuator is shifted the distance possible at once, instead of
+        # trying the motion and correcting it with the error obtained.
+        limit, __, __ = st_aux.max_shift(w_aux, -v_total)
+        if abs(v_total) > abs(limit) + MAX_GAP:
+            v_total = -limit
         # Now, we check if we can shift the actuator the distance required.
         res_act = st_aux.shift_actuator(w_aux, -v_total)
         if not res_act:
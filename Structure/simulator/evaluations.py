@@ -0,0 +1,132 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to store in a file the time to cross a stair for each design of the
+structure (see sweep.evaluate_design).
+
+The time only depends on the dimensions of the structure, the stair and the
+data of the simulator, so once computed, it can be reused by any other
+sweep or optimization, even after the program is finished (for instance, if a
+sweep is interrupted, the designs already evaluated are not computed again).
+The results are stored in a SQLite database, that can be shared by several
+processes at the same time.
+
+"""
+
+import hashlib
+import os
+import sqlite3
+
+# Failures that are not stored: the ones that depend on the limits of the
+# computation, and not only on the design (see time.TimeBudgetExceeded and
+# watchdog.EvaluationStalled), and the errors within the code (RuntimeError,
+# see sweep.evaluate_design), that must give other result once the code is
+# fixed.
+NOT_STORED = ("TimeBudgetExceeded", "EvaluationStalled", "RuntimeError")
+
+
+def design_key(size, wheels, stair, dynamics_data, sample_data):
+    """Return a string that identifies a design, stair and simulator data.
+
+    Two designs with the same key get the same result when evaluated. The key
+    is a hash of the representation of all the values (note that the
+    representation of a float is exact, so two designs only share the key if
+    all their values are exactly the same).
+    """
+    values = (sorted(size.items()), sorted(wheels.items()),
+              [tuple(corner) for corner in stair.STAIR],
+              sorted(dynamics_data.items()), sorted(sample_data.items()))
+    return hashlib.sha1(repr(values).encode()).hexdigest()
+
+
+class EvaluationCache:
+    """Persistent cache for the results of evaluate_design."""
+
+    def __init__(self, file_name, timeout=60.0):
+        """Constructor:
+
+        Arguments:
+        file_name -- Name of the database file. If the file does not exist,
+          it is created.
+        timeout -- Time (seconds) to wait when other process is writing to
+          the database.
+        """
+        self.file_name = file_name
+        self.timeout = timeout
+        # Number of designs found in the cache or not.
+        self.hits = 0
+        self.misses = 0
+        # The connection can not be shared between processes, so each process
+        # opens its own connection (see connection).
+        self.db = None
+        self.pid = None
+
+    def connection(self):
+        """Return the connection to the database for the current process."""
+        if self.db is None or self.pid != os.getpid():
+            self.db = sqlite3.connect(self.file_name, timeout=self.timeout,
+                                      isolation_level=None)
+            self.pid = os.getpid()
+            # Write ahead log, so that readers do not block writers, and the
+            # other way round.
+            self.db.execute("PRAGMA journal_mode=WAL")
+            self.db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, time REAL, error TEXT)")
+        return self.db
+
+    def get(self, key):
+        """Return the result stored for the key (see evaluate_design).
+
+        Return None if the key is not in the cache.
+        """
+        row = self.connection().execute(
+            "SELECT time, error FROM results WHERE key = ?",
+            (key,)).fetchone()
+        return row
+
+    def put(self, key, total_time, error):
+        """Store a result in the cache (see evaluate_design)."""
+        # If two processes compute the same design at the same time, both
+        # results are the same, so it does not matter which one is kept.
+        self.connection().execute(
+            "INSERT OR REPLACE INTO results (key, time, error) "
+            "VALUES (?, ?, ?)", (key, total_time, error))
+
+    def evaluate(self, key, function, *args):
+        """Return the result stored for the key, or compute and store it.
+
+        Arguments:
+        key -- Key of the design (see design_key).
+        function -- Function to compute the result if not found. It must
+          return the time and the failure (see sweep.evaluate_design).
+        args -- Arguments for the function.
+
+        Return the time, the failure, and True if the result was found in the
+        cache.
+        """
+        row = self.get(key)
+        if row is not None:
+            self.hits += 1
+            return row[0], row[1], True
+        self.misses += 1
+        total_time, error = function(*args)
+        if error is None or not error.startswith(NOT_STORED):
+            self.put(key, total_time, error)
+        return total_time, error, False
+
+    def hit_rate(self):
+        """Return the fraction of designs found in the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def close(self):
+        if self.db is not None and self.pid == os.getpid():
+            self.db.close()
+        self.db = None
+
+###############################################################################
+# End of file.
+###############################################################################
@@ -0,0 +1,268 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to search the dimensions of the structure that minimize the time to
+cross a stair (see time.compute_time).
+
+The search uses the Nelder-Mead method, that does not need derivatives (the
+time is not a smooth function of the dimensions). In each iteration, all the
+points the method can need (reflection, expansion and both contractions) are
+evaluated at once in a pool of processes, and then the method chooses which
+one to use. The points of the initial simplex and the points of a shrink step
+are also evaluated in parallel.
+
+The candidates can not be worse than the worst point of the simplex to be
+accepted, so they are evaluated with this time as a time budget (see
+time.compute_time), and the slow ones are discarded without computing the
+whole stair.
+
+The state of the search is saved after each iteration, so that it can be
+resumed if the program is interrupted.
+
+"""
+
+import json
+import multiprocessing
+import os
+
+import numpy
+
+from physics.stairs import Stair
+from simulator.sweep import split_design
+from simulator.sweep import init_worker, evaluate_budget
+from simulator.screen import screen_list
+
+# Coefficients of the Nelder-Mead method: reflection, expansion, contraction
+# and shrink.
+REFLECTION = 1.0
+EXPANSION = 2.0
+CONTRACTION = 0.5
+SHRINK = 0.5
+
+
+class Optimizer:
+    """Search the dimensions that minimize the time to cross a stair."""
+
+    def __init__(self, stairs_list, landing, dynamics_data, sample_data,
+                 variables, constraint=None, workers=None, cache=None,
+                 limits=None):
+        """Constructor:
+
+        Arguments:
+        stairs_list, landing -- Stair definition (see Stair).
+        dynamics_data, sample_data -- Simulator data (see Simulator).
+        variables -- List with the names of the dimensions to optimize (see
+          sweep.DESIGN_KEYS). The rest of the dimensions are fixed.
+        constraint -- Optional function with the same arguments and behaviour
+          as the limits argument of Base, that is, it receives the size and
+          wheels dictionaries, and raises a ValueError if the design is not
+          valid. The constraint is checked before evaluating the design.
+        workers -- Number of processes. If None, use all the cpus. If 1, the
+          designs are evaluated in this process.
+        cache -- Optional name of the file where the results are stored (see
+          evaluations.EvaluationCache).
+        limits -- Optional limits of the computation for each design (see
+          sweep.evaluate_design). The designs that reach a limit are
+          discarded, as the ones that can not cross the stair.
+        """
+        self.variables = list(variables)
+        self.constraint = constraint
+        self.workers = workers
+        self.init_data = (stairs_list, landing, dynamics_data, sample_data,
+                          cache, limits)
+        # Stair to reject the designs without evaluating them (see
+        # screen.screen_designs).
+        self.stair = Stair(stairs_list, landing)
+        self.pool = None
+        # Number of designs evaluated (including the ones discarded by the
+        # constraint or the screen).
+        self.evaluations = 0
+
+    def design(self, start, point):
+        """Return the design for a point of the search space."""
+        design = dict(start)
+        design.update(zip(self.variables, (float(v) for v in point)))
+        return design
+
+    def evaluate(self, designs, time_budget=None):
+        """Compute the time for a list of designs.
+
+        Return an array with the time for each design. The time is infinite
+        if the design can not cross the stair, does not meet the constraint,
+        or needs more time than the budget. The designs rejected by
+        screen.screen_designs are not evaluated.
+        """
+        times = numpy.full(len(designs), float('inf'))
+        args = []
+        index = []
+        if time_budget is not None and not numpy.isfinite(time_budget):
+            time_budget = None
+        reasons = screen_list(designs, self.stair)
+        for n, design in enumerate(designs):
+            self.evaluations += 1
+            if reasons[n] is not None:
+                continue
+            if self.constraint is not None:
+                try:
+                    self.constraint(*split_design(design))
+                except ValueError:
+                    continue
+            args.append((design, time_budget))
+            index.append(n)
+        # The designs are evaluated by the same functions as in a sweep (see
+        # sweep.sweep), so the results exceeding the budget are not stored in
+        # the cache.
+        if self.pool is None:
+            results = map(evaluate_budget, args)
+        else:
+            results = self.pool.map(evaluate_budget, args)
+        for n, (__, total_time, __, __) in zip(index, results):
+            if total_time is not None:
+                times[n] = total_time
+        return times
+
+    def minimize(self, start, step=0.1, seeds=(), max_iterations=100,
+                 tolerance=1e-3, state_file=None):
+        """Search the design with the minimum time.
+
+        Arguments:
+        start -- Initial design, with all the dimensions (see
+          sweep.DESIGN_KEYS).
+        step -- Size of the initial simplex, relative to the value of each
+          variable in the initial design. It can be a scalar, or a
+          dictionary with a value for each variable.
+        seeds -- Optional list of designs to use as points of the initial
+          simplex, instead of the points computed from start and step (for
+          instance, the best designs of a previous sweep, see
+          sweep.read_seeds).
+        max_iterations -- Maximum number of iterations.
+        tolerance -- Stop when the difference between the time of the best
+          and the worst points of the simplex is smaller than this value.
+        state_file -- Optional name of a file where the state of the search is
+          saved after each iteration. If the file exists, the search is
+          resumed from the saved state.
+
+        Return the best design found and its time.
+        """
+        if self.workers != 1:
+            self.pool = multiprocessing.Pool(self.workers, init_worker,
+                                             self.init_data)
+        else:
+            init_worker(*self.init_data)
+        try:
+            state = self.load_state(state_file)
+            if state is None:
+                simplex, values = self.initial_simplex(start, step, seeds)
+                iteration = 0
+            else:
+                start, simplex, values, iteration = state
+            while iteration < max_iterations:
+                order = numpy.argsort(values, kind='stable')
+                simplex = simplex[order]
+                values = values[order]
+                if numpy.isfinite(values[-1]) and \
+                        values[-1] - values[0] < tolerance:
+                    break
+                simplex, values = self.iterate(start, simplex, values)
+                iteration += 1
+                self.save_state(state_file, start, simplex, values, iteration)
+        finally:
+            if self.pool is not None:
+                self.pool.terminate()
+                self.pool = None
+        best = numpy.argmin(values)
+        return self.design(start, simplex[best]), values[best]
+
+    def initial_simplex(self, start, step, seeds):
+        """Build and evaluate the initial simplex (see minimize)."""
+        x0 = numpy.array([start[v] for v in self.variables], numpy.float64)
+        simplex = numpy.tile(x0, (len(self.variables) + 1, 1))
+        for n, variable in enumerate(self.variables):
+            try:
+                delta = step[variable]
+            except TypeError:
+                delta = step
+            simplex[n + 1, n] *= 1.0 + delta
+        for n, seed in enumerate(seeds[:len(simplex)]):
+            simplex[n] = [seed[v] for v in self.variables]
+        values = self.evaluate([self.design(start, x) for x in simplex])
+        return simplex, values
+
+    def iterate(self, start, simplex, values):
+        """Perform one iteration of the Nelder-Mead method.
+
+        The simplex must be sorted from the best to the worst point.
+        """
+        worst = simplex[-1]
+        centroid = numpy.mean(simplex[:-1], axis=0)
+        direction = centroid - worst
+        candidates = (
+            centroid + REFLECTION * direction,
+            centroid + EXPANSION * direction,
+            centroid + CONTRACTION * direction,
+            centroid - CONTRACTION * direction)
+        fr, fe, foc, fic = self.evaluate(
+            [self.design(start, x) for x in candidates], values[-1])
+        if fr < values[0]:
+            # Expansion.
+            if fe < fr:
+                simplex[-1], values[-1] = candidates[1], fe
+            else:
+                simplex[-1], values[-1] = candidates[0], fr
+        elif fr < values[-2]:
+            # Reflection.
+            simplex[-1], values[-1] = candidates[0], fr
+        elif fr < values[-1]:
+            # Outside contraction.
+            if foc <= fr:
+                simplex[-1], values[-1] = candidates[2], foc
+            else:
+                return self.shrink(start, simplex, values)
+        else:
+            # Inside contraction.
+            if fic < values[-1]:
+                simplex[-1], values[-1] = candidates[3], fic
+            else:
+                return self.shrink(start, simplex, values)
+        return simplex, values
+
+    def shrink(self, start, simplex, values):
+        """Move all the points towards the best one."""
+        simplex[1:] = simplex[0] + SHRINK * (simplex[1:] - simplex[0])
+        values[1:] = self.evaluate([self.design(start, x)
+                                    for x in simplex[1:]])
+        return simplex, values
+
+    def save_state(self, state_file, start, simplex, values, iteration):
+        """Save the state of the search (see minimize)."""
+        if state_file is None:
+            return
+        state = {
+            'variables': self.variables,
+            'start': start,
+            'simplex': simplex.tolist(),
+            'values': values.tolist(),
+            'iteration': iteration}
+        # Write to a temporary file, and then replace the old one, so that the
+        # file is never left incomplete.
+        with open(state_file + ".tmp", "w") as f:
+            json.dump(state, f)
+        os.replace(state_file + ".tmp", state_file)
+
+    def load_state(self, state_file):
+        """Load the state saved by save_state, or None if there is no state."""
+        if state_file is None or not os.path.exists(state_file):
+            return None
+        with open(state_file) as f:
+            state = json.load(f)
+        if state['variables'] != self.variables:
+            raise ValueError("The saved search has other variables.")
+        return (state['start'], numpy.array(state['simplex'], numpy.float64),
+                numpy.array(state['values'], numpy.float64),
+                state['iteration'])
+
+###############################################################################
+# End of file.
+###############################################################################
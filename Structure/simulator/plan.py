@@ -0,0 +1,72 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to store the instructions needed to cross a stair.
+
+The instructions computed by the control module only depend on the geometry of
+the structure and the stair, and not on the dynamics of the structure (speeds,
+accelerations, ...). So, when computing the time for the same structure and
+stair with different dynamics, the control module and the physics need to be
+run only once. The rest of the times, the time can be computed from the list of
+instructions stored here (see time.compute_time).
+
+"""
+
+from simulator.control import next_instruction
+
+
+def compute_plan(structure):
+    """Compute the complete list of instructions to cross the stair.
+
+    The structure given is not modified.
+
+    Return:
+      - The list of instructions, in the same order as they are computed by
+        the control module. The instructions only include the geometric data
+        (no times nor speed profiles).
+      - True if the last instruction completes the stair, or False if the
+        control module can not find a valid instruction to continue.
+
+    """
+    plan = []
+    while True:
+        instruction, structure = next_instruction(structure)
+        if instruction is None:
+            # The control module can not find a valid instruction, and so, the
+            # stair can not be crossed.
+            return plan, False
+        plan.append(instruction)
+        if instruction.get("end", False):
+            return plan, True
+
+
+class PlanCache:
+    """Store the instructions computed for each structure and stair."""
+
+    def __init__(self):
+        # Dictionary with the plans computed so far. The key is the
+        # fingerprint of the structure (see Base.fingerprint), and the value
+        # is the value returned by compute_plan.
+        self.plans = {}
+
+    def get_plan(self, structure):
+        """Return the plan for the structure (see compute_plan).
+
+        The plan is only computed the first time the function is called for
+        a given structure and stair.
+
+        """
+        key = structure.fingerprint()
+        try:
+            return self.plans[key]
+        except KeyError:
+            pass
+        plan = compute_plan(structure)
+        self.plans[key] = plan
+        return plan
+
+###############################################################################
+# End of file.
+###############################################################################
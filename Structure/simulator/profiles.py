@@ -16,8 +16,11 @@ the requirements. However, in some cases the motion can not be completed.
 
 # from enum import Enum
 
-from math import sqrt, fabs
-from numpy import arange, array, hstack
+from collections import OrderedDict
+from functools import wraps
+from math import sqrt, fabs, isfinite
+import numpy
+from numpy import arange
 from numpy import float64 as data_type
 # import matplotlib.pyplot as plt
 
@@ -61,6 +64,81 @@ class MaxAccelerationError(ValueError):
 or decceleration rate."
 
 
+class ProfileCache():
+    """Bounded LRU cache for the results of the profile functions.
+
+    The keys are built from the arguments quantized to a given resolution (see
+    cached_profile), so that motions that only differ in rounding errors share
+    the same result. The errors raised by the functions are also stored, so
+    that they are raised again when the same arguments are given.
+
+    """
+
+    def __init__(self, size):
+        # Maximum number of results stored.
+        self.size = size
+        self.results = OrderedDict()
+        # Number of times a result was found in the cache or not.
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, function, *args):
+        """Return the stored result for key, or compute it with function."""
+        try:
+            result, error = self.results[key]
+        except KeyError:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.results.move_to_end(key)
+            if error is not None:
+                raise error[0](*error[1])
+            return result
+        try:
+            result = function(*args)
+        except ValueError as exc:
+            # Including MinDistanceError and MaxAccelerationError.
+            self.store(key, (None, (type(exc), exc.args)))
+            raise
+        self.store(key, (result, None))
+        return result
+
+    def store(self, key, value):
+        self.results[key] = value
+        if len(self.results) > self.size:
+            # Remove the least recently used result.
+            self.results.popitem(last=False)
+
+    def hit_rate(self):
+        """Return the fraction of calls that were found in the cache."""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+def cached_profile(*resolutions):
+    """Decorator to store the results of a profile function in its cache.
+
+    Arguments:
+    resolutions -- Resolution used to quantize each argument of the function
+        when building the key (EQUAL_SPEED for speeds, ROUND_ERROR for
+        distances).
+
+    If the profile has no cache (see AccelerationProfile), the function is
+    simply called.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(self, *args):
+            if self.cache is None:
+                return function(self, *args)
+            key = (function.__name__,) + tuple(
+                round(v / r) if isfinite(v) else v
+                for v, r in zip(args, resolutions))
+            return self.cache.get(key, function, self, *args)
+        return wrapper
+    return decorator
+
+
 class SpeedProfile():
 
     def __init__(self, dynamics_data):
@@ -87,8 +165,50 @@ class SpeedProfile():
     def compute_profile(self, v_ini, v_end, d_tot, t_tot):
         return (0.0,), (t_tot,), (d_tot / t_tot, d_tot / t_tot)
 
+    def dynamics_sections(self, times, sample_time, time_offset):
+        """Compute the samples of each section for plot_dynamics.
+
+        Arguments: see plot_dynamics.
+
+        Return a list with a tuple for each section with the following values:
+        - index of the first sample of the section.
+        - number of samples of the section.
+        - time elapsed from the beginning of the section to the last sample
+          of the previous section (see plot_dynamics).
+        """
+        sections = []
+        # See plot_dynamics for the computation of the samples of each section.
+        current_sample = 0
+        current_time = time_offset
+        times = list(times)
+        times[-1] += sample_time
+        # Index of the next sample to fill (the first sample is the initial
+        # state of the motion).
+        first = 1
+        for interval in times:
+            last_time = current_time
+            current_time += interval
+            last_sample = current_sample
+            current_sample = int(current_time / sample_time)
+            new_samples = max(current_sample - last_sample, 0)
+            time_offset = last_time - last_sample * sample_time
+            sections.append((first, new_samples, time_offset))
+            first += new_samples
+        return sections
+
+    def sample_count(self, times, sample_time, time_offset):
+        """Return the number of samples computed by plot_dynamics.
+
+        This can be used to allocate the arrays given to plot_dynamics.
+
+        Arguments: see plot_dynamics.
+        """
+        first, new_samples, __ = \
+            self.dynamics_sections(times, sample_time, time_offset)[-1]
+        return first + new_samples
+
     def plot_dynamics(self, init_speed, accelerations,
-                      times, sample_time, time_offset):
+                      times, sample_time, time_offset, out=None):
         """Plot speed and position for a list of acceleration -time pairs.
 
         Arguments:
@@ -99,42 +219,31 @@ class SpeedProfile():
         sample_time -- need not be multiple of time intervals.
         time_offset -- If first sample does not start in t = 0. Can be
             positive or negative.
+        out -- Optional tuple of three arrays (time, speed and position) where
+            store the samples. The arrays must have at least the number of
+            samples given by sample_count, and the views with the samples
+            computed are returned.
         """
-
-        # List of arrrays to store all the samples computed.
-        speed_list = array((init_speed,), data_type)
-        position_list = array((0.0,), data_type)
-        # Indices to get track of the time intervals and the samples for a
-        # given section of the motion.
-        current_sample = 0
-        current_time = time_offset
+        # Compute the number of samples of each section before computing any
+        # sample, so that the arrays can be allocated only once.
+        sections = self.dynamics_sections(times, sample_time, time_offset)
+        first, new_samples, __ = sections[-1]
+        total_samples = first + new_samples
+        if out is None:
+            time_list = numpy.empty(total_samples, data_type)
+            speed_list = numpy.empty(total_samples, data_type)
+            position_list = numpy.empty(total_samples, data_type)
+        else:
+            time_list, speed_list, position_list = \
+                (o[:total_samples] for o in out)
+        speed_list[0] = init_speed
+        position_list[0] = 0.0
         # Variables to compute the position and speed at the end of the section
         # independently of the sample time.
         current_position = 0.0
         current_speed = init_speed
-        times = list(times)
-        times[-1] += sample_time
-        for acceleration, interval in zip(accelerations, times):
-            # Compute the number of samples for the current section. Note that
-            # we have to do this computation to ensure that we get the same
-            # number of samples independently of the sample time being multiple
-            # or not of the time intervals.
-
-            # Get the time limits for the current section.
-            last_time = current_time
-            current_time += interval
-            # Get the sample limits for the current section.
-            last_sample = current_sample
-            current_sample = int(current_time / sample_time)
-            new_samples = current_sample - last_sample
-
-            # When the sample time is not a multiple or the time intervals, we
-            # have to take account of the remains of each side of the sample.
-            # The time offset is the difference between the current time,
-            # computed as the accumulation of the actual intervals, and the
-            # position of the last sample, which is a multiple of the sample
-            # time.
-            time_offset = last_time - last_sample * sample_time
+        for acceleration, interval, (first, new_samples, time_offset) in \
+                zip(accelerations, times, sections):
             # Get an auxiliary array for the computation of the intermediate
             # samples of the secion.
             samples = arange(1, new_samples + 1, 1, data_type)
@@ -142,15 +251,13 @@ class SpeedProfile():
             samples -= time_offset
 
             # Compute the intermediate values for the speed and position for
-            # the current section.
+            # the current section, and store them in its place in the arrays.
+            section = slice(first, first + new_samples)
             # Compute samples for the speed.
-            speed_samples = current_speed + acceleration * samples
+            speed_list[section] = current_speed + acceleration * samples
             # And compute also the samples for the position traveled.
-            position_samples = current_position + \
+            position_list[section] = current_position + \
                 current_speed * samples + 0.5 * acceleration * samples**2
-            # Add new samples to the actual ones.
-            speed_list = hstack((speed_list, speed_samples))
-            position_list = hstack((position_list, position_samples))
 
             # Get the values for the end of the section. This make the function
             # independent of the sample time.
@@ -164,15 +271,61 @@ class SpeedProfile():
             current_speed += acceleration * interval
 
         # One computed all the sections, generate a time array.
-        time_list = arange(0, speed_list.shape[0], 1, data_type)
+        time_list[:] = arange(0, total_samples, 1, data_type)
         time_list *= sample_time
-        # time_list = arange(0, current_sample * sample_time,
-        #                    sample_time, data_type)
-        # time_list += sample_time
 
         # And return all the signals computed.
         return time_list, speed_list, position_list
 
+    def sample_dynamics(self, init_speed, accelerations, times, sample_times,
+                        out=None):
+        """Compute speed and position at any time of the motion.
+
+        Unlike plot_dynamics, the samples need not be equally spaced, so this
+        function can be used for variable rate outputs. The speed and position
+        are computed in closed form from the section each time belongs to.
+        Times beyond the end of the motion are computed with the acceleration
+        of the last section (as in plot_dynamics), and times before the
+        beginning, with the first one.
+
+        Arguments:
+        init_speed, accelerations, times -- see plot_dynamics.
+        sample_times -- Array with the times where compute the samples,
+            measured from the beginning of the motion.
+        out -- Optional tuple of two arrays (speed and position) where store
+            the samples.
+
+        Return the speed and the position for each time.
+        """
+        accelerations = numpy.asarray(accelerations, data_type)
+        times = numpy.asarray(times, data_type)
+        sample_times = numpy.asarray(sample_times, data_type)
+        # Time, speed and position at the beginning of each section.
+        start = numpy.zeros(len(times), data_type)
+        start[1:] = numpy.cumsum(times[:-1])
+        speeds = numpy.full(len(times), init_speed, data_type)
+        speeds[1:] += numpy.cumsum(accelerations[:-1] * times[:-1])
+        positions = numpy.zeros(len(times), data_type)
+        positions[1:] = numpy.cumsum(
+            speeds[:-1] * times[:-1] + 0.5 * accelerations[:-1] *
+            times[:-1]**2)
+        # Section of each sample.
+        index = numpy.searchsorted(start[1:], sample_times, 'right')
+        elapsed = sample_times - start[index]
+        if out is None:
+            speed, position = numpy.empty((2,) + sample_times.shape, data_type)
+        else:
+            speed, position = out
+        acceleration = accelerations[index]
+        numpy.multiply(acceleration, elapsed, out=speed)
+        speed += speeds[index]
+        # Position: x0 + (v0 + a * t / 2) * t
+        numpy.multiply(0.5 * acceleration, elapsed, out=position)
+        position += speeds[index]
+        position *= elapsed
+        position += positions[index]
+        return speed, position
+
     # def draw_dynamics(self, time_data, speed_data, position_data,
     #                   max_time=None, block=False):
     #     # Plot figures.
@@ -211,10 +364,17 @@ class AccelerationProfile(SpeedProfile):
         # positive values.
         self.acceleration = dynamics_data['acceleration']
         self.decceleration = dynamics_data['decceleration']
+        # Optional cache for the results of the functions that are called
+        # several times with the same arguments (see cached_profile). Note
+        # that, since the arguments are quantized, the results can differ
+        # slightly from the ones computed without cache.
+        cache_size = int(dynamics_data.get('cache_size', 0))
+        self.cache = ProfileCache(cache_size) if cache_size > 0 else None
 
     def total_time(self, distance):
         raise TypeError
 
+    @cached_profile(EQUAL_SPEED, ROUND_ERROR)
     def end_speed_range(self, v_ini, d_tot):
         """Computes range of end speeds.
     
@@ -272,6 +432,7 @@ class AccelerationProfile(SpeedProfile):
             v_end_max = self.speed
         return (v_end_min, v_end_max)
 
+    @cached_profile(EQUAL_SPEED, ROUND_ERROR)
     def init_speed_range(self, v_end, d_tot):
         """Similar than end_speed_range, for the initial speed.
 
@@ -400,6 +561,7 @@ class AccelerationProfile(SpeedProfile):
         # The total time is the sum of the threee previous times.
         return t1 + t2 + t12
 
+    @cached_profile(EQUAL_SPEED, EQUAL_SPEED, ROUND_ERROR)
     def profile_time_limits(self, v_ini, v_end, d_tot):
         """Compute the time limits required to complete the motion.
 
@@ -713,6 +875,284 @@ class AccelerationProfile(SpeedProfile):
         v = (v_ini, v1, v_end)
         return a, t, v
 
+    ###########################################################################
+    # Array versions of the functions above.
+    ###########################################################################
+    # The following functions solve the same problems as the functions above,
+    # but for arrays of motions at once (the arguments are broadcast against
+    # each other). Instead of raising an exception for the motions that can
+    # not be solved, they return a mask with False for these motions (and the
+    # values returned for them are meaningless).
+
+    def end_speed_range_batch(self, v_ini, d_tot):
+        """Array version of end_speed_range.
+
+        Return the arrays with the minimum and maximum end speeds, and the
+        mask of valid motions.
+        """
+        v_ini, d_tot = numpy.broadcast_arrays(
+            numpy.asarray(v_ini, data_type), numpy.asarray(d_tot, data_type))
+        with numpy.errstate(invalid='ignore'):
+            root_min = numpy.sqrt(v_ini**2 - 2 * d_tot * self.decceleration)
+            root_max = numpy.sqrt(v_ini**2 + 2 * d_tot * self.acceleration)
+        negative = d_tot < 0
+        # See end_speed_range for the different cases.
+        v_end_min = numpy.where(
+            negative, -root_min,
+            numpy.where(v_ini**2 < 2 * d_tot * self.decceleration,
+                        0.0, root_min))
+        v_end_max = numpy.where(negative, v_end_min, root_max)
+        v_end_max = numpy.minimum(v_end_max, self.speed)
+        valid = numpy.isfinite(v_end_min) & numpy.isfinite(v_end_max)
+        return v_end_min, v_end_max, valid
+
+    def init_speed_range_batch(self, v_end, d_tot):
+        """Array version of init_speed_range.
+
+        Return the arrays with the minimum and maximum initial speeds, and the
+        mask of valid motions.
+        """
+        v_end, d_tot = numpy.broadcast_arrays(
+            numpy.asarray(v_end, data_type), numpy.asarray(d_tot, data_type))
+        with numpy.errstate(invalid='ignore'):
+            root_min = numpy.sqrt(v_end**2 - 2 * d_tot * self.acceleration)
+            v_ini_max = numpy.sqrt(v_end**2 + 2 * d_tot * self.decceleration)
+        v_ini_min = numpy.where(v_end**2 < 2 * d_tot * self.acceleration,
+                                0.0, root_min)
+        valid = numpy.isfinite(v_ini_min) & numpy.isfinite(v_ini_max)
+        v_ini_max = numpy.minimum(v_ini_max, self.speed)
+        return v_ini_min, v_ini_max, valid
+
+    def max_end_speed_batch(self, v_ini, d_tot, t_tot):
+        """Array version of max_end_speed.
+
+        Return the array with the maximum end speeds, and the mask of valid
+        motions.
+        """
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            vm = 2 * numpy.asarray(d_tot, data_type) / t_tot - v_ini
+        valid = numpy.isfinite(vm)
+        return numpy.where(vm > 0.0, vm, 0.0), valid
+
+    def time_limit_batch(self, a1, a2, v0, v2, d):
+        """Array version of time_limit (a1 and a2 must be scalars)."""
+        # See time_limit.
+        t0 = (v2 - v0) / a1
+        k0 = a2 / a1
+        b2 = a1 * k0**2 + a2
+        b1 = 2 * (v0 * k0 + a1 * t0 * k0 + v2)
+        b0 = a1 * t0**2 + 2 * v0 * t0 - 2 * d
+        disc = b1**2 - 4 * b2 * b0
+        stop = disc < 0
+        with numpy.errstate(invalid='ignore'):
+            t2 = (-b1 + numpy.sqrt(disc)) / (2 * b2)
+        t1 = t0 + k0 * t2
+        # When the system reaches 0 speed, the time can be infinite.
+        t1 = numpy.where(stop, float('inf'), t1)
+        t2 = numpy.where(stop, 0.0, t2)
+        return t1, t2
+
+    def min_distance_batch(self, v_ini, v_end):
+        """Array version of min_distance."""
+        return numpy.where(
+            v_end > v_ini,
+            (v_ini + v_end) * (v_end - v_ini) / (2 * self.acceleration),
+            (v_ini + v_end) * (v_ini - v_end) / (2 * self.decceleration))
+
+    def max_speed_minimum_time_batch(self, v_ini, v_end, d_tot):
+        """Array version of max_speed_minimum_time."""
+        v_max = self.speed
+        t1 = numpy.where(numpy.fabs(v_ini - v_max) < EQUAL_SPEED,
+                         0.0, (v_max - v_ini) / self.acceleration)
+        t2 = numpy.where(numpy.fabs(v_end - v_max) < EQUAL_SPEED,
+                         0.0, (v_max - v_end) / self.decceleration)
+        d1 = 0.5 * (v_max + v_ini) * t1
+        d2 = 0.5 * (v_max + v_end) * t2
+        t12 = (d_tot - (d1 + d2)) / v_max
+        return t1 + t2 + t12
+
+    def profile_time_limits_batch(self, v_ini, v_end, d_tot):
+        """Array version of profile_time_limits.
+
+        Return the arrays with the minimum and maximum times, and the mask of
+        valid motions (False where profile_time_limits raises a
+        MinDistanceError).
+        """
+        v_ini, v_end, d_tot = numpy.broadcast_arrays(
+            numpy.asarray(v_ini, data_type), numpy.asarray(v_end, data_type),
+            numpy.asarray(d_tot, data_type))
+        # For negative distances, change the sign of all the values (see
+        # profile_time_limits).
+        sign = numpy.where(d_tot < 0, -1.0, 1.0)
+        v0 = sign * v_ini
+        v2 = sign * v_end
+        d = sign * d_tot
+        valid = d >= self.min_distance_batch(v0, v2) - ROUND_ERROR
+        a1 = self.acceleration
+        a2 = self.decceleration
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            t1_max, t2_max = self.time_limit_batch(-a2, -a1, v0, v2, d)
+            t1_min, t2_min = self.time_limit_batch(a1, a2, v0, v2, d)
+            t_max = t1_max + t2_max
+            v1 = v0 + t1_min * a1
+            t_min = numpy.where(v1 > self.speed,
+                                self.max_speed_minimum_time_batch(v0, v2, d),
+                                t1_min + t2_min)
+        return t_min, t_max, valid
+
+    def compute_profile_batch(self, v_ini, v_end, d_tot, t_tot):
+        """Array version of compute_profile.
+
+        Since the profiles can have one, two or three sections, all the
+        profiles are returned with three sections, where the sections not
+        needed have zero time and zero acceleration.
+
+        Return:
+          - Array (N x 3) with the acceleration of each section.
+          - Array (N x 3) with the time of each section.
+          - Array (N x 4) with the speed at the beginning of each section, and
+            at the end of the motion.
+          - The mask of valid motions (False where compute_profile raises an
+            error).
+        """
+        v_ini, v_end, d_tot, t_tot = numpy.broadcast_arrays(
+            *(numpy.asarray(v, data_type)
+              for v in (v_ini, v_end, d_tot, t_tot)))
+        valid = (v_ini >= 0) & (v_end >= 0) & \
+            (v_ini <= self.speed) & (v_end <= self.speed)
+        # For negative distances, change the sign of all the values (see
+        # compute_profile).
+        sign = numpy.where(d_tot < 0, -1.0, 1.0)
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            an, tn, vn, solved = self.profile_two_sections_batch(
+                sign * v_ini, sign * v_end, sign * d_tot, t_tot)
+        valid &= solved
+        # Check acceleration limits.
+        valid &= numpy.all(
+            numpy.where(an > 0, an <= self.acceleration + ROUND_ERROR,
+                        -an <= self.decceleration + ROUND_ERROR), axis=-1)
+        an *= sign[..., None]
+        vn *= sign[..., None]
+        return an, tn, vn, valid
+
+    def profile_two_sections_batch(self, v_ini, v_end, d_tot, t_tot):
+        """Array version of profile_two_sections.
+
+        This function includes the alternative profiles that
+        profile_two_sections can return (see compute_profile_batch for the
+        arrays returned).
+        """
+        shape = v_ini.shape
+        an = numpy.zeros(shape + (3,), data_type)
+        tn = numpy.zeros(shape + (3,), data_type)
+        vn = numpy.empty(shape + (4,), data_type)
+        vn[...] = v_end[..., None]
+        vn[..., 0] = v_ini
+        v_mean = d_tot / t_tot
+        valid = v_mean <= self.speed
+        # Normalize problem substracting initial velocity to all velocities
+        # (see profile_two_sections).
+        vm2 = 2 * (v_mean - v_ini)
+        ve = v_end - v_ini
+        one = numpy.fabs(vm2 - ve) < EQUAL_SPEED
+        k = numpy.where(vm2 > ve, self.decceleration / self.acceleration,
+                        self.acceleration / self.decceleration)
+        a0 = ve / t_tot
+        v0 = vm2 - ve
+        b2 = k * t_tot
+        b1 = ve - k * a0 * t_tot - v0 * (1 + k)
+        b0 = -a0 * ve
+        disc = numpy.sqrt(b1**2 - 4 * b2 * b0)
+        disc = numpy.where(vm2 < ve, -disc, disc)
+        a1 = (-b1 + disc) / (2 * b2)
+        t1 = v0 / (a1 - a0)
+        v1 = a1 * t1 + v_ini
+        # Two sections profile.
+        an[..., 0] = a1
+        an[..., 1] = -a1 * k
+        tn[..., 0] = t1
+        tn[..., 1] = t_tot - t1
+        vn[..., 1] = v1
+        solved = numpy.isfinite(v1)
+        # Alternative profiles, in the same order as in profile_two_sections.
+        over = solved & (v1 > self.speed)
+        end_max = over & (numpy.fabs(v_end - self.speed) < EQUAL_SPEED)
+        ini_max = over & ~end_max & \
+            (numpy.fabs(v_ini - self.speed) < EQUAL_SPEED)
+        three_max = over & ~end_max & ~ini_max
+        three_zero = solved & ~over & (v1 < 0.0)
+        # One section profile, with the end speed the maximum speed.
+        a, t = self.profile_one_section_batch(v_ini, self.speed, d_tot, t_tot)
+        an[end_max] = a[end_max]
+        tn[end_max] = t[end_max]
+        vn[end_max, 1:] = self.speed
+        # Same, inverting the time (see profile_two_sections).
+        a, t = self.profile_one_section_batch(v_end, self.speed, d_tot, t_tot)
+        an[ini_max, 0] = 0.0
+        an[ini_max, 1] = -a[ini_max, 0]
+        tn[ini_max, 0] = t[ini_max, 1]
+        tn[ini_max, 1] = t[ini_max, 0]
+        vn[ini_max, 0:2] = self.speed
+        # Three sections profiles.
+        a, t = self.profile_three_sections_max_batch(
+            v_ini, v_end, d_tot, t_tot)
+        an[three_max] = a[three_max]
+        tn[three_max] = t[three_max]
+        vn[three_max, 1] = self.speed
+        a, t = self.profile_three_sections_zero_batch(
+            v_ini, v_end, d_tot, t_tot)
+        an[three_zero] = a[three_zero]
+        tn[three_zero] = t[three_zero]
+        vn[three_zero, 1] = 0.0
+        # One section profile. Note that this is checked before computing the
+        # two sections profile, so that it is valid even if the other one can
+        # not be computed.
+        an[one] = 0.0
+        an[one, 0] = (ve / t_tot)[one]
+        tn[one] = 0.0
+        tn[one, 0] = t_tot[one]
+        vn[one, 1] = v_end[one]
+        solved = (solved | one) & valid
+        solved &= numpy.all(numpy.isfinite(an), axis=-1) & \
+            numpy.all(numpy.isfinite(tn), axis=-1)
+        return an, tn, vn, solved
+
+    def profile_one_section_batch(self, v_ini, v_end, d_tot, t_tot):
+        """Array version of profile_one_section (accelerations and times)."""
+        v_aux = v_end - v_ini
+        d_aux = d_tot - v_ini * t_tot
+        t1 = 2 * (v_aux * t_tot - d_aux) / v_aux
+        a1 = v_aux / t1
+        zero = numpy.zeros_like(t1)
+        return (numpy.stack((a1, zero, zero), -1),
+                numpy.stack((t1, t_tot - t1, zero), -1))
+
+    def profile_three_sections_max_batch(self, v_ini, v_end, d_tot, t_tot):
+        """Array version of profile_three_sections_max."""
+        v_max = self.speed - v_ini
+        v_end = v_end - v_ini
+        d_tot = d_tot - v_ini * t_tot
+        k = self.decceleration / self.acceleration
+        k1 = (v_max - v_end) / v_max
+        k2 = ((v_max + v_end) * t_tot - 2 * d_tot) / v_max
+        k3 = - k * v_max / (v_max - v_end)
+        k4 = -k3 * t_tot
+        t2 = (k4 - k2) / (k1 - k3)
+        t1 = k1 * t2 + k2
+        a0 = v_max / t1
+        return (numpy.stack((a0, numpy.zeros_like(a0), -k * a0), -1),
+                numpy.stack((t1, t2 - t1, t_tot - t2), -1))
+
+    def profile_three_sections_zero_batch(self, v_ini, v_end, d_tot, t_tot):
+        """Array version of profile_three_sections_zero."""
+        k = self.decceleration / self.acceleration
+        t0 = 2 * d_tot * v_ini / (k * v_end**2 + v_ini**2)
+        t2 = (k * v_end + v_ini) * t0 / v_ini - t0
+        t1 = t_tot - t0 - t2
+        a2 = v_ini / (k * t0)
+        return (numpy.stack((-k * a2, numpy.zeros_like(a2), a2), -1),
+                numpy.stack((t0, t1, t2), -1))
+
     ###########################################################################
 
     # def compute_three_sections(self, v_ini, v_end, d_tot, t_tot):
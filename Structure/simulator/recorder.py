@@ -0,0 +1,206 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to record the simulation of the structure without any graphics.
+
+The data is stored in columnar arrays (one row per sample), that are saved at
+the end of the simulation in only one call, instead of writing one line per
+sample to a set of csv files (see Graphics.draw). The data saved is the same
+as the one saved by the graphics module:
+  - time: Time of the sample.
+  - pose: (N x 3) Position of the structure (horizontal, vertical and
+    inclination, see Pose). Together with the position of the actuators,
+    this is the state needed to draw the structure again (see
+    graphics.render).
+  - actuators: (N x 5) Position of the actuators (see Base.actuator_positions).
+  - wheels: (N x 4 x 2) Position of the wheels (see Base.wheel_positions).
+  - speeds: (N x 4) Horizontal speed of the wheels.
+  - instruction: Number of the instruction that was being simulated (0 for
+    the initial position of the structure).
+
+"""
+
+import os
+
+import numpy
+
+from simulator import control
+
+
+class Recorder:
+    """Store the position of the structure for each sample."""
+
+    def __init__(self, sample_time, capacity=1024):
+        """Constructor:
+
+        Arguments:
+        sample_time -- Sample time of the simulator, to compute the speed of
+          the wheels.
+        capacity -- Number of samples allocated initially. If more samples are
+          recorded, the arrays are enlarged (doubling its size).
+        """
+        self.sample_time = sample_time
+        self.time = numpy.empty(capacity)
+        self.pose = numpy.empty((capacity, 3))
+        self.actuators = numpy.empty((capacity, 5))
+        self.wheels = numpy.empty((capacity, 4, 2))
+        self.instruction = numpy.empty(capacity, dtype=numpy.int64)
+        # Number of samples recorded so far.
+        self.samples = 0
+
+    def reserve(self, samples):
+        """Make room for the given number of new samples."""
+        required = self.samples + samples
+        capacity = len(self.time)
+        if required <= capacity:
+            return
+        while capacity < required:
+            capacity *= 2
+        self.time = numpy.resize(self.time, capacity)
+        self.pose = numpy.resize(self.pose, (capacity, 3))
+        self.actuators = numpy.resize(self.actuators, (capacity, 5))
+        self.wheels = numpy.resize(self.wheels, (capacity, 4, 2))
+        self.instruction = numpy.resize(self.instruction, capacity)
+
+    def record(self, structure, counter, instruction):
+        """Record the current position of the structure.
+
+        Arguments:
+        structure -- Structure to record.
+        counter -- Number of samples simulated (see Simulator.counter).
+        instruction -- Number of the instruction being simulated.
+        """
+        self.reserve(1)
+        n = self.samples
+        self.time[n] = counter * self.sample_time
+        position = structure.position
+        self.pose[n] = (position.horizontal, position.vertical,
+                        position.inclination)
+        self.actuators[n] = structure.actuator_positions()
+        self.wheels[n] = structure.wheel_positions()
+        self.instruction[n] = instruction
+        self.samples += 1
+
+    def record_trajectory(self, structure, trajectory, instruction):
+        """Record all the samples of an instruction at once.
+
+        Arguments:
+        structure -- Structure simulated.
+        trajectory -- Dictionary returned by Simulator.simulate_trajectory.
+        instruction -- Number of the instruction simulated.
+        """
+        if trajectory is None:
+            return
+        samples = len(trajectory['time'])
+        self.reserve(samples)
+        n = slice(self.samples, self.samples + samples)
+        self.time[n] = trajectory['time']
+        self.pose[n, 0] = trajectory['horizontal']
+        self.pose[n, 1] = trajectory['vertical']
+        self.pose[n, 2] = trajectory['inclination']
+        self.actuators[n, 0:4] = trajectory['actuators']
+        # Actuator 9 is the inclination of the structure (see
+        # Base.get_actuator_L9).
+        self.actuators[n, 4] = trajectory['inclination']
+        # The trajectory gives the center of the wheels, but the position
+        # recorded is the one of the joints of the actuators (see
+        # Base.wheel_positions).
+        height = numpy.array([a.HEIGHT for a in structure.actuators()])
+        self.wheels[n] = trajectory['wheels']
+        self.wheels[n, :, 1] += height + trajectory['actuators']
+        self.instruction[n] = instruction
+        self.samples += samples
+
+    def data(self):
+        """Return a dictionary with the arrays recorded so far.
+
+        The arrays returned are views of the internal arrays, with only the
+        samples recorded.
+        """
+        n = self.samples
+        wheels = self.wheels[:n]
+        # Speed of the wheels, computed in the same way as in Graphics.draw.
+        speeds = numpy.zeros((n, 4))
+        speeds[1:] = (wheels[1:, :, 0] - wheels[:-1, :, 0]) / \
+            self.sample_time
+        return {
+            'time': self.time[:n],
+            'pose': self.pose[:n],
+            'actuators': self.actuators[:n],
+            'wheels': wheels,
+            'speeds': speeds,
+            'instruction': self.instruction[:n]}
+
+    def save(self, file_name, mmap=False):
+        """Save the data recorded.
+
+        Arguments:
+        file_name -- Name of the file. If mmap is True, name of a directory
+          where each array is saved in its own .npy file (the directory is
+          created if it does not exist).
+        mmap -- If False, save all the arrays in one .npz file. If True, save
+          each array in a .npy file, that can be loaded with
+          numpy.load(name, mmap_mode='r') without reading it completely.
+        """
+        data = self.data()
+        if not mmap:
+            numpy.savez(file_name, **data)
+            return
+        try:
+            os.makedirs(file_name)
+        except FileExistsError:
+            # If the directory already exits, do nothing.
+            pass
+        for key, value in data.items():
+            numpy.save(os.path.join(file_name, key + ".npy"), value)
+
+
+def record_simulation(structure, simulator, recorder, vectorized=False):
+    """Simulate the structure until it completes the stair.
+
+    This is the same loop as the automatic mode of main_loop, but without any
+    graphics. Each sample is stored in the recorder.
+
+    Arguments:
+    structure -- Structure to simulate.
+    simulator -- Simulator object to use (see Simulator).
+    recorder -- Recorder object where store the samples.
+    vectorized -- If True, simulate each instruction at once (see
+      Simulator.simulate_trajectory). If False, simulate each sample (see
+      Simulator.simulate_step).
+
+    Return True if the structure completes the stair, and False if the
+    control module can not find an instruction to continue.
+
+    Raise a RuntimeError if the simulation fails.
+    """
+    # Record the initial position of the structure.
+    recorder.record(structure, simulator.counter, 0)
+    instruction_number = 0
+    while True:
+        instruction, st_aux = control.next_instruction(structure)
+        if instruction is None:
+            return False
+        stop_distance = simulator.stop_distance(instruction)
+        next_instructions = control.compute_distance(st_aux, stop_distance)
+        simulator.compute_time(instruction, next_instructions)
+        instruction_number += 1
+        if vectorized:
+            trajectory = simulator.simulate_trajectory(structure, instruction)
+            recorder.record_trajectory(structure, trajectory,
+                                       instruction_number)
+        else:
+            for __ in simulator.simulate_step(structure, instruction):
+                recorder.record(structure, simulator.counter,
+                                instruction_number)
+        if instruction.get("end", False):
+            return True
+        # Substitute the simulated structure by the one returned by the control
+        # module (see main_loop).
+        structure = st_aux
+
+###############################################################################
+# End of file.
+###############################################################################
@@ -0,0 +1,123 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to reject designs of the structure that can not cross a stair, without
+simulating the motion (see time.compute_time).
+
+Each check only uses the dimensions of the structure and the stair, and is
+computed for a whole array of designs at once. The checks are conservative,
+that is, a design rejected can not cross the stair, but a design accepted may
+still fail when simulated. For this, all the comparisons allow the same
+margin (MAX_GAP) that the wheels and the actuators allow when the structure is
+simulated (see physics.wheel_state).
+
+"""
+
+import numpy
+
+from structure.base import Base
+from physics.wheel_state import MAX_GAP
+
+# Reasons of the failure, in the same format as sweep.evaluate_design.
+CONFIGURATION = \
+    "ConfigurationError: The dimensions of the structure are incorrect"
+LANDING = "ValueError: Landing too short for the structure"
+RISER = "ValueError: Actuators too short for the risers"
+TREAD = "ValueError: Wheels too large for the treads"
+REASONS = (CONFIGURATION, LANDING, RISER, TREAD)
+
+
+def stair_steps(stair):
+    """Return the width of the treads and the height of the risers.
+
+    The first riser is the one at the end of the landing, and the tread i is
+    the one above the riser i (the last one is the final landing).
+    """
+    corners = numpy.array(stair.STAIR, float)
+    risers = numpy.diff(corners[:, 1], prepend=0.0)[:-1]
+    treads = numpy.diff(corners[:, 0])
+    return treads, risers
+
+
+def screen_designs(designs, stair):
+    """Check which designs can not cross a stair.
+
+    Arguments:
+    designs -- Dictionary with an array for each dimension (the keys are
+      sweep.DESIGN_KEYS). All the arrays must have the same shape (or one
+      that can be broadcast).
+    stair -- Stair to cross.
+
+    Return the mask of the designs that pass all the checks, and a dictionary
+    with the mask of the designs that fail each check (the keys are the
+    REASONS).
+    """
+    size = {k: numpy.asarray(designs[k], float) for k in
+            ('a', 'b', 'c', 'd', 'h', 'v', 'g', 'n')}
+    wheels = {k: numpy.asarray(designs[k], float) for k in
+              ('r1', 'r2', 'r3', 'r4')}
+    shape = numpy.broadcast(*size.values(), *wheels.values()).shape
+    treads, risers = stair_steps(stair)
+    a, b, c, d = size['a'], size['b'], size['c'], size['d']
+    width = a + b + c
+    # Base raises a ConfigurationError (see max_inclination).
+    max_incline, valid = Base.max_inclination_batch(size, wheels)
+    # The structure starts with all the wheels on the landing, so the front
+    # wheel must not reach the first riser (when going downstairs, the wheel
+    # can be beyond the edge of the landing).
+    if risers.size > 0 and risers[0] > 0:
+        landing = width + wheels['r4'] > stair.STAIR[0][0] + MAX_GAP
+    else:
+        landing = numpy.zeros(shape, bool)
+    # When a wheel crosses a riser, the other wheel of its pair must be on
+    # the ground, so the height of the riser must be reached with the
+    # actuators (the difference between them can not be greater than d) plus
+    # the inclination of the structure between the two wheels.
+    with numpy.errstate(divide='ignore', invalid='ignore'):
+        lift = d + max_incline * numpy.minimum(a, c) / width
+    riser = numpy.abs(risers).max(initial=0.0) > lift + MAX_GAP
+    # A wheel that can not be lifted two risers at once must stand on the
+    # tread between them, and so, it must fit in the tread.
+    tread = numpy.zeros(shape, bool)
+    radius = numpy.maximum(numpy.maximum(wheels['r1'], wheels['r2']),
+                           numpy.maximum(wheels['r3'], wheels['r4']))
+    for k in range(risers.size - 1):
+        tread |= (radius > treads[k] + MAX_GAP) & \
+            (abs(risers[k]) + abs(risers[k + 1]) > lift + MAX_GAP)
+    # The rest of checks are meaningless for not valid dimensions.
+    configuration = ~valid
+    reasons = {
+        CONFIGURATION: configuration,
+        LANDING: landing & valid,
+        RISER: riser & valid,
+        TREAD: tread & valid}
+    feasible = ~(configuration | landing | riser | tread)
+    return feasible, reasons
+
+
+def screen_list(designs, stair):
+    """Check a list of designs (see screen_designs).
+
+    Arguments:
+    designs -- List of designs (dictionaries, see sweep.DESIGN_KEYS).
+    stair -- Stair to cross.
+
+    Return a list with the reason of the failure for each design (None if the
+    design passes all the checks).
+    """
+    if not designs:
+        return []
+    arrays = {key: [design[key] for design in designs] for key in designs[0]}
+    feasible, reasons = screen_designs(arrays, stair)
+    result = [None] * len(designs)
+    # Report the first check failed by each design.
+    for reason in reversed(REASONS):
+        for n in numpy.flatnonzero(reasons[reason]):
+            result[n] = reason
+    return result
+
+###############################################################################
+# End of file.
+###############################################################################
@@ -9,6 +9,7 @@ Step by step simulator of structure motion.
 # from math import floor
 from simulator.profiles import SpeedProfile, AccelerationProfile
 from enum import Enum
+import numpy
 
 # Returning value after a step simulation.
 
@@ -341,8 +342,6 @@ class Simulator():
         # sample time), but also we can use the program without simulating.
         # For this reason, it is safer to update the current speed here.
         self.current_speed = self.end_speed
-        # For the vertical time, only the current instruction is needed.
-        actuator_time = self.compute_actuator_time(instruction)
         # Get the horizontal distance to move from the instruction.
         distance = instruction['advance']
         
@@ -363,6 +362,18 @@ class Simulator():
             # above, reduce it to the maximum possible speed.
             if collision_speed < end_speed:
                 end_speed = collision_speed
+        self.compute_profile(instruction, end_speed)
+
+    def compute_profile(self, instruction, end_speed):
+        """Compute the speed profile of the instruction for the end speed.
+
+        The end speed can still be reduced if the actuators need more time
+        than the horizontal motion (see compute_time). The time and profile
+        are stored in the instruction, and the end speed in the simulator.
+
+        """
+        actuator_time = self.compute_actuator_time(instruction)
+        distance = instruction['advance']
         # Once the end speed is known, we can compute the total time needed to
         # complete the horizontal motion.
         horizontal_time, __ = self.profile.profile_time_limits(
@@ -398,6 +409,72 @@ class Simulator():
         # simulation, since due to rounding errors, can be slightly different.
         self.end_speed = end_speed
 
+    def plan_speeds(self, instructions):
+        """Compute the time for a complete list of instructions.
+
+        This function gives the same result as calling compute_time for each
+        instruction, but instead of checking, for each instruction, the next
+        instructions within the stop distance (see check_collision), the
+        limits are computed only once for the whole list:
+        - Backward pass: the maximum speed at the beginning of each
+          instruction, so that the structure can deccelerate to fulfill the
+          limits of all the following instructions (the time required by the
+          actuators, negative distances and the end of the list, where the
+          structure must stop).
+        - Forward pass: the end speed for each instruction, accelerating as
+          much as possible, but without exceeding the above limits.
+        The time and profile of each instruction are stored in the own
+        instruction, as in compute_time.
+
+        Return the total time.
+
+        """
+        # Maximum speed at the beginning of each instruction. The last value
+        # corresponds to the end of the list, where the structure must stop.
+        limits = [0.0] * (len(instructions) + 1)
+        for index in range(len(instructions) - 1, -1, -1):
+            instruction = instructions[index]
+            distance = instruction['advance']
+            if distance < 0:
+                # The structure must stop before a negative distance (see
+                # check_collision).
+                continue
+            # Speed from which the structure can deccelerate to the limit of
+            # the next instruction.
+            __, speed = self.profile.init_speed_range(
+                limits[index + 1], distance)
+            # Speed from which the structure can not complete the instruction
+            # before the actuators, even using the maximum decceleration (see
+            # check_collision).
+            actuator_time = self.compute_actuator_time(instruction)
+            if actuator_time > 0.0:
+                mean_speed = distance / actuator_time
+                speed_delta = 0.5 * self.profile.decceleration * actuator_time
+                if speed_delta < mean_speed:
+                    time_speed = mean_speed + speed_delta
+                else:
+                    __, time_speed = self.profile.init_speed_range(
+                        0.0, distance)
+                if time_speed < speed:
+                    speed = time_speed
+            limits[index] = speed
+
+        total_time = 0.0
+        for index, instruction in enumerate(instructions):
+            # See compute_time.
+            self.current_speed = self.end_speed
+            distance = instruction['advance']
+            if distance < 0:
+                end_speed = 0.0
+            else:
+                __, end_speed = self.profile.end_speed_range(
+                    self.current_speed, distance)
+                if limits[index + 1] < end_speed:
+                    end_speed = limits[index + 1]
+            self.compute_profile(instruction, end_speed)
+            total_time += instruction['time']
+        return total_time
+
     def simulate_step(self, structure, instruction):
         """Simulate one instruction step by step.
 
@@ -549,6 +626,119 @@ class Simulator():
             # iterations, the sample time must be the system sample time.
             sample_time = self.sample_time
 
+    def simulate_trajectory(self, structure, instruction):
+        """Simulate one instruction at once.
+
+        This function is equivalent to simulate_step, but instead of moving
+        the structure sample by sample, it computes the positions for all the
+        samples of the instruction as arrays, checks all of them at once (see
+        Base.check_trajectory), and then moves the structure to the last
+        position.
+
+        Arguments:
+        structure -- Actual structure to simulate.
+        instruction -- Instruction to simulate (see compute_time).
+
+        Return a dictionary with the following arrays (one row per sample):
+          - time: Time of the sample (see get_time).
+          - speed: Horizontal speed of the structure.
+          - horizontal, vertical, inclination: Position of the structure.
+          - actuators: (N x 4) Position of each actuator.
+          - wheels: (N x 4 x 2) Coordinates of the center of each wheel.
+        If the instruction is shorter than a sample, return None.
+
+        Raise a RuntimeError if any of the positions is not valid. In this
+        case, the structure is not moved.
+        """
+        total_time = instruction['time']
+        # See simulate_step for the computation of the number of samples.
+        self.last_time = self.next_time
+        self.current_time = self.last_time
+        self.next_time += total_time
+        prev_iter = int(self.last_time / self.sample_time)
+        next_iter = int(self.next_time / self.sample_time)
+        total_iter = next_iter - prev_iter
+        if total_iter <= 0:
+            return None
+        sample_time = self.sample_time * (prev_iter + 1) - self.last_time
+
+        # Get vertical displacements.
+        elevate = instruction.get('elevate', 0.0)
+        incline = instruction.get('incline', 0.0)
+        wheel = instruction.get('main', {}).get('wheel', None)
+        shift = instruction.get('main', {}).get('shift', 0.0)
+        wh_aux = instruction.get('second', {}).get('wheel', None)
+        sh_aux = instruction.get('second', {}).get('shift', 0.0)
+        # Get horizontal displacements.
+        time_offset = self.sample_time - sample_time
+        dynamics = instruction['dynamics']
+        current_speed = dynamics['speeds'][0]
+        __, speed, position = self.profile.plot_dynamics(
+            current_speed, dynamics['accelerations'],
+            dynamics['intervals'], self.sample_time, time_offset)
+        motion = position[1:total_iter + 1] - position[0:total_iter]
+        speed = speed[0:total_iter]
+
+        # Fraction of the instruction completed at each sample. Remember that
+        # the first sample is shorter than the rest (see simulate_step).
+        steps = numpy.full(total_iter, self.sample_time)
+        steps[0] = sample_time
+        fraction = numpy.cumsum(steps) / total_time
+        # Position of the structure at each sample.
+        horizontal = structure.position.horizontal + numpy.cumsum(motion)
+        vertical = structure.position.vertical + elevate * fraction
+        inclination = structure.position.inclination + incline * fraction
+        # Position of the actuators at each sample. The actuators that are not
+        # given in the instruction move with the structure, so that their
+        # wheels remain in the same position (see Base.elevate and
+        # Base.incline). Note that the rear actuator is fixed when inclining.
+        actuators = structure.actuators()
+        rates = [elevate + incline * a.JOINT.relative_position
+                 for a in actuators]
+        if wheel is not None:
+            rates[wheel] = shift
+        if wh_aux is not None:
+            rates[wh_aux] = sh_aux
+        shifts = numpy.array([a.d for a in actuators]) + \
+            numpy.outer(fraction, rates)
+
+        valid, wheels = structure.check_trajectory(
+            horizontal, vertical, inclination, shifts)
+        if not numpy.all(valid):
+            raise RuntimeError("Can not move structure.")
+
+        # Move the structure to the last position. The actuators given in the
+        # instruction are not moved when inclining, but all at once when
+        # elevating.
+        actuator_incline = 4 * [None]
+        actuator_elevate = 4 * [None]
+        for index in (wheel, wh_aux):
+            if index is not None:
+                actuator_incline[index] = 0.0
+                actuator_elevate[index] = shifts[-1, index] - \
+                    actuators[index].d
+        structure.advance(horizontal[-1] - structure.position.horizontal,
+                          check=False)
+        structure.incline(incline * fraction[-1], actuator_incline,
+                          check=False)
+        structure.elevate(elevate * fraction[-1], actuator_elevate,
+                          check=False)
+        if not structure.check_position():
+            raise RuntimeError("Can not move structure.")
+
+        time = (self.counter + numpy.arange(1, total_iter + 1)) * \
+            self.sample_time
+        self.counter += total_iter
+        self.current_speed = speed[-1]
+        return {
+            'time': time,
+            'speed': speed,
+            'horizontal': horizontal,
+            'vertical': vertical,
+            'inclination': inclination,
+            'actuators': shifts,
+            'wheels': wheels}
+
     def simulate_instruction(self, structure, instruction):
         """Complete a list of instructions in one step."""
         if instruction is None:
@@ -0,0 +1,129 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to compute the time to cross a set of stairs for one design of the
+structure (see time.compute_time).
+
+A design must be able to cross any kind of stair, not only the one given in
+the settings file. The stairs of a suite are evaluated in a pool of
+processes, where the design and the simulator data are sent only once to each
+process, and the results are summarized to compare designs (worst and mean
+time, and number of stairs crossed).
+
+"""
+
+import multiprocessing
+
+import numpy
+
+from physics.stairs import Stair
+from simulator.sweep import evaluate_design
+
+# Default suite, with the stairs shown in the README (stairs with steps up and
+# down at the same time, like obstacles, are not supported by the simulator).
+# Each element is the list of stairs and the landing (see Stair).
+STAIR_SUITE = {
+    'up': ([{'N': 5, 'w': 280.0, 'h': 175.0, 'd': 1000.0}], 1000.0),
+    'down': ([{'N': 5, 'w': 280.0, 'h': -175.0, 'd': 1000.0}], 1000.0),
+    'different_up': ([
+        {'N': 1, 'w': 250.0, 'h': 150.0, 'd': 0.0},
+        {'N': 1, 'w': 300.0, 'h': 180.0, 'd': 0.0},
+        {'N': 1, 'w': 280.0, 'h': 120.0, 'd': 0.0},
+        {'N': 1, 'w': 260.0, 'h': 170.0, 'd': 1000.0}], 1000.0),
+    'different_down': ([
+        {'N': 1, 'w': 250.0, 'h': -150.0, 'd': 0.0},
+        {'N': 1, 'w': 300.0, 'h': -180.0, 'd': 0.0},
+        {'N': 1, 'w': 280.0, 'h': -120.0, 'd': 0.0},
+        {'N': 1, 'w': 260.0, 'h': -170.0, 'd': 1000.0}], 1000.0),
+    'double_up': ([
+        {'N': 3, 'w': 280.0, 'h': 175.0, 'd': 1000.0},
+        {'N': 3, 'w': 280.0, 'h': 175.0, 'd': 1000.0}], 1000.0),
+    'double_down': ([
+        {'N': 3, 'w': 280.0, 'h': -175.0, 'd': 1000.0},
+        {'N': 3, 'w': 280.0, 'h': -175.0, 'd': 1000.0}], 1000.0)}
+
+
+###############################################################################
+# Functions run in the processes of the pool.
+###############################################################################
+# Data common to all the stairs, created once for each process.
+_worker_data = {}
+
+
+def _init_worker(design, suite, dynamics_data, sample_data):
+    _worker_data['design'] = design
+    _worker_data['suite'] = suite
+    _worker_data['dynamics'] = dynamics_data
+    _worker_data['sample'] = sample_data
+
+
+def _evaluate(name):
+    stairs_list, landing = _worker_data['suite'][name]
+    total_time, error = evaluate_design(
+        _worker_data['design'], Stair(stairs_list, landing),
+        _worker_data['dynamics'], _worker_data['sample'])
+    return name, total_time, error
+###############################################################################
+
+
+def evaluate_suite(design, dynamics_data, sample_data, suite=None,
+                   workers=None):
+    """Compute the time to cross each stair of a suite for a design.
+
+    Arguments:
+    design -- Dimensions of the structure (see sweep.DESIGN_KEYS).
+    dynamics_data, sample_data -- Simulator data (see Simulator).
+    suite -- Dictionary with the stairs to cross. The keys are the names of
+      the stairs, and the values, the list of stairs and the landing (see
+      Stair). If None, use STAIR_SUITE.
+    workers -- Number of processes. If None, use all the cpus. If 1, the
+      stairs are evaluated in this process.
+
+    Return a dictionary with the following keys:
+    - times: dictionary with the time for each stair (None if the design can
+      not cross the stair).
+    - errors: dictionary with the reason of the failure for each stair (None
+      if the design crosses the stair).
+    - feasible: number of stairs that the design can cross.
+    - worst: maximum time of all the stairs (infinite if the design can not
+      cross some of them).
+    - mean: mean time of the stairs that the design can cross (None if it can
+      not cross any of them).
+    """
+    if suite is None:
+        suite = STAIR_SUITE
+    init_data = (design, suite, dynamics_data, sample_data)
+    if workers == 1:
+        pool = None
+        _init_worker(*init_data)
+        results = map(_evaluate, suite)
+    else:
+        pool = multiprocessing.Pool(workers, _init_worker, init_data)
+        # The time for each stair is very different, so the stairs are sent
+        # one by one.
+        results = pool.imap_unordered(_evaluate, suite)
+    times = {}
+    errors = {}
+    try:
+        for name, total_time, error in results:
+            times[name] = total_time
+            errors[name] = error
+    finally:
+        if pool is not None:
+            pool.terminate()
+    # Keep the order of the suite.
+    times = {name: times[name] for name in suite}
+    errors = {name: errors[name] for name in suite}
+    crossed = [t for t in times.values() if t is not None]
+    return {
+        'times': times,
+        'errors': errors,
+        'feasible': len(crossed),
+        'worst': max(crossed) if len(crossed) == len(times) else float('inf'),
+        'mean': float(numpy.mean(crossed)) if crossed else None}
+
+###############################################################################
+# End of file.
+###############################################################################
@@ -0,0 +1,286 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to compute the time to cross a stair for a large number of designs of
+the structure (see time.compute_time).
+
+A design is a dictionary with all the dimensions of the structure and the
+radius of the wheels (the keys of the size and wheels dictionaries of Base,
+see DESIGN_KEYS). The designs are evaluated in a pool of processes, and the
+results are written to a csv file as soon as they are computed, so that the
+results are not lost if the sweep is interrupted.
+
+"""
+
+import collections
+import csv
+import itertools
+import multiprocessing
+
+from physics.stairs import Stair
+from structure.base import Base
+from simulator.simulator import Simulator
+from simulator.time import compute_time, TimeBudgetExceeded
+from simulator.watchdog import Watchdog, EvaluationStalled
+from simulator.evaluations import EvaluationCache, design_key
+from simulator.screen import screen_list
+
+# Number of designs checked at once before evaluating them (see
+# screen.screen_designs).
+SCREEN_BLOCK = 256
+
+# Keys of the size and wheels dictionaries of Base.
+SIZE_KEYS = ('a', 'b', 'c', 'd', 'h', 'v', 'g', 'n')
+WHEEL_KEYS = ('r1', 'r2', 'r3', 'r4')
+DESIGN_KEYS = SIZE_KEYS + WHEEL_KEYS
+
+
+def split_design(design):
+    """Return the size and wheels dictionaries for a design."""
+    size = {key: design[key] for key in SIZE_KEYS}
+    wheels = {key: design[key] for key in WHEEL_KEYS}
+    return size, wheels
+
+
+def grid_designs(size, wheels, ranges):
+    """Generate all the combinations of a set of dimensions.
+
+    Arguments:
+    size, wheels -- Dimensions of the base design (see Base).
+    ranges -- Dictionary with the values for each dimension to change. The
+      keys are any of DESIGN_KEYS, and the values, the sequence of values for
+      the dimension.
+    """
+    names = list(ranges)
+    for values in itertools.product(*(ranges[name] for name in names)):
+        design = dict(size)
+        design.update(wheels)
+        design.update(zip(names, values))
+        yield design
+
+
+def read_designs(file_name, size=None, wheels=None):
+    """Read a list of designs from a csv file.
+
+    The first row of the file must have the names of the dimensions (any of
+    DESIGN_KEYS). The dimensions not included in the file are taken from the
+    size and wheels dictionaries.
+    """
+    base = dict(size or {})
+    base.update(wheels or {})
+    with open(file_name, newline='') as f:
+        for row in csv.DictReader(f):
+            design = dict(base)
+            design.update((key, float(value)) for key, value in row.items()
+                          if key in DESIGN_KEYS)
+            yield design
+
+
+def read_seeds(file_name, size=None, wheels=None):
+    """Read the designs to start a search from (see optimizer.Optimizer).
+
+    The file has the same format as in read_designs. If it has a time column
+    (for instance, the output of sweep), the designs that can not cross the
+    stair (empty time) are discarded, and the rest are sorted from the
+    fastest to the slowest. Otherwise, the designs are returned in the order
+    of the file.
+    """
+    base = dict(size or {})
+    base.update(wheels or {})
+    designs = []
+    with open(file_name, newline='') as f:
+        reader = csv.DictReader(f)
+        timed = 'time' in reader.fieldnames
+        for row in reader:
+            if timed and not row['time']:
+                continue
+            design = dict(base)
+            design.update((key, float(value)) for key, value in row.items()
+                          if key in DESIGN_KEYS)
+            designs.append((float(row['time']) if timed else 0.0, design))
+    # The sort is stable, so the order of the file is kept without times.
+    designs.sort(key=lambda item: item[0])
+    return [design for __, design in designs]
+
+
+def evaluate_design(design, stair, dynamics_data, sample_data,
+                    time_budget=None, limits=None):
+    """Compute the time to cross the stair for a design.
+
+    Arguments:
+    design -- Dimensions of the structure (see DESIGN_KEYS).
+    stair -- Stair to cross.
+    dynamics_data, sample_data -- Simulator data (see Simulator).
+    time_budget -- See time.compute_time.
+    limits -- Optional dictionary with the limits of the computation (the
+      arguments of watchdog.Watchdog).
+
+    Return the time (None if the design can not cross the stair), and the
+    reason of the failure (None if the design crosses the stair).
+    """
+    size, wheels = split_design(design)
+    try:
+        structure = Base(size, wheels, stair)
+        simulator = Simulator(dynamics_data, sample_data)
+        watchdog = None if limits is None else Watchdog(**limits)
+        return compute_time(structure, simulator, time_budget=time_budget,
+                            watchdog=watchdog), None
+    except (ValueError, RuntimeError, TimeBudgetExceeded,
+            EvaluationStalled) as error:
+        # ConfigurationError (not valid dimensions) and the rest of errors are
+        # ValueError (the stair can not be crossed), except RuntimeError (some
+        # error within the code, that should be checked), TimeBudgetExceeded
+        # (the design is too slow) and EvaluationStalled (the control module
+        # does not progress).
+        return None, "%s: %s" % (type(error).__name__, error)
+
+
+###############################################################################
+# Functions run in the processes of the pool. They are also used by the pool
+# of optimizer.Optimizer.
+###############################################################################
+# Data common to all the designs, created once for each process.
+_worker_data = {}
+
+
+def init_worker(stairs_list, landing, dynamics_data, sample_data, cache,
+                limits=None):
+    """Prepare a process of the pool to evaluate designs.
+
+    The arguments are the common data of the designs (see sweep). The
+    stair and the cache are created once for each process.
+    """
+    _worker_data['stair'] = Stair(stairs_list, landing)
+    _worker_data['dynamics'] = dynamics_data
+    _worker_data['sample'] = sample_data
+    _worker_data['cache'] = None if cache is None else EvaluationCache(cache)
+    _worker_data['limits'] = limits
+
+
+def evaluate_worker(design, time_budget=None):
+    """Evaluate a design in a process prepared by init_worker.
+
+    Return the design, the time, the reason of the failure (see
+    evaluate_design), and whether the result was found in the cache.
+    """
+    args = (design, _worker_data['stair'], _worker_data['dynamics'],
+            _worker_data['sample'], time_budget, _worker_data['limits'])
+    cache = _worker_data['cache']
+    if cache is None:
+        total_time, error = evaluate_design(*args)
+        return design, total_time, error, False
+    size, wheels = split_design(design)
+    key = design_key(size, wheels, *args[1:4])
+    total_time, error, cached = cache.evaluate(key, evaluate_design, *args)
+    return design, total_time, error, cached
+
+
+def evaluate_budget(args):
+    """Call evaluate_worker with a (design, time_budget) tuple (for
+    Pool.map, see optimizer.Optimizer)."""
+    return evaluate_worker(*args)
+###############################################################################
+
+
+def plausible_designs(designs, stair, rejected):
+    """Generate the designs that pass the checks of screen.screen_designs.
+
+    The designs rejected are added to the rejected deque, along with the
+    reason of the failure.
+    """
+    designs = iter(designs)
+    while True:
+        block = list(itertools.islice(designs, SCREEN_BLOCK))
+        if not block:
+            return
+        for design, reason in zip(block, screen_list(block, stair)):
+            if reason is None:
+                yield design
+            else:
+                rejected.append((design, None, reason, False))
+
+
+def merge_results(results, rejected):
+    """Generate the results of the pool and the designs rejected."""
+    for result in results:
+        while rejected:
+            yield rejected.popleft()
+        yield result
+    # Designs rejected after the last design evaluated.
+    while rejected:
+        yield rejected.popleft()
+
+
+def sweep(designs, stairs_list, landing, dynamics_data, sample_data,
+          output, workers=None, chunksize=1, cache=None, screen=True,
+          limits=None):
+    """Compute the time to cross the stair for a list of designs.
+
+    Arguments:
+    designs -- Iterable of designs (see grid_designs and read_designs).
+    stairs_list, landing -- Stair definition (see Stair).
+    dynamics_data, sample_data -- Simulator data (see Simulator).
+    output -- Name of the csv file where write the results. Each row has the
+      dimensions of the design, the time (empty if the design fails) and the
+      reason of the failure (empty if the design crosses the stair). The rows
+      are written as the designs are evaluated, so they are not in the same
+      order as the designs.
+    workers -- Number of processes. If None, use all the cpus. If 1, the
+      designs are evaluated in this process.
+    chunksize -- Number of designs sent to a process at once.
+    cache -- Optional name of the file where the results are stored (see
+      evaluations.EvaluationCache). The designs found in the file are not
+      evaluated again.
+    screen -- If True, the designs that can not cross the stair because of
+      their dimensions are rejected without evaluating them (see
+      screen.screen_designs). These designs are not stored in the cache.
+    limits -- Optional limits of the computation for each design (see
+      evaluate_design). The designs that reach a limit fail with an
+      EvaluationStalled error, and are not stored in the cache.
+
+    Return the number of designs evaluated, the number of them that can not
+    cross the stair, and the number of them found in the cache.
+    """
+    evaluated = 0
+    failed = 0
+    cached_designs = 0
+    init_data = (stairs_list, landing, dynamics_data, sample_data, cache,
+                 limits)
+    # Designs rejected by the screen. The designs are read by the pool in
+    # other thread, so a deque is used to share them.
+    rejected = collections.deque()
+    if screen:
+        designs = plausible_designs(designs, Stair(stairs_list, landing),
+                                    rejected)
+    with open(output, "w", newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(DESIGN_KEYS + ('time', 'error'))
+        if workers == 1:
+            pool = None
+            init_worker(*init_data)
+            results = map(evaluate_worker, designs)
+        else:
+            pool = multiprocessing.Pool(workers, init_worker, init_data)
+            results = pool.imap_unordered(evaluate_worker, designs, chunksize)
+        try:
+            for design, total_time, error, cached in merge_results(
+                    results, rejected):
+                evaluated += 1
+                if error is not None:
+                    failed += 1
+                if cached:
+                    cached_designs += 1
+                writer.writerow([design[key] for key in DESIGN_KEYS] + [
+                    "" if total_time is None else repr(total_time),
+                    "" if error is None else error])
+                f.flush()
+        finally:
+            if pool is not None:
+                pool.terminate()
+    return evaluated, failed, cached_designs
+
+###############################################################################
+# End of file.
+###############################################################################
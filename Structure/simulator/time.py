@@ -13,15 +13,116 @@ here. Remenber that all the exceptions returned but the RunTimeError are
 produced because the system can not complete the motion. Only RunTimeError
 exceptions means some error within the code that must be corrected.
 
+When a time budget is given, the computation can also finish with a
+TimeBudgetExceeded exception, if the structure surely needs more time than the
+budget to cross the stair (see remaining_time_bound). When a watchdog is
+given, it can finish with an EvaluationStalled exception, if the control
+module needs too much computation for the structure (see simulator.watchdog).
+
 """
 
 from simulator.control import next_instruction, compute_distance
+from simulator.plan import compute_plan
+
+
+class TimeBudgetExceeded(Exception):
+    """The time to cross the stair is larger than the time budget.
+
+    Note that this is not a ValueError, since the structure may be able to
+    cross the stair (it just needs too much time).
+    """
+
+    def __init__(self, elapsed, bound):
+        super().__init__("Time budget exceeded: %f + %f" % (elapsed, bound))
+        # Time of the instructions computed, and lower bound of the time
+        # needed to complete the rest of the stair.
+        self.elapsed = elapsed
+        self.bound = bound
+
+
+def remaining_time_bound(structure, simulator, final_vertical):
+    """Lower bound of the time needed to complete the stair.
+
+    The time of each instruction is the maximum of the time needed for the
+    horizontal motion and the time needed by the actuators (see
+    Simulator.compute_profile). So, the total time can not be less than the
+    time needed for any of these motions alone, at the maximum speed:
+      - The rear wheel has to get beyond the last step.
+      - The structure has to get to the height of the end of the stair.
+      - The structure has to get horizontal again.
+
+    Arguments:
+    structure -- Current structure.
+    simulator -- Simulator with the dynamics of the structure.
+    final_vertical -- Vertical position of the structure when the stair is
+      completed (the initial position plus the height of the stair).
+    """
+    stair = structure.STAIRS.STAIR
+    bound = 0.0
+    if len(stair) > 1:
+        # Horizontal position of the last step. Note that the position of the
+        # structure is the position of the center of the rear wheel.
+        distance = stair[-2][0] - structure.REAR.REAR.WHEEL.RADIUS - \
+            structure.position.horizontal
+        if distance > 0.0:
+            bound = distance / simulator.profile.speed
+    # Time to elevate and incline the structure (see
+    # Simulator.compute_actuator_time).
+    for distance in (final_vertical - structure.position.vertical,
+                     -structure.position.inclination):
+        if distance > 0.0:
+            actuator_time = distance / simulator.speed_elevate_up
+        else:
+            actuator_time = -distance / simulator.speed_elevate_dw
+        if actuator_time > bound:
+            bound = actuator_time
+    return bound
 
 
-def compute_time(structure, simulator):
+def compute_time(structure, simulator, plans=None, planner=False,
+                 time_budget=None, watchdog=None):
     """Compute the time required to complete a stair.
 
+    Arguments:
+    structure -- Structure to move.
+    simulator -- Simulator with the dynamics of the structure.
+    plans -- Optional simulator.plan.PlanCache object. If given, the
+      instructions are taken from the cache (and computed only the first time
+      for each structure and stair), so that the control module is not run
+      when computing the time for the same structure with other dynamics.
+    planner -- If True, compute the speeds for the whole list of instructions
+      at once (see Simulator.plan_speeds), instead of checking the next
+      instructions within the stop distance for each instruction.
+    time_budget -- If given, raise a TimeBudgetExceeded exception as soon as
+      the time of the instructions computed plus a lower bound of the time
+      for the rest of the stair is larger than this value (see
+      remaining_time_bound). This allows to discard a structure without
+      computing the whole stair.
+    watchdog -- Optional simulator.watchdog.Watchdog object, to limit the
+      number of instructions, the number of positions checked and the time
+      spent computing the instructions.
+
     """
+    if watchdog is not None:
+        # The watchdog is only used for this computation, so the previous one
+        # is set back at the end.
+        previous = structure.watchdog
+        structure.watchdog = watchdog
+        try:
+            with watchdog:
+                return compute_time(structure, simulator, plans, planner,
+                                    time_budget)
+        finally:
+            structure.watchdog = previous
+    if planner or plans is not None:
+        if plans is not None:
+            plan, complete = plans.get_plan(structure)
+        else:
+            plan, complete = compute_plan(structure)
+        return compute_plan_time(plan, complete, simulator, planner,
+                                 time_budget)
+    # Vertical position at the end of the stair (see remaining_time_bound).
+    final_vertical = structure.position.vertical + structure.STAIRS.height()
     total_time = 0.0
     # List of instructions to complete the stair. This is a FIFO queue. In
     # general, to execute a instruction, we need more instructions, just for
@@ -61,7 +162,68 @@ def compute_time(structure, simulator):
             # When the instruction includes the key "end", that means that we
             # have complete the stair.
             break
-        # Return the total number of iterations needed.
+        if time_budget is not None:
+            bound = remaining_time_bound(structure, simulator, final_vertical)
+            if total_time + bound > time_budget:
+                raise TimeBudgetExceeded(total_time, bound)
+    if time_budget is not None and total_time > time_budget:
+        raise TimeBudgetExceeded(total_time, 0.0)
+    # Return the total number of iterations needed.
+    return total_time
+
+
+def compute_plan_time(plan, complete, simulator, planner=False,
+                      time_budget=None):
+    """Compute the time required to complete a list of instructions.
+
+    The result is the same as compute_time, but the instructions are already
+    computed (see simulator.plan.compute_plan).
+
+    Arguments:
+    plan -- List of instructions. The list is not modified (the times and
+      speed profiles are stored in copies of the instructions).
+    complete -- If False, the last instruction does not complete the stair.
+    simulator -- Simulator with the dynamics of the structure.
+    planner, time_budget -- See compute_time.
+
+    """
+    # Copy the instructions, since the simulator stores its own values within
+    # the instruction.
+    instructions = [dict(instruction) for instruction in plan]
+    if time_budget is not None:
+        # Since all the instructions are known, the lower bound for the time
+        # of each instruction is the time needed for its own motions at the
+        # maximum speed (see remaining_time_bound). bounds[n] is the bound
+        # for the instructions from n to the end.
+        bounds = [0.0] * (len(instructions) + 1)
+        for index in range(len(instructions) - 1, -1, -1):
+            instruction = instructions[index]
+            bounds[index] = bounds[index + 1] + max(
+                abs(instruction['advance']) / simulator.profile.speed,
+                simulator.compute_actuator_time(instruction))
+        if bounds[0] > time_budget:
+            raise TimeBudgetExceeded(0.0, bounds[0])
+    if planner:
+        total_time = simulator.plan_speeds(instructions)
+    else:
+        total_time = 0.0
+        for index, instruction in enumerate(instructions):
+            # Get the instructions needed to cover the stop distance (see
+            # control.compute_distance).
+            stop_distance = simulator.stop_distance(instruction)
+            last = index + 1
+            while stop_distance > 0 and last < len(instructions):
+                stop_distance -= instructions[last].get('advance', 0.0)
+                last += 1
+            simulator.compute_time(instruction, instructions[index + 1:last])
+            total_time += instruction['time']
+            if time_budget is not None and \
+                    total_time + bounds[index + 1] > time_budget:
+                raise TimeBudgetExceeded(total_time, bounds[index + 1])
+    if not complete:
+        raise ValueError("Stair can not be crossed")
+    if time_budget is not None and total_time > time_budget:
+        raise TimeBudgetExceeded(total_time, 0.0)
     return total_time
 
 ###############################################################################
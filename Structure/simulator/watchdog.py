@@ -0,0 +1,105 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to stop the computation of the instructions for a structure that does
+not progress along the stair.
+
+For some dimensions of the structure, the control module can compute very
+small instructions (that never get to the end of the stair), or spend a lot
+of time checking positions before finding that an instruction is not valid.
+The watchdog counts the instructions computed and the positions checked, and
+raises an EvaluationStalled exception when any of them, or the time spent,
+reaches its limit.
+
+The watchdog is stored in the structure, and shared by all its copies (see
+Base.fork), so that all the work done for a structure is counted. It only
+counts within a with statement, so that the same structure can be simulated
+or moved by hand without limits:
+
+    structure.watchdog = Watchdog(max_instructions=1000)
+    with structure.watchdog:
+        instruction, structure = next_instruction(structure)
+
+"""
+
+import time
+
+
+class EvaluationStalled(Exception):
+    """The structure has reached one of the limits of the watchdog.
+
+    Note that this is not a ValueError, since the structure may be able to
+    cross the stair (it just needs too much computation).
+    """
+
+    def __init__(self, limit, value):
+        super().__init__("Limit of %s reached: %s" % (limit, value))
+        # Name of the limit reached (see Watchdog), and value of the counter.
+        self.limit = limit
+        self.value = value
+
+
+class Watchdog:
+    """Limits for the computation of the instructions for a structure."""
+
+    def __init__(self, max_instructions=None, max_checks=None,
+                 max_wall_time=None):
+        """Constructor:
+
+        Arguments:
+        max_instructions -- Maximum number of instructions computed by the
+          control module (see control.next_instruction).
+        max_checks -- Maximum number of positions checked (see
+          Base.check_position).
+        max_wall_time -- Maximum time (seconds).
+        Any of the limits can be None, which means that there is no limit.
+        """
+        self.max_instructions = max_instructions
+        self.max_checks = max_checks
+        self.max_wall_time = max_wall_time
+        self.active = False
+        self.instructions = 0
+        self.checks = 0
+        self.start_time = None
+
+    def __enter__(self):
+        """Reset the counters, and start counting."""
+        self.instructions = 0
+        self.checks = 0
+        self.start_time = time.monotonic()
+        self.active = True
+        return self
+
+    def __exit__(self, *args):
+        self.active = False
+
+    def instruction(self):
+        """Count a new instruction."""
+        if not self.active:
+            return
+        self.instructions += 1
+        if self.max_instructions is not None and \
+                self.instructions > self.max_instructions:
+            raise EvaluationStalled("instructions", self.instructions)
+        self.check_time()
+
+    def check(self):
+        """Count a new position checked."""
+        if not self.active:
+            return
+        self.checks += 1
+        if self.max_checks is not None and self.checks > self.max_checks:
+            raise EvaluationStalled("checks", self.checks)
+        self.check_time()
+
+    def check_time(self):
+        if self.max_wall_time is not None:
+            elapsed = time.monotonic() - self.start_time
+            if elapsed > self.max_wall_time:
+                raise EvaluationStalled("wall time", elapsed)
+
+###############################################################################
+# End of file.
+###############################################################################
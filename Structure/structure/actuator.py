@@ -7,6 +7,7 @@ Definition of the actuator connecting the wheel to the main base.
 """
 
 from enum import Enum
+import copy
 
 from numpy import int as cv_datatype
 import cv2
@@ -56,6 +57,10 @@ class WheelActuator:
         # Current position and state of the linear actuator.
         self.d = 0.0
         self.state = ActuatorState.LowerBound
+        # Set to True whenever the actuator is shifted, so that its pair knows
+        # that the actuator must be checked again (see
+        # ActuatorPair.check_collision).
+        self.dirty = True
         # Valid range of the actuator.
         self.LENGTH = length
         # Total length (from upper joint to the floor).
@@ -67,6 +72,37 @@ class WheelActuator:
         # place in a valid position. If false, it raise a ValueError exception.
         self.WHEEL = Wheel(radius, margin, stairs, self.JOINT.position(height))
 
+    def fork(self, structure_position):
+        """Return a copy of the actuator (see Base.fork).
+
+        The copy has its own position and state, but shares the dimensions of
+        the actuator.
+
+        Arguments:
+        structure_position -- Position of the new structure the copy belongs
+            to.
+        """
+        new = copy.copy(self)
+        new.JOINT = self.JOINT.fork(structure_position)
+        new.WHEEL = self.WHEEL.fork()
+        return new
+
+    def save_state(self):
+        """Return the current state of the actuator and its wheel.
+
+        See Base.begin.
+        """
+        return self.d, self.state, self.WHEEL.state, self.WHEEL.step
+
+    def restore_state(self, saved):
+        """Set the actuator and its wheel back to a saved state.
+
+        Arguments:
+        saved -- Value returned by save_state.
+        """
+        self.d, self.state, self.WHEEL.state, self.WHEEL.step = saved
+        self.dirty = True
+
     def shift_actuator(self, distance):
         """Shift the actuator and check if the motion is valid.
 
@@ -91,6 +127,7 @@ class WheelActuator:
         # The calling function MUST check the position, using check_actuator
         # function.
         self.d += distance
+        self.dirty = True
         if self.d < -MAX_GAP:
             # The actuator get out of the lower bound (not valid).
             self.state = ActuatorState.ExitLowerBound
@@ -185,10 +222,27 @@ class WheelActuator:
 
         return ActuatorError(a_err, v_err, h_err)
 
-    def ground(self):
-        """Return True if its ending wheel is lying on the ground."""
+    def ground(self, update=True):
+        """Return True if its ending wheel is lying on the ground.
+
+        If update is False, the state of the wheel is not modified (see
+        Wheel.ground).
+        """
+        position = self.JOINT.position(self.HEIGHT + self.d)
+        return self.WHEEL.ground(position, update)
+
+    def vertical_clearance(self):
+        """Return the distance the ending wheel can go down."""
+        position = self.JOINT.position(self.HEIGHT + self.d)
+        return self.WHEEL.vertical_clearance(position)
+
+    def horizontal_clearance(self, direction):
+        """Return the distances the ending wheel can move horizontally.
+
+        See Stair.horizontal_clearance.
+        """
         position = self.JOINT.position(self.HEIGHT + self.d)
-        return self.WHEEL.ground(position)
+        return self.WHEEL.horizontal_clearance(position, direction)
 
     # =========================================================================
     # Control functions.
@@ -11,16 +11,18 @@ Definition of all the elements which composes the structure:
 
 from math import asin, sqrt
 from enum import Enum
+import copy
 
 # NOTE: Sometimes opencv changes the data type for drawing function. So it is
 # better to import the correct data type this way.
 from numpy import int as cv_datatype
+import numpy
 import cv2
 
 from structure.actuator import WheelActuator
 from structure.pair import ActuatorPair
 from simulator.error_distance import InclinationError, StructureError
-from physics.wheel_state import MAX_GAP
+from physics.wheel_state import WheelState, MAX_GAP
 
 
 # State of the structure acording to its maximum inclination.
@@ -31,6 +33,19 @@ class StructureState(Enum):
     InclinationExit = 3
 
 
+# Element that limits a motion (see the query functions in Base).
+class MotionLimit(Enum):
+    """Possible limits for a motion of the structure."""
+    # An actuator reaches one of its bounds.
+    Actuator = 1
+    # A wheel collides with the stair.
+    Wheel = 2
+    # A pair of wheels gets unstable.
+    Pair = 3
+    # The structure reaches its maximum inclination.
+    Inclination = 4
+
+
 HOR_MARGIN = 0.0
 VER_MARGIN = 0.0
 
@@ -62,6 +77,10 @@ class Pose():
         # Note that the width is a constant.
         self.__WIDTH = width
         self.__INTERNAL = internal
+        # Set to True whenever the position changes, so that the structure
+        # knows that all the wheels must be checked again (see
+        # Base.check_position).
+        self.dirty = True
 
     def get_horizontal(self):
         return self.__horizontal
@@ -85,12 +104,32 @@ class Pose():
     # only by adding a new value to the current one.
     def add_horizontal(self, value):
         self.__horizontal += value
+        self.dirty = True
 
     def add_vertical(self, value):
         self.__vertical += value
+        self.dirty = True
 
     def add_inclination(self, value):
         self.__inclination += value
+        self.dirty = True
+
+    def copy(self):
+        """Return a new object with the same position."""
+        return Pose(self.__horizontal, self.__vertical, self.__inclination,
+                    self.__WIDTH, self.__INTERNAL)
+
+    def restore(self, saved):
+        """Set the position back to the one stored in a copy of this object.
+
+        NOTE: This is the only way to set the position directly, and it is
+        intended only to undo motions (see Base.rollback) and to draw again
+        a recorded position (see Base.set_state).
+        """
+        self.__horizontal = saved.horizontal
+        self.__vertical = saved.vertical
+        self.__inclination = saved.inclination
+        self.dirty = True
 
     def __sub__(self, prev):
 
@@ -156,6 +195,9 @@ class Base:
         if debug is not None:
             self.DEBUG = debug
         self.STAIRS = stairs
+        # Keep the dimensions, to identify the structure (see fingerprint).
+        self.SIZE = dict(size)
+        self.WHEELS = dict(wheels)
         # Main distances of the structure.
         a = size['a']
         b = size['b']
@@ -205,6 +247,51 @@ class Base:
         # Set the state of the structure to normal, since the initial
         # inclination is 0, so the structure is not on it inclination limit.
         self.state = StructureState.InclinationNormal
+        # Stack of saved states, to undo motions (see begin function).
+        self.journal = []
+        # Last inclination error computed (see check_position function).
+        self.inclination_error = None
+        # Optional watchdog to limit the computation for this structure (see
+        # simulator.watchdog). It is shared by all the copies of the
+        # structure.
+        self.watchdog = None
+
+    def fork(self):
+        """Return a copy of the structure to simulate motions on it.
+
+        This is a cheap alternative to copy.deepcopy. The copy shares with
+        this object all the elements that never change (stairs, dimensions,
+        wheel radius, relative position of the joints, ...) and only
+        duplicates the current position of the structure and the state of
+        the actuators and wheels. So, any motion of the copy does not modify
+        this structure, and viceversa.
+
+        """
+        new = copy.copy(self)
+        new.position = self.position.copy()
+        # NOTE: The previous position is the same object as the position
+        # (see advance function).
+        if 'prev_pos' in self.__dict__:
+            new.prev_pos = new.position
+        new.REAR = self.REAR.fork(new.position)
+        new.FRNT = self.FRNT.fork(new.position)
+        new.journal = []
+        return new
+
+    def fingerprint(self):
+        """Return a value that identifies the structure and its position.
+
+        Two structures with the same fingerprint have the same dimensions,
+        are placed on the same stair and are in the same position, and so,
+        the control module computes the same instructions for both of them.
+
+        """
+        return (tuple(sorted(self.SIZE.items())),
+                tuple(sorted(self.WHEELS.items())),
+                tuple(self.STAIRS.STAIR),
+                (self.position.horizontal, self.position.vertical,
+                 self.position.inclination),
+                tuple(actuator.d for actuator in self.actuators()))
 
     def reset_position(self):
         """Place the structure in the initial position.
@@ -250,6 +337,33 @@ class Base:
             raise ConfigurationError(
                 "The dimensions of the structure are incorrect")
         return min([h1, h2, h3, h4])
+
+    @classmethod
+    def max_inclination_batch(cls, size, wheels):
+        """Array version of max_inclination.
+
+        The values of the size and wheels dictionaries can be arrays (all of
+        them with the same shape, or that can be broadcast). Return the array
+        with the maximum inclinations, and the mask of valid dimensions (the
+        dimensions for which max_inclination raises a ConfigurationError).
+        """
+        a, b, c, n = (numpy.asarray(size[k], float) for k in 'abcn')
+        r1, r2, r3, r4 = (numpy.asarray(wheels[k], float)
+                          for k in ('r1', 'r2', 'r3', 'r4'))
+        dims = list(size.values()) + list(wheels.values())
+        valid = numpy.ones(numpy.broadcast(*dims).shape, bool)
+        for dim in dims:
+            valid &= numpy.asarray(dim) >= 0
+        length = a + b + c
+        with numpy.errstate(divide='ignore', invalid='ignore'):
+            h1 = numpy.sqrt(a**2 - (r1 + r2)**2) * (length / a)
+            h2 = numpy.sqrt(b**2 - (r2 + r3)**2) * (length / b)
+            h3 = numpy.sqrt(c**2 - (r3 + r4)**2) * (length / c)
+        h = numpy.minimum(numpy.minimum(h1, h2), numpy.minimum(h3, n))
+        # Negative roots (ValueError in max_inclination) give nan, and null
+        # distances give nan or infinite values.
+        valid &= numpy.isfinite(h)
+        return h, valid
     ###########################################################################
     # MOTION FUNCTIONS
     ###########################################################################
@@ -263,6 +377,42 @@ class Base:
     # distance will be the required distance plus the distance returned by the
     # function.
 
+    # Note for the transaction functions:
+    # Instead of undoing a wrong motion by performing the inverse motion (and
+    # checking again the position), the motion functions save the state of
+    # the structure before moving, and restore it if the motion is not valid.
+    # This saves one check_position call, and the structure returns exactly to
+    # the same position (no rounding errors). The functions can be nested,
+    # and they can also be used outside this class to undo a set of motions.
+
+    def actuators(self):
+        """Return the four actuators, from the rear to the front."""
+        return self.REAR.REAR, self.REAR.FRNT, self.FRNT.REAR, self.FRNT.FRNT
+
+    def begin(self):
+        """Save the current state of the structure in the journal.
+
+        The state saved can be restored with the rollback function, or
+        discarded with the commit function.
+
+        """
+        self.journal.append((
+            self.position.copy(), self.state,
+            [actuator.save_state() for actuator in self.actuators()]))
+
+    def commit(self):
+        """Discard the last state saved (the motions done are kept)."""
+        self.journal.pop()
+
+    def rollback(self):
+        """Restore the last state saved, undoing the motions done since then.
+
+        """
+        position, self.state, actuators = self.journal.pop()
+        self.position.restore(position)
+        for actuator, saved in zip(self.actuators(), actuators):
+            actuator.restore_state(saved)
+
     def check_position(self):
         """General function to check the validity of the current position.
 
@@ -272,34 +422,109 @@ class Base:
         The function returns a StructureError object (see definition of this
         class).
 
+        NOTE: Only the elements that have moved since the last call are
+        checked again. If the structure has moved, all of them need to be
+        checked, but if only one actuator has been shifted, only its pair is
+        checked, and the rest of the results are reused.
+
         """
+        if self.watchdog is not None:
+            self.watchdog.check()
+        # Check if the structure has moved since the last check.
+        changed = self.position.dirty
         # Check if any wheel has collided with the stairs.
-        re_re, re_fr, re_pair = self.REAR.check_collision()
-        fr_re, fr_fr, fr_pair = self.FRNT.check_collision()
+        re_re, re_fr, re_pair = self.REAR.check_collision(changed)
+        fr_re, fr_fr, fr_pair = self.FRNT.check_collision(changed)
 
         # Check for possible collisions due to inclinations.
-
-        # Check if the maximum inclination (positive or negative) has been
-        # reached.
-        # Get differences in height between rear and front actuators.
-        __, y0 = self.REAR.REAR.JOINT.position(0)
-        __, y3 = self.FRNT.FRNT.JOINT.position(0)
-        # And check if the maximum distance has been reached. Note that this
-        # check must be done in both directions.
-        # If the limit has been reached, include this value in the collision
-        # object.
-        if y0 - y3 > self.MAX_INCLINE + MAX_GAP:
-            error = y0 - y3 - self.MAX_INCLINE
-        elif y3 - y0 > self.MAX_INCLINE + MAX_GAP:
-            error = y0 - y3 + self.MAX_INCLINE
-        else:
-            error = None
-        inclination = InclinationError(error)
+        # NOTE: The inclination only depends on the position of the structure,
+        # and not on the actuators.
+        if changed or self.inclination_error is None:
+            # Check if the maximum inclination (positive or negative) has been
+            # reached.
+            # Get differences in height between rear and front actuators.
+            __, y0 = self.REAR.REAR.JOINT.position(0)
+            __, y3 = self.FRNT.FRNT.JOINT.position(0)
+            # And check if the maximum distance has been reached. Note that
+            # this check must be done in both directions.
+            # If the limit has been reached, include this value in the
+            # collision object.
+            if y0 - y3 > self.MAX_INCLINE + MAX_GAP:
+                error = y0 - y3 - self.MAX_INCLINE
+            elif y3 - y0 > self.MAX_INCLINE + MAX_GAP:
+                error = y0 - y3 + self.MAX_INCLINE
+            else:
+                error = None
+            self.inclination_error = InclinationError(error)
+        inclination = self.inclination_error
+        # All the elements have been checked for the current position.
+        self.position.dirty = False
 
         actuators = (re_re, re_fr, fr_re, fr_fr)
         pairs = (re_pair, fr_pair)
         return StructureError(actuators, pairs, inclination)
 
+    def wheel_trajectory(self, horizontal, vertical, inclination, shifts):
+        """Compute the position of the wheels for a sequence of positions.
+
+        The structure is not moved.
+
+        Arguments:
+        horizontal, vertical, inclination -- Arrays (N) with the positions of
+          the structure (see Pose).
+        shifts -- Array (N x 4) with the position of each actuator.
+
+        Return an array (N x 4 x 2) with the coordinates of the center of each
+        wheel (see Joint.position).
+        """
+        width = self.position.WIDTH
+        angle = numpy.arcsin(inclination / width)
+        cos_angle = numpy.cos(angle)
+        sin_angle = numpy.sin(angle)
+        wheels = numpy.empty((len(horizontal), 4, 2))
+        for index, actuator in enumerate(self.actuators()):
+            offset = width * actuator.JOINT.relative_position
+            wheels[:, index, 0] = horizontal + offset * cos_angle
+            wheels[:, index, 1] = vertical - actuator.HEIGHT - \
+                shifts[:, index] + offset * sin_angle
+        return wheels
+
+    def check_trajectory(self, horizontal, vertical, inclination, shifts):
+        """Check the validity of a sequence of positions of the structure.
+
+        This is the same check as check_position, but for all the positions
+        at once, and without moving the structure. Only the validity is
+        computed, not the error distances.
+
+        Arguments: see wheel_trajectory.
+
+        Return an array (N) of booleans, True for the valid positions, and
+        the array with the positions of the wheels (see wheel_trajectory).
+        """
+        wheels = self.wheel_trajectory(horizontal, vertical, inclination,
+                                       shifts)
+        actuators = self.actuators()
+        samples = len(horizontal)
+        # Wheel collisions.
+        radius = numpy.array([a.WHEEL.RADIUS for a in actuators])
+        states, __, __ = self.STAIRS.check_collision_batch(
+            wheels.reshape(-1, 2), numpy.tile(radius, samples))
+        states = states.reshape(samples, 4)
+        valid = numpy.all(states != WheelState.Inside.value, axis=1)
+        # Bounds of the actuators (see WheelActuator.shift_actuator).
+        length = numpy.array([a.LENGTH for a in actuators])
+        valid &= numpy.all(shifts >= -MAX_GAP, axis=1)
+        valid &= numpy.all(shifts <= length + MAX_GAP, axis=1)
+        # At least one wheel of each pair in the ground (see
+        # ActuatorPair.check_stable).
+        ground = (states == WheelState.Ground.value) | \
+            (states == WheelState.Corner.value)
+        valid &= ground[:, 0] | ground[:, 1]
+        valid &= ground[:, 2] | ground[:, 3]
+        # Maximum inclination.
+        valid &= numpy.abs(inclination) <= self.MAX_INCLINE + MAX_GAP
+        return valid, wheels
+
     def advance(self, distance, check=True):
         """Advance the structure horizontally.
 
@@ -314,28 +539,24 @@ class Base:
         """
         # Get previous position for speed computation.
         self.prev_pos = self.position
-        # Update structure position
-        self.position.add_horizontal(distance)
         if not check:
-            # This option is called inside this function, so do not need to
-            # return any value as long as we take this into account bellow,
-            # where the function is called with check set to False.
+            # Update structure position, and return without checking the
+            # validity of the motion.
+            self.position.add_horizontal(distance)
             return
+        # Save the current state, to undo the motion if not valid.
+        self.begin()
+        # Update structure position
+        self.position.add_horizontal(distance)
 
         # From here on, check the validity of the motion.
         structure_position = self.check_position()
         if structure_position:
+            self.commit()
             return structure_position
         # Set the structure back to its original position.
-        # NOTE: When check is set to False, the function does not return any
-        # value, so leave the call without receiving any value.
-        self.advance(-distance, False)
-        # Check that everything is OK again.
-        if self.check_position():
-            return structure_position
-        # If we place the structure back to its original position, there should
-        # not be any error. If this error happens, it is a run time error.
-        raise RuntimeError("Error in advance structure")
+        self.rollback()
+        return structure_position
 
     def elevate(self, height, wheel=None, check=True):
         """Elevate (or take down) the whole structure.
@@ -356,6 +577,9 @@ class Base:
         """
         if wheel is None:
             wheel = 4 * [None]
+        if check:
+            # Save the current state, to undo the motion if not valid.
+            self.begin()
         # Elevate the structure,
         self.position.add_vertical(height)
         # and place the actuators in the correct position.
@@ -370,21 +594,12 @@ class Base:
         structure_position = self.check_position()
         if structure_position:
             # Everything is OK.
+            self.commit()
             return structure_position
 
         # Leave the structure in its original position.
-        # For the actuator motion, we have to change also the sign of the
-        # motion. Since some of tha values are None, we have to change only
-        # the not None values.
-        wheel_aux = [-w if (w is not None) else w for w in wheel]
-        self.elevate(-height, wheel_aux, False)
-        # Check that everything is OK again.
-        # NOTE: In this case, never a stability error can happen, and so, we
-        # need not collect the stability error.
-        if self.check_position():
-            return structure_position
-
-        raise RuntimeError("Error in elevate")
+        self.rollback()
+        return structure_position
 
     def incline(self, height, wheel=None, fixed=0, check=True):
         """Incline the base of the structure.
@@ -404,6 +619,9 @@ class Base:
         Return (see note above).
         """
 
+        if check:
+            # Save the current state, to undo the motion if not valid.
+            self.begin()
         # Get vertical coordinates of the outer joints to update structure
         # angle.
         current_inclination = self.position.inclination
@@ -419,6 +637,8 @@ class Base:
             # Note that, although this instruction also raises an error because
             # it overpass the maximum inclination, this error is raised before,
             # and so, it must be detected here.
+            if check:
+                self.rollback()
             if current_inclination + height > 0:
                 raise InclinationError(+self.MAX_INCLINE -
                                        current_inclination - height)
@@ -491,16 +711,12 @@ class Base:
         structure_position = self.check_position()
 
         if structure_position:
+            self.commit()
             return structure_position
 
         # Leave the structure in its original position.
-        wheel_aux = [-w if (w is not None) else w for w in wheel]
-        self.incline(-height, wheel_aux, fixed, False)
-        # Check that everything is OK again.
-        if self.check_position():
-            return structure_position
-
-        raise RuntimeError("Error in incline function")
+        self.rollback()
+        return structure_position
 
     def shift_actuator(self, index, height, check=True):
         """Shift one actuator independently.
@@ -513,6 +729,9 @@ class Base:
 
         Return (see note above).
         """
+        if check:
+            # Save the current state, to undo the motion if not valid.
+            self.begin()
         # Select the actuator to shift.
         if index == 0:
             self.REAR.shift_actuator(None, 0.0, height)
@@ -534,14 +753,12 @@ class Base:
         # The variable stb is for checking that, after elevating one wheel,
         # the other wheel of the pair is still in a stable position.
         if structure_position:
+            self.commit()
             return structure_position
 
         # Leave the actuator in its original position.
-        self.shift_actuator(index, -height, False)
-        # Check that everything is OK again.
-        if self.check_position():
-            return structure_position
-        raise RuntimeError("Error in shift actuator.")
+        self.rollback()
+        return structure_position
 
 ###############################################################################
 ###############################################################################
@@ -870,6 +1087,139 @@ class Base:
             raise RuntimeError
         return state4
 
+    # =========================================================================
+    # Query functions.
+    # =========================================================================
+    # These functions compute the maximum distance for a motion, without
+    # moving the structure, so that the planner does not need to try a motion,
+    # read the error and try again. All of them return the distance (with the
+    # same sign as the direction given), the index of the actuator that limits
+    # the motion (None if the limit is not an actuator), and the kind of limit
+    # (see MotionLimit). If nothing limits the motion, the distance is inf and
+    # both the index and the kind of limit are None. Neither the structure nor
+    # the state of its wheels are modified.
+
+    def max_shift(self, index, direction):
+        """Compute the maximum distance an actuator can be shifted.
+
+        Arguments:
+        index -- Index of actuator (0-3).
+        direction -- Positive to take the wheel down, negative to lift it
+            (see shift_actuator).
+        """
+        actuators = self.actuators()
+        actuator = actuators[index]
+        if direction > 0:
+            # The actuator can be shifted until its upper bound, or until the
+            # wheel touches the stair.
+            distance = actuator.LENGTH - actuator.d
+            limit = MotionLimit.Actuator
+            wheel = actuator.vertical_clearance()
+            if wheel < distance:
+                distance = wheel
+                limit = MotionLimit.Wheel
+            return distance, index, limit
+        # When lifting the wheel, if the wheel is in the ground, the other
+        # wheel of the pair must remain in the ground.
+        other = actuators[index ^ 1]
+        if actuator.ground(False) and not other.ground(False):
+            return 0.0, index, MotionLimit.Pair
+        # Otherwise, the actuator can be shifted until its lower bound.
+        return -actuator.d, index, MotionLimit.Actuator
+
+    def max_elevation(self, direction):
+        """Compute the maximum distance the structure can be elevated.
+
+        The wheels remain in the same position (see elevate), so that only
+        the bounds of the actuators limit the motion.
+
+        Arguments:
+        direction -- Positive to elevate, negative to take down.
+        """
+        distance = float('inf')
+        index = None
+        for i, actuator in enumerate(self.actuators()):
+            if direction > 0:
+                value = actuator.LENGTH - actuator.d
+            else:
+                value = actuator.d
+            if value < distance:
+                distance = value
+                index = i
+        return (distance if direction > 0 else -distance), index, \
+            MotionLimit.Actuator
+
+    def max_inclination_delta(self, fixed, direction):
+        """Compute the maximum height the structure can be inclined.
+
+        The wheels remain in the same position (see incline), so that the
+        motion is limited by the bounds of the actuators and the maximum
+        inclination of the structure.
+        NOTE: When inclining, the wheels also move horizontally, which can
+        make a wheel collide with a step. This is not taken into account here
+        (see incline_and_advance).
+
+        Arguments:
+        fixed -- Actuator that remains fixed (see incline).
+        direction -- Positive to elevate the front of the structure, negative
+            to elevate the rear.
+        """
+        sign = 1.0 if direction > 0 else -1.0
+        # Inclination limit.
+        distance = self.MAX_INCLINE - sign * self.position.inclination
+        index = None
+        limit = MotionLimit.Inclination
+        actuators = self.actuators()
+        fixed_position = actuators[fixed].JOINT.relative_position
+        for i, actuator in enumerate(actuators):
+            # Each actuator is shifted proportionally to its distance to the
+            # fixed actuator (see Joint.proportional_lift).
+            rate = sign * (actuator.JOINT.relative_position - fixed_position)
+            if rate > 0:
+                value = (actuator.LENGTH - actuator.d) / rate
+            elif rate < 0:
+                value = actuator.d / -rate
+            else:
+                continue
+            if value < distance:
+                distance = value
+                index = i
+                limit = MotionLimit.Actuator
+        return sign * distance, index, limit
+
+    def max_advance(self, direction):
+        """Compute the maximum distance the structure can advance.
+
+        The motion is limited by the first wheel that collides with a step,
+        and by the first pair in which both wheels get out of the ground.
+        NOTE: A wheel that is not in the ground is never considered to reach
+        the ground, and so, the distance can be shorter than the actual one.
+
+        Arguments:
+        direction -- Positive to move right, negative to move left.
+        """
+        distance = float('inf')
+        index = None
+        limit = None
+        actuators = self.actuators()
+        clearances = [a.horizontal_clearance(direction) for a in actuators]
+        for i, (wheel, __) in enumerate(clearances):
+            if wheel < distance:
+                distance = wheel
+                index = i
+                limit = MotionLimit.Wheel
+        for i in (0, 2):
+            # The pair remains stable until the last wheel in the ground gets
+            # out of it.
+            pair = [(clearances[j][1] if actuators[j].ground(False) else 0.0,
+                     j) for j in (i, i + 1)]
+            value, j = max(pair)
+            if value < distance:
+                distance = value
+                index = j
+                limit = MotionLimit.Pair
+        return (distance if direction > 0 else -distance), index, limit
+
     def get_motion(self, prev_structure):
         """Computes the motion between current structure and previous one.
 
@@ -1033,6 +1383,40 @@ class Base:
         x1, y1, x2, y2 = self.REAR.position(0)
         x3, y3, x4, y4 = self.FRNT.position(0)
         return (x1, y1), (x2, y2), (x3, y3), (x4, y4)
+
+    def set_state(self, pose, shifts):
+        """Place the structure in a given position.
+
+        This function is designed for representation purposes, to draw again
+        a position recorded during a simulation (see graphics.render). The
+        position is not checked, but the state of the structure, the
+        actuators and the wheels is updated, so that they are drawn in the
+        same way as in the simulation.
+
+        Arguments:
+        pose -- Horizontal position, vertical position and inclination of the
+          structure (see Pose).
+        shifts -- Position of the four actuators, from the rear to the front
+          (see get_actuator_position).
+
+        """
+        horizontal, vertical, inclination = (float(p) for p in pose)
+        self.position.restore(Pose(horizontal, vertical, inclination))
+        for actuator, shift in zip(self.actuators(), shifts):
+            # Set the position directly (instead of shifting the actuator the
+            # difference) so that the value is exactly the one given, and
+            # shift it 0 to update its state.
+            actuator.d = float(shift)
+            actuator.shift_actuator(0.0)
+        # Same states as computed when inclining the structure (see incline).
+        if abs(inclination) < self.MAX_INCLINE - MAX_GAP:
+            self.state = StructureState.InclinationNormal
+        elif abs(inclination) < self.MAX_INCLINE + MAX_GAP:
+            self.state = StructureState.InclinationLimit
+        else:
+            self.state = StructureState.InclinationExit
+        # Update the state of the wheels.
+        self.check_position()
     # =========================================================================
     # Drawing functions.
     # =========================================================================
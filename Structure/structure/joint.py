@@ -9,6 +9,7 @@ of an actuator according to the structure inclination.
 """
 
 from math import cos, sin, sqrt
+import copy
 
 from physics.wheel_state import MAX_GAP
 
@@ -29,6 +30,16 @@ class Joint:
         self.structure_position = structure_position
         self.relative_position = position / structure_position.WIDTH
 
+    def fork(self, structure_position):
+        """Return a copy of the joint attached to a new structure position.
+
+        Arguments:
+        structure_position -- Position of the new structure (see Base.fork).
+        """
+        new = copy.copy(self)
+        new.structure_position = structure_position
+        return new
+
     def position(self, height=0):
         """Return the (x, y) position of a given point along the actuator.
 
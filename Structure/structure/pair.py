@@ -24,6 +24,18 @@ class ActuatorPair:
         """
         self.REAR = rear
         self.FRNT = front
+        # Last result of the check_collision function.
+        self.checked = None
+
+    def fork(self, structure_position):
+        """Return a copy of the pair (see Base.fork).
+
+        Arguments:
+        structure_position -- Position of the new structure the copy belongs
+            to.
+        """
+        return ActuatorPair(self.REAR.fork(structure_position),
+                            self.FRNT.fork(structure_position))
 
     def shift_actuator(self, rear, front, height):
         """Shift the given actuator.
@@ -74,14 +86,22 @@ class ActuatorPair:
         else:
             self.FRNT.shift_actuator_proportional(height)
 
-    def check_collision(self):
+    def check_collision(self, changed=True):
         """Check if any of the wheels (or both) are in a forbidden position.
 
+        Arguments:
+        changed -- If False, the structure has not moved since the last call,
+            and so, if none of the actuators has been shifted either, the
+            last result is still valid, and it is returned again.
+
         Return:
           - ActuatorError object for the external actuator.
           - InternalActuatorError object for the internal actuator.
           - PairError object.
         """
+        if not changed and not self.REAR.dirty and not self.FRNT.dirty and \
+                self.checked is not None:
+            return self.checked
         # Check for possible wheel collisions.
         re_col = self.REAR.check_actuator()
         fr_col = self.FRNT.check_actuator()
@@ -114,7 +134,11 @@ class ActuatorPair:
             # Create a new object from the appropriate class.
             fr_col = InclineActuatorError(fr_col, fr_inc_error, fr_adv_inc)
 
-        return re_col, fr_col, re_pair
+        # Keep the result, until the pair is moved again.
+        self.REAR.dirty = False
+        self.FRNT.dirty = False
+        self.checked = re_col, fr_col, re_pair
+        return self.checked
 
         # # Add the inclination data to complete the information.
         # if self.REAR_PAIR:
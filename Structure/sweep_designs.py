@@ -0,0 +1,96 @@
+"""
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Module to compute the time to cross the stair for a set of designs of the
+structure, using all the cpus (see simulator.sweep).
+
+The stair, dynamics and the base design are read from the settings file. The
+designs are built changing some of the dimensions of the base design, either
+with ranges given in the command line, or reading them from a csv file.
+
+Examples:
+    python sweep_designs.py settings.xml results.csv a=100:200:10 r1=30,40,50
+    python sweep_designs.py settings.xml results.csv --designs designs.csv
+
+"""
+
+import argparse
+
+import numpy
+
+from simulator.sweep import sweep, grid_designs, read_designs, DESIGN_KEYS
+import readXML
+
+
+def parse_range(text):
+    """Read a dimension range: name=start:stop:step or name=v1,v2,..."""
+    name, values = text.split("=")
+    if name not in DESIGN_KEYS:
+        raise argparse.ArgumentTypeError("Unknown dimension " + name)
+    if ":" in values:
+        start, stop, step = (float(v) for v in values.split(":"))
+        # Include the last value of the range.
+        values = numpy.arange(start, stop + 0.5 * step, step).tolist()
+    else:
+        values = [float(v) for v in values.split(",")]
+    return name, values
+
+
+parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[2])
+parser.add_argument("settings", nargs="?", default="settings.xml")
+parser.add_argument("output", nargs="?", default="sweep.csv")
+parser.add_argument("ranges", nargs="*", type=parse_range,
+                    help="Dimensions to change: name=start:stop:step or "
+                    "name=v1,v2,...")
+parser.add_argument("--designs", help="csv file with the designs")
+parser.add_argument("--workers", type=int, default=None,
+                    help="Number of processes (default: all the cpus)")
+parser.add_argument("--chunksize", type=int, default=8,
+                    help="Number of designs sent to a process at once")
+parser.add_argument("--cache", default=None,
+                    help="File where store the results, to reuse them")
+parser.add_argument("--no-screen", dest="screen", action="store_false",
+                    help="Evaluate also the designs rejected by the "
+                    "geometric checks (see simulator.screen)")
+parser.add_argument("--max-instructions", type=int, default=None,
+                    help="Maximum number of instructions for each design")
+parser.add_argument("--max-checks", type=int, default=None,
+                    help="Maximum number of positions checked for each "
+                    "design")
+parser.add_argument("--max-time", type=float, default=None,
+                    help="Maximum time (seconds) for each design")
+args = parser.parse_args()
+
+# Read stairs data.
+stairs_list, landing = readXML.read_stairs(args.settings)
+# Read the base design.
+__, structure_size, wheels_radius = readXML.read_structure(args.settings)
+# Read simulator data.
+dynamics_data, sample_data = readXML.read_dynamics(args.settings)
+# Limits of the computation for each design, from the settings file, or from
+# the command line.
+limits = readXML.read_limits(args.settings) or {}
+for key, value in (('max_instructions', args.max_instructions),
+                   ('max_checks', args.max_checks),
+                   ('max_wall_time', args.max_time)):
+    if value is not None:
+        limits[key] = value
+
+if args.designs is not None:
+    designs = read_designs(args.designs, structure_size, wheels_radius)
+else:
+    designs = grid_designs(structure_size, wheels_radius, dict(args.ranges))
+
+evaluated, failed, cached = sweep(
+    designs, stairs_list, landing, dynamics_data, sample_data, args.output,
+    args.workers, args.chunksize, args.cache, args.screen, limits or None)
+print("Designs:", evaluated, "Failed:", failed)
+if args.cache is not None:
+    print("Found in cache: %i (%.1f%%)" %
+          (cached, 100.0 * cached / max(evaluated, 1)))
+
+###############################################################################
+# End of file.
+###############################################################################
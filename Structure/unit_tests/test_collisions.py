@@ -6,6 +6,8 @@ Test stairs constructor.
 
 import unittest
 
+import numpy
+
 from physics import stairs, wheel
 
 
@@ -68,6 +70,33 @@ class CollisionTest(unittest.TestCase):
         self.assertTrue(wheel_test.contact(),
                         "Error: Wheel not in contact after correction")
 
+    def testCollisionBatch(self):
+        """Check that the batch functions give the same result as the single
+        wheel functions.
+        """
+        landing = 100.0
+        stair_list = [
+            {'N': 3, 'd': 0.0, 'w': 50.0, 'h': +25.0},
+            {'N': 3, 'd': 250.0, 'w': 60.0, 'h': -20.0}
+        ]
+        stairs_test = stairs.Stair(stair_list, landing)
+        # Grid of wheel positions, including positions beyond the stair.
+        x, y = numpy.meshgrid(numpy.arange(-10.0, 700.0, 0.5),
+                              numpy.arange(-80.0, 120.0, 2.5))
+        points = numpy.column_stack((x.ravel(), y.ravel()))
+        radii = numpy.resize((15.0, 20.0, 8.0), points.shape[0])
+
+        distances = stairs_test.get_distances_batch(points, radii)
+        states, w, h = stairs_test.check_collision_batch(points, radii)
+        for n, (p, r) in enumerate(zip(points, radii)):
+            res = stairs_test.get_distances(p, r)
+            for k in range(5):
+                self.assertAlmostEqual(distances[k][n], res[k])
+            state, w_n, h_n = stairs_test.check_collision(p, r)
+            self.assertEqual(states[n], state.value)
+            self.assertAlmostEqual(w[n], w_n)
+            self.assertAlmostEqual(h[n], h_n)
+
 ###############################################################################
 # End of file.
 ###############################################################################
@@ -0,0 +1,116 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the copies of the structure (Base.fork), the motions undone when not
+valid (Base.begin and Base.rollback), and the checks of the elements moved
+since the last check (Base.check_position).
+'''
+import unittest
+
+from copy import deepcopy
+
+from physics.stairs import Stair
+from structure.base import Base
+
+
+class ForkTest(unittest.TestCase):
+
+    def setUp(self):
+        self.size = {
+            'a': 120.0,
+            'b': 150.0,
+            'c': 140.0,
+            'd': 100.0,
+            'h': 2.0,
+            'v': 2.0,
+            'g': 100.0,
+            'n': 100.0}
+        self.wheels = {
+            'r1': 25.0,
+            'r2': 25.0,
+            'r3': 25.0,
+            'r4': 25.0}
+        stair_list = [
+            {'N': 5, 'd': 1000.0, 'w': 250.0, 'h': -140.0}
+        ]
+        self.stair = Stair(stair_list, 500.0)
+        self.structure = Base(self.size, self.wheels, self.stair)
+
+    def motion(self, structure):
+        # Put the first wheel over the first step, and take it down until the
+        # actuator collides with the step (see test_push_actuator).
+        res = structure.advance(150)
+        self.assertTrue(res)
+        res = structure.push_actuator(3, 150)
+        self.assertFalse(res)
+        self.assertAlmostEqual(res.actuator(3), -15.8537, 4)
+
+    def test_fork(self):
+        # Check that the copy of the structure given by Base.fork behaves as
+        # a deep copy of the structure.
+        structure = self.structure
+        struct_fork = structure.fork()
+        struct_copy = deepcopy(structure)
+        self.motion(struct_fork)
+        self.motion(struct_copy)
+        # The original structure must remain in its initial position.
+        self.assertEqual(structure.position.horizontal, 0.0)
+        self.assertEqual(structure.get_inclination(), 0.0)
+        for index in range(4):
+            self.assertEqual(structure.get_actuator_position(index), 0.0)
+        # And the copy must be in the same position as the deep copy.
+        self.assertEqual(struct_fork.wheel_positions(),
+                         struct_copy.wheel_positions())
+        self.assertEqual(struct_fork.actuator_positions(),
+                         struct_copy.actuator_positions())
+        # The elements that never change are shared.
+        self.assertIs(struct_fork.STAIRS, structure.STAIRS)
+        self.assertIs(struct_fork.FRNT.FRNT.WHEEL.SIMULATOR, self.stair)
+
+    def test_rollback(self):
+        # Check that a not valid motion leaves the structure exactly in its
+        # previous position, and that rollback undoes a set of motions.
+        structure = self.structure
+        self.assertTrue(structure.advance(50.0))
+        wheels_before = structure.wheel_positions()
+        actuators_before = structure.actuator_positions()
+        # The front wheel falls down the first step.
+        res = structure.advance(1000.0)
+        self.assertFalse(res)
+        self.assertEqual(structure.wheel_positions(), wheels_before)
+        self.assertEqual(structure.actuator_positions(), actuators_before)
+        self.assertEqual(structure.journal, [])
+        # Undo a set of valid motions.
+        structure.begin()
+        self.assertTrue(structure.elevate(50.0))
+        self.assertTrue(structure.advance(20.0))
+        structure.rollback()
+        self.assertEqual(structure.wheel_positions(), wheels_before)
+        self.assertEqual(structure.actuator_positions(), actuators_before)
+        self.assertTrue(structure.check_position())
+
+    def test_check_changed(self):
+        # Check that, when only one actuator is shifted, the results for the
+        # other pair are reused, and they are the same as a complete check.
+        structure = self.structure
+        self.assertTrue(structure.advance(150.0))
+        rear_checked = structure.REAR.checked
+        res = structure.shift_actuator(3, 150.0)
+        self.assertFalse(res)
+        self.assertIs(structure.REAR.checked, rear_checked)
+        # Compare with a complete check of the same position.
+        struct_copy = deepcopy(structure)
+        struct_copy.shift_actuator(3, 150.0, False)
+        res_copy = struct_copy.check_position()
+        struct_copy.position.dirty = True
+        res_full = struct_copy.check_position()
+        self.assertEqual(res_copy.actuator(3), res_full.actuator(3))
+        self.assertEqual(res_copy.elevation(), res_full.elevation())
+        self.assertEqual(str(res_copy), str(res_full))
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
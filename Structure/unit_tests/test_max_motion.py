@@ -0,0 +1,138 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the query functions of the structure (max_shift, max_elevation,
+max_inclination_delta and max_advance), comparing their results with the
+actual motions.
+'''
+import unittest
+
+from physics import stairs
+from structure import base
+
+
+class MaxMotionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.size = {
+            'a': 120.0,
+            'b': 150.0,
+            'c': 140.0,
+            'd': 100.0,
+            'h': 2.0,
+            'v': 2.0,
+            'g': 100.0,
+            'n': 100.0}
+        self.wheels = {
+            'r1': 25.0,
+            'r2': 25.0,
+            'r3': 25.0,
+            'r4': 25.0}
+
+    def build(self, height):
+        landing = 500.0
+        stair_list = [
+            {'N': 5, 'd': 1000.0, 'w': 250.0, 'h': height}
+        ]
+        stair = stairs.Stair(stair_list, landing)
+        return base.Base(self.size, self.wheels, stair)
+
+    def check_limit(self, structure, query, motion):
+        # The structure can move the distance returned, but not further.
+        distance, __, __ = query
+        sign = 1.0 if distance > 0 else -1.0
+        self.assertTrue(motion(structure.fork(), distance - sign * 0.01))
+        self.assertFalse(motion(structure.fork(), distance + sign * 1.0))
+
+    def test_max_shift(self):
+        structure = self.build(140.0)
+        self.assertTrue(structure.advance(50.0))
+        self.assertTrue(structure.elevate(60.0))
+        self.assertTrue(structure.shift_actuator(3, -60.0))
+        # The front wheel can go down until the ground.
+        query = structure.max_shift(3, +1)
+        self.assertEqual(query[1:], (3, base.MotionLimit.Wheel))
+        self.assertAlmostEqual(query[0], 60.0)
+        self.check_limit(structure, query,
+                         lambda s, d: s.shift_actuator(3, d))
+        # The rear wheel reaches the bound of the actuator.
+        query = structure.max_shift(0, -1)
+        self.assertEqual(query[1:], (0, base.MotionLimit.Actuator))
+        self.assertAlmostEqual(query[0], -60.0)
+        self.check_limit(structure, query,
+                         lambda s, d: s.shift_actuator(0, d))
+        # The other wheel of the front pair is not in the ground.
+        self.assertEqual(structure.max_shift(2, -1),
+                         (0.0, 2, base.MotionLimit.Pair))
+
+    def test_no_mutation(self):
+        # The queries do not change the state of the actuators and wheels.
+        structure = self.build(140.0)
+        self.assertTrue(structure.advance(50.0))
+        self.assertTrue(structure.elevate(60.0))
+        self.assertTrue(structure.shift_actuator(3, -60.0))
+        # Set the wheels to a state different from the actual one, to check
+        # that the queries do not compute it again.
+        for actuator in structure.actuators():
+            actuator.WHEEL.state = None
+        saved = [a.save_state() for a in structure.actuators()]
+        fingerprint = structure.fingerprint()
+        for index in range(4):
+            for direction in (+1, -1):
+                structure.max_shift(index, direction)
+        for direction in (+1, -1):
+            structure.max_elevation(direction)
+            structure.max_inclination_delta(0, direction)
+            structure.max_advance(direction)
+        self.assertEqual([a.save_state() for a in structure.actuators()],
+                         saved)
+        self.assertEqual(structure.fingerprint(), fingerprint)
+
+    def test_max_elevation(self):
+        structure = self.build(140.0)
+        self.assertTrue(structure.elevate(50.0))
+        self.assertTrue(structure.shift_actuator(1, -20.0))
+        for direction in (+1, -1):
+            query = structure.max_elevation(direction)
+            self.assertEqual(query[2], base.MotionLimit.Actuator)
+            self.check_limit(structure, query,
+                             lambda s, d: s.elevate(d))
+        distance, index, __ = structure.max_elevation(+1)
+        self.assertAlmostEqual(distance, 50.0)
+        self.assertIn(index, (0, 2, 3))
+        distance, index, __ = structure.max_elevation(-1)
+        self.assertAlmostEqual(distance, -30.0)
+        self.assertEqual(index, 1)
+
+    def test_max_inclination_delta(self):
+        structure = self.build(140.0)
+        self.assertTrue(structure.elevate(50.0))
+        for fixed in (0, 3):
+            for direction in (+1, -1):
+                query = structure.max_inclination_delta(fixed, direction)
+                self.check_limit(
+                    structure, query,
+                    lambda s, d: s.incline(d, fixed=fixed))
+
+    def test_max_advance(self):
+        for height in (140.0, -140.0):
+            structure = self.build(height)
+            query = structure.max_advance(+1)
+            if height > 0:
+                # The front wheel collides with the first step.
+                self.assertEqual(query[1:], (3, base.MotionLimit.Wheel))
+            else:
+                # Both front wheels get out of the landing.
+                self.assertEqual(query[1:], (2, base.MotionLimit.Pair))
+            self.check_limit(structure, query,
+                             lambda s, d: s.advance(d))
+            distance, index, limit = structure.max_advance(-1)
+            self.assertEqual(distance, float('-inf'))
+            self.assertIsNone(index)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
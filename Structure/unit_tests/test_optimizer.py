@@ -0,0 +1,122 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the search of the best design: the result can not be worse than the
+initial design, the constraint must be met, and a search resumed from a saved
+state must give the same result as a search not interrupted.
+'''
+import os
+import tempfile
+import unittest
+
+from simulator.optimizer import Optimizer
+from simulator.evaluations import EvaluationCache
+
+
+def check_max_size(size, wheels):
+    if size['a'] + size['b'] + size['c'] > 620.0:
+        raise ValueError
+
+
+class OptimizerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.size = {
+            'a': 134.156314355056,
+            'b': 340.0,
+            'c': 134.15631435510588,
+            'd': 203.7850166967259,
+            'h': 5.0,
+            'v': 5.0,
+            'g': 200.0,
+            'n': 700.0}
+        self.wheels = {
+            'r1': 60.0,
+            'r2': 43.53621745138805,
+            'r3': 56.2210075403636,
+            'r4': 30.0}
+        self.dynamics = {
+            'actuator_up': 20.0,
+            'actuator_dw': 30.0,
+            'elevate_up': 5.0,
+            'elevate_dw': 10.0,
+            'incline_up': 4.0,
+            'incline_dw': 8.0,
+            'speed': 30.0,
+            'acceleration': 0.8,
+            'decceleration': 1.8}
+        self.sample = {'sample_time': 0.5, 'time_units': 'seconds'}
+        self.stair_list = [{'N': 2, 'w': 280.0, 'h': 175.0, 'd': 1000.0}]
+        self.start = dict(self.size)
+        self.start.update(self.wheels)
+
+    def optimizer(self, workers):
+        return Optimizer(self.stair_list, 1000.0, self.dynamics, self.sample,
+                         ['a', 'b', 'c'], check_max_size, workers)
+
+    def test_optimizer(self):
+        optimizer = self.optimizer(2)
+        __, start_time = optimizer.minimize(self.start, max_iterations=0)
+        design, total_time = optimizer.minimize(self.start, max_iterations=20)
+        self.assertLessEqual(total_time, start_time)
+        self.assertLessEqual(design['a'] + design['b'] + design['c'], 620.0)
+        # The rest of the dimensions are not changed.
+        for key in ('d', 'n', 'r1'):
+            self.assertEqual(design[key], self.start[key])
+        # Starting from the best design, the initial simplex includes it.
+        __, seed_time = self.optimizer(1).minimize(
+            self.start, seeds=[design], max_iterations=0)
+        self.assertEqual(seed_time, total_time)
+
+    def test_resume(self):
+        design, total_time = self.optimizer(1).minimize(
+            self.start, max_iterations=12)
+        with tempfile.TemporaryDirectory() as directory:
+            state = os.path.join(directory, "state.json")
+            self.optimizer(1).minimize(self.start, max_iterations=5,
+                                       state_file=state)
+            optimizer = self.optimizer(1)
+            resumed, resumed_time = optimizer.minimize(
+                self.start, max_iterations=12, state_file=state)
+        self.assertEqual(resumed, design)
+        self.assertEqual(resumed_time, total_time)
+        # The initial simplex is not evaluated again.
+        self.assertLessEqual(optimizer.evaluations, 7 * 4 + 3)
+
+    def test_cache(self):
+        design, total_time = self.optimizer(1).minimize(
+            self.start, max_iterations=8)
+        with tempfile.TemporaryDirectory() as directory:
+            cache = os.path.join(directory, "cache.db")
+            for __ in range(2):
+                optimizer = Optimizer(self.stair_list, 1000.0, self.dynamics,
+                                      self.sample, ['a', 'b', 'c'],
+                                      check_max_size, 1, cache)
+                cached, cached_time = optimizer.minimize(self.start,
+                                                         max_iterations=8)
+                self.assertEqual(cached, design)
+                self.assertEqual(cached_time, total_time)
+            # The designs that exceed the time budget are not stored.
+            db = EvaluationCache(cache)
+            errors = [row[0] for row in db.connection().execute(
+                "SELECT error FROM results")]
+            db.close()
+        self.assertTrue(errors)
+        for error in errors:
+            self.assertFalse(error is not None and
+                             error.startswith("TimeBudgetExceeded"))
+
+    def test_limits(self):
+        # The designs that reach the limits are discarded.
+        optimizer = Optimizer(self.stair_list, 1000.0, self.dynamics,
+                              self.sample, ['a', 'b', 'c'], check_max_size, 1,
+                              limits={'max_instructions': 1})
+        __, total_time = optimizer.minimize(self.start, max_iterations=0)
+        self.assertEqual(total_time, float('inf'))
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,150 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the cache of instructions: the time computed from the cached instructions
+must be the same as the time computed running the control module.
+'''
+import unittest
+
+from physics.stairs import Stair
+from structure.base import Base
+from simulator.simulator import Simulator
+from simulator.time import compute_time, TimeBudgetExceeded
+from simulator.plan import PlanCache
+from simulator.watchdog import Watchdog, EvaluationStalled
+
+
+class PlanTest(unittest.TestCase):
+
+    def setUp(self):
+        self.size = {
+            'a': 134.156314355056,
+            'b': 340.0,
+            'c': 134.15631435510588,
+            'd': 203.7850166967259,
+            'h': 5.0,
+            'v': 5.0,
+            'g': 200.0,
+            'n': 700.0}
+        self.wheels = {
+            'r1': 60.0,
+            'r2': 43.53621745138805,
+            'r3': 56.2210075403636,
+            'r4': 30.0}
+        self.dynamics = {
+            'actuator_up': 20.0,
+            'actuator_dw': 30.0,
+            'elevate_up': 5.0,
+            'elevate_dw': 10.0,
+            'incline_up': 4.0,
+            'incline_dw': 8.0,
+            'speed': 30.0,
+            'acceleration': 0.8,
+            'decceleration': 1.8}
+        self.sample = {'sample_time': 0.5, 'time_units': 'seconds'}
+
+    def test_cached_time(self):
+        stair_list = [{'N': 5, 'w': 280.0, 'h': 175.0, 'd': 1000.0}]
+        plans = PlanCache()
+        for speed in (30.0, 20.0):
+            dynamics = dict(self.dynamics, speed=speed)
+            structure = Base(self.size, self.wheels, Stair(stair_list, 1000.0))
+            total_time = compute_time(structure, Simulator(dynamics,
+                                                           self.sample))
+            structure = Base(self.size, self.wheels, Stair(stair_list, 1000.0))
+            cached_time = compute_time(structure, Simulator(dynamics,
+                                                            self.sample),
+                                       plans)
+            self.assertEqual(total_time, cached_time)
+        # Only one plan computed for both dynamics.
+        self.assertEqual(len(plans.plans), 1)
+
+    def test_planner(self):
+        # The speeds computed for the whole list of instructions must give
+        # the same time as checking the next instructions for each one.
+        stair_list = [{'N': 5, 'w': 280.0, 'h': 175.0, 'd': 1000.0}]
+        plans = PlanCache()
+        for decceleration in (1.8, 0.5):
+            dynamics = dict(self.dynamics, decceleration=decceleration)
+            structure = Base(self.size, self.wheels, Stair(stair_list, 1000.0))
+            total_time = compute_time(structure, Simulator(dynamics,
+                                                           self.sample),
+                                      plans)
+            planner_time = compute_time(structure, Simulator(dynamics,
+                                                             self.sample),
+                                        plans, planner=True)
+            self.assertAlmostEqual(total_time, planner_time, 6)
+
+    def test_cached_error(self):
+        # A structure too small to cross the stair.
+        stair_list = [{'N': 5, 'w': 280.0, 'h': 400.0, 'd': 1000.0}]
+        plans = PlanCache()
+        for __ in range(2):
+            structure = Base(self.size, self.wheels, Stair(stair_list, 1000.0))
+            with self.assertRaises(ValueError):
+                compute_time(structure, Simulator(self.dynamics, self.sample),
+                             plans)
+        self.assertFalse(list(plans.plans.values())[0][1])
+
+    def test_time_budget(self):
+        stair_list = [{'N': 5, 'w': 280.0, 'h': 175.0, 'd': 1000.0}]
+        total_time = compute_time(
+            Base(self.size, self.wheels, Stair(stair_list, 1000.0)),
+            Simulator(self.dynamics, self.sample))
+        for plans in (None, PlanCache()):
+            # The lower bound of the time must never discard a structure that
+            # completes the stair within the budget.
+            structure = Base(self.size, self.wheels, Stair(stair_list, 1000.0))
+            self.assertEqual(compute_time(
+                structure, Simulator(self.dynamics, self.sample), plans,
+                time_budget=total_time), total_time)
+            # And with a smaller budget, the structure is discarded before
+            # reaching the end of the stair.
+            structure = Base(self.size, self.wheels, Stair(stair_list, 1000.0))
+            with self.assertRaises(TimeBudgetExceeded) as context:
+                compute_time(structure, Simulator(self.dynamics, self.sample),
+                             plans, time_budget=0.8 * total_time)
+            self.assertLess(context.exception.elapsed, 0.8 * total_time)
+            self.assertGreater(context.exception.bound, 0.0)
+
+    def test_watchdog(self):
+        stair = Stair([{'N': 3, 'w': 280.0, 'h': 175.0, 'd': 1000.0}], 1000.0)
+        watchdog = Watchdog()
+        total_time = compute_time(Base(self.size, self.wheels, stair),
+                                  Simulator(self.dynamics, self.sample),
+                                  watchdog=watchdog)
+        instructions = watchdog.instructions
+        checks = watchdog.checks
+        self.assertGreater(instructions, 0)
+        self.assertGreater(checks, instructions)
+        # The limits just reached do not stop the computation.
+        watchdog = Watchdog(instructions, checks, 60.0)
+        self.assertEqual(compute_time(
+            Base(self.size, self.wheels, stair),
+            Simulator(self.dynamics, self.sample), watchdog=watchdog),
+            total_time)
+        for limits, name in (((instructions - 1, None, None), "instructions"),
+                             ((None, checks // 2, None), "checks"),
+                             ((None, None, 0.0), "wall time")):
+            with self.assertRaises(EvaluationStalled) as context:
+                compute_time(Base(self.size, self.wheels, stair),
+                             Simulator(self.dynamics, self.sample),
+                             watchdog=Watchdog(*limits))
+            self.assertEqual(context.exception.limit, name)
+        # The watchdog of the structure is set back after the computation.
+        structure = Base(self.size, self.wheels, stair)
+        with self.assertRaises(EvaluationStalled):
+            compute_time(structure, Simulator(self.dynamics, self.sample),
+                         watchdog=Watchdog(1))
+        self.assertIsNone(structure.watchdog)
+        # Out of the computation, the watchdog does not count.
+        structure = Base(self.size, self.wheels, stair)
+        structure.watchdog = Watchdog(0, 0, 0.0)
+        structure.check_position()
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
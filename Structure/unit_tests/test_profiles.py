@@ -0,0 +1,171 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the sampling functions, the array solvers and the cache of the speed
+profiles.
+'''
+import unittest
+
+import numpy
+
+from simulator.profiles import AccelerationProfile, MinDistanceError
+
+
+class ProfilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dynamics = {
+            'speed': 30.0,
+            'acceleration': 0.8,
+            'decceleration': 1.8}
+        self.profile = AccelerationProfile(self.dynamics)
+        # Accelerate, constant speed and deccelerate.
+        self.accelerations = (0.8, 0.0, -1.8)
+        self.times = (10.0, 20.3, 5.0)
+        self.init_speed = 10.0
+
+    def test_plot_dynamics(self):
+        sample_time = 0.5
+        time_offset = 0.2
+        time, speed, position = self.profile.plot_dynamics(
+            self.init_speed, self.accelerations, self.times, sample_time,
+            time_offset)
+        samples = self.profile.sample_count(self.times, sample_time,
+                                            time_offset)
+        self.assertEqual(len(time), samples)
+        # Same samples when the arrays are given.
+        out = tuple(numpy.zeros(samples + 10) for __ in range(3))
+        res = self.profile.plot_dynamics(
+            self.init_speed, self.accelerations, self.times, sample_time,
+            time_offset, out)
+        for array, array_out, buffer in zip((time, speed, position), res, out):
+            self.assertTrue(numpy.array_equal(array, array_out))
+            self.assertIs(array_out.base, buffer)
+        # The samples are the values of the motion at each sample time.
+        sample_times = numpy.arange(1, samples) * sample_time - time_offset
+        speed_t, position_t = self.profile.sample_dynamics(
+            self.init_speed, self.accelerations, self.times, sample_times)
+        self.assertTrue(numpy.allclose(speed[1:], speed_t))
+        self.assertTrue(numpy.allclose(position[1:], position_t))
+
+    def test_sample_dynamics(self):
+        # End of each section.
+        sample_times = numpy.cumsum(self.times)
+        speed, position = self.profile.sample_dynamics(
+            self.init_speed, self.accelerations, self.times, sample_times)
+        self.assertTrue(numpy.allclose(speed, (18.0, 18.0, 9.0)))
+        self.assertTrue(numpy.allclose(
+            position, (140.0, 140.0 + 18.0 * 20.3,
+                       140.0 + 18.0 * 20.3 + 67.5)))
+
+    def test_speed_range_batch(self):
+        v = numpy.array((0.0, 10.0, 30.0, 20.0, 25.0, 5.0))
+        d_tot = numpy.array((500.0, 100.0, 1000.0, -200.0, 10.0, -50.0))
+        for batch, scalar in (
+                (self.profile.end_speed_range_batch,
+                 self.profile.end_speed_range),
+                (self.profile.init_speed_range_batch,
+                 self.profile.init_speed_range)):
+            v_min, v_max, valid = batch(v, d_tot)
+            for n in range(len(v)):
+                try:
+                    res = scalar(float(v[n]), float(d_tot[n]))
+                except ValueError:
+                    # The initial speed of the last motion can not be
+                    # computed (square root of a negative number).
+                    self.assertFalse(valid[n])
+                    continue
+                self.assertTrue(valid[n])
+                self.assertAlmostEqual(v_min[n], res[0])
+                self.assertAlmostEqual(v_max[n], res[1])
+        # Check that the invalid motion is tested.
+        self.assertFalse(numpy.all(valid))
+
+    def test_max_end_speed_batch(self):
+        v_ini = numpy.array((0.0, 10.0, 30.0, 20.0))
+        d_tot = numpy.array((500.0, 10.0, 1000.0, 100.0))
+        t_tot = numpy.array((30.0, 25.0, 40.0, 0.0))
+        vm, valid = self.profile.max_end_speed_batch(v_ini, d_tot, t_tot)
+        for n in range(len(v_ini)):
+            try:
+                res = self.profile.max_end_speed(
+                    float(v_ini[n]), float(d_tot[n]), float(t_tot[n]))
+            except ZeroDivisionError:
+                # The last motion has no time.
+                self.assertFalse(valid[n])
+                continue
+            self.assertTrue(valid[n])
+            self.assertAlmostEqual(vm[n], res)
+        self.assertFalse(valid[-1])
+
+    def test_time_limits_batch(self):
+        v_ini = numpy.array((0.0, 10.0, 30.0, 20.0, 25.0))
+        v_end = numpy.array((10.0, 0.0, 30.0, 20.0, 0.0))
+        d_tot = numpy.array((500.0, 100.0, 1000.0, -200.0, 10.0))
+        t_min, t_max, valid = self.profile.profile_time_limits_batch(
+            v_ini, v_end, d_tot)
+        for n in range(len(v_ini)):
+            try:
+                res = self.profile.profile_time_limits(
+                    v_ini[n], v_end[n], d_tot[n])
+            except MinDistanceError:
+                # The last motion is too short to stop.
+                self.assertFalse(valid[n])
+                continue
+            self.assertTrue(valid[n])
+            self.assertAlmostEqual(t_min[n], res[0])
+            self.assertEqual(t_max[n], res[1])
+
+    def test_compute_profile_batch(self):
+        v_ini = numpy.array((0.0, 10.0, 30.0, 20.0, 20.0, 10.0))
+        v_end = numpy.array((10.0, 0.0, 20.0, 20.0, 10.0, 10.0))
+        d_tot = numpy.array((500.0, 100.0, 1000.0, -200.0, 300.0, 100.0))
+        t_tot = numpy.array((30.0, 25.0, 40.0, 15.0, 20.0, 1.0))
+        an, tn, vn, valid = self.profile.compute_profile_batch(
+            v_ini, v_end, d_tot, t_tot)
+        for n in range(len(v_ini)):
+            try:
+                a, t, v = self.profile.compute_profile(
+                    v_ini[n], v_end[n], d_tot[n], t_tot[n])
+            except ValueError:
+                # The last motion requires more time.
+                self.assertFalse(valid[n])
+                continue
+            self.assertTrue(valid[n])
+            sections = len(a)
+            self.assertTrue(numpy.allclose(an[n, :sections], a))
+            self.assertTrue(numpy.allclose(tn[n, :sections], t))
+            self.assertTrue(numpy.all(tn[n, sections:] == 0.0))
+            self.assertAlmostEqual(vn[n, 0], v[0])
+            # The profile completes the distance in the time given.
+            position = numpy.sum(vn[n, :3] * tn[n] + 0.5 * an[n] * tn[n]**2)
+            self.assertAlmostEqual(position, d_tot[n])
+            self.assertAlmostEqual(numpy.sum(tn[n]), t_tot[n])
+            self.assertAlmostEqual(vn[n, 3], v_end[n])
+
+    def test_cache(self):
+        profile = AccelerationProfile(dict(self.dynamics, cache_size=2))
+        res = profile.end_speed_range(10.0, 100.0)
+        # Rounding errors smaller than the resolution give the same result.
+        self.assertIs(profile.end_speed_range(10.0 + 1e-9, 100.0 + 1e-7), res)
+        self.assertEqual(res, self.profile.end_speed_range(10.0, 100.0))
+        self.assertEqual((profile.cache.hits, profile.cache.misses), (1, 1))
+        # The errors are also stored.
+        for __ in range(2):
+            with self.assertRaises(MinDistanceError):
+                profile.profile_time_limits(25.0, 0.0, 10.0)
+        self.assertEqual((profile.cache.hits, profile.cache.misses), (2, 2))
+        # The least recently used result is removed.
+        profile.init_speed_range(10.0, 100.0)
+        self.assertEqual(len(profile.cache.results), 2)
+        profile.end_speed_range(10.0, 100.0)
+        self.assertEqual(profile.cache.misses, 4)
+        # No cache by default.
+        self.assertIsNone(self.profile.cache)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
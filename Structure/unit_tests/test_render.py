@@ -0,0 +1,145 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the generation of the images of a recorded simulation: the images must
+be the same as the ones saved during the simulation, whatever the number of
+processes used.
+'''
+import os
+import tempfile
+import unittest
+
+import numpy
+import cv2
+
+from physics.stairs import Stair
+from structure.base import Base
+from simulator.simulator import Simulator
+from simulator import control
+from simulator.recorder import Recorder
+from graphics.graphics import Graphics
+from graphics.render import render
+
+
+class RenderTest(unittest.TestCase):
+
+    def setUp(self):
+        self.size = {
+            'a': 134.156314355056,
+            'b': 340.0,
+            'c': 134.15631435510588,
+            'd': 203.7850166967259,
+            'h': 5.0,
+            'v': 5.0,
+            'g': 200.0,
+            'n': 700.0}
+        self.wheels = {
+            'r1': 60.0,
+            'r2': 43.53621745138805,
+            'r3': 56.2210075403636,
+            'r4': 30.0}
+        self.dynamics = {
+            'actuator_up': 20.0,
+            'actuator_dw': 30.0,
+            'elevate_up': 5.0,
+            'elevate_dw': 10.0,
+            'incline_up': 4.0,
+            'incline_dw': 8.0,
+            'speed': 30.0,
+            'acceleration': 0.8,
+            'decceleration': 1.8}
+        self.sample = {'sample_time': 0.5, 'time_units': 'seconds'}
+        self.stair_list = [{'N': 3, 'w': 280.0, 'h': 175.0, 'd': 1000.0}]
+        self.image = {'size': (120, 200), 'shift': 0, 'scale': None}
+        self.axis = {
+            'height': self.size['d'] + 5.0,
+            'max_speed': 1.2 * self.dynamics['speed'],
+            'max_incline': self.size['n'] + 5.0}
+
+    def video_data(self, directory):
+        return {
+            'video_dir': directory,
+            'display': False,
+            'interval': 5.0,
+            'pause': False,
+            'composition': "comp",
+            'buffer_size': 8,
+            'units': "mm",
+            'margin': 5.0,
+            'video_file': None,
+            'codec': 'mp4v',
+            'fps': None,
+            'queue_size': 0}
+
+    def simulate(self, directory, instructions):
+        # Simulate the first instructions, drawing and recording each sample.
+        stair = Stair(self.stair_list, 1000.0)
+        structure = Base(self.size, self.wheels, stair)
+        simulator = Simulator(self.dynamics, self.sample)
+        graphics = Graphics(self.image, self.video_data(directory),
+                            {'csv_dir': None}, self.sample, self.axis)
+        recorder = Recorder(self.sample['sample_time'])
+        graphics.draw(stair, structure, simulator.counter)
+        recorder.record(structure, simulator.counter, 0)
+        for n in range(instructions):
+            instruction, st_aux = control.next_instruction(structure)
+            stop_distance = simulator.stop_distance(instruction)
+            next_instructions = control.compute_distance(st_aux,
+                                                         stop_distance)
+            simulator.compute_time(instruction, next_instructions)
+            for __ in simulator.simulate_step(structure, instruction):
+                graphics.draw(stair, structure, simulator.counter)
+                recorder.record(structure, simulator.counter, n + 1)
+            structure = st_aux
+        graphics.close()
+        return recorder
+
+    def compare(self, directory, reference):
+        # Check that both directories have the same images.
+        for sub_dir in ("", "comp"):
+            names = sorted(n for n in os.listdir(
+                os.path.join(reference, sub_dir)) if n.endswith(".png"))
+            self.assertTrue(names)
+            for name in names:
+                image = cv2.imread(os.path.join(directory, sub_dir, name))
+                expected = cv2.imread(os.path.join(reference, sub_dir, name))
+                self.assertIsNotNone(image, name)
+                numpy.testing.assert_array_equal(image, expected)
+
+    def test_set_state(self):
+        stair = Stair(self.stair_list, 1000.0)
+        with tempfile.TemporaryDirectory() as directory:
+            recorder = self.simulate(os.path.join(directory, "live"), 2)
+        data = recorder.data()
+        structure = Base(self.size, self.wheels, stair)
+        for pose, actuators, wheels in zip(data['pose'], data['actuators'],
+                                           data['wheels']):
+            structure.set_state(pose, actuators[0:4])
+            numpy.testing.assert_allclose(structure.actuator_positions(),
+                                          actuators)
+            numpy.testing.assert_allclose(structure.wheel_positions(),
+                                          wheels)
+
+    def test_render(self):
+        with tempfile.TemporaryDirectory() as directory:
+            live = os.path.join(directory, "live")
+            recorder = self.simulate(live, 3)
+            recording = os.path.join(directory, "recording.npz")
+            recorder.save(recording)
+            for workers in (1, 2):
+                output = os.path.join(directory, "render%i" % workers)
+                # Blocks smaller than the plot buffer, to check that the
+                # plots are filled with the samples of the previous blocks.
+                images = render(recording, self.stair_list, 1000.0,
+                                self.size, self.wheels, self.image,
+                                self.video_data(output), self.sample,
+                                self.axis, workers, block_size=5)
+                self.assertEqual(images, recorder.samples)
+                self.compare(output, live)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,130 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the geometric checks of the designs: the designs rejected must fail when
+simulated, and the reason must be the right one.
+'''
+import unittest
+
+import numpy
+
+from physics.stairs import Stair
+from structure.base import Base, ConfigurationError
+from simulator.sweep import evaluate_design, DESIGN_KEYS
+from simulator.screen import screen_designs, screen_list
+from simulator.screen import CONFIGURATION, LANDING, RISER, TREAD
+from physics.wheel_state import MAX_GAP
+
+
+class ScreenTest(unittest.TestCase):
+
+    def setUp(self):
+        self.design = {
+            'a': 134.156314355056,
+            'b': 340.0,
+            'c': 134.15631435510588,
+            'd': 203.7850166967259,
+            'h': 5.0,
+            'v': 5.0,
+            'g': 200.0,
+            'n': 700.0,
+            'r1': 60.0,
+            'r2': 43.53621745138805,
+            'r3': 56.2210075403636,
+            'r4': 30.0}
+        self.dynamics = {
+            'actuator_up': 20.0,
+            'actuator_dw': 30.0,
+            'elevate_up': 5.0,
+            'elevate_dw': 10.0,
+            'incline_up': 4.0,
+            'incline_dw': 8.0,
+            'speed': 30.0,
+            'acceleration': 0.8,
+            'decceleration': 1.8}
+        self.sample = {'sample_time': 0.5, 'time_units': 'seconds'}
+
+    def check(self, stair, changes, reason):
+        """Check that the designs with the changes are rejected."""
+        designs = []
+        for key, value in changes:
+            design = dict(self.design)
+            design[key] = value
+            designs.append(design)
+        # The original design is not rejected.
+        designs.append(self.design)
+        reasons = screen_list(designs, stair)
+        self.assertEqual(reasons, [reason] * len(changes) + [None])
+        for design in designs[:-1]:
+            total_time, error = evaluate_design(design, stair, self.dynamics,
+                                                self.sample)
+            self.assertIsNone(total_time)
+
+    def test_max_inclination(self):
+        rng = numpy.random.default_rng(0)
+        size = {k: rng.uniform(0.0, 200.0, 100) for k in 'abcdhvgn'}
+        size['a'][0] = -1.0
+        wheels = {k: rng.uniform(0.0, 60.0, 100)
+                  for k in ('r1', 'r2', 'r3', 'r4')}
+        incline, valid = Base.max_inclination_batch(size, wheels)
+        for n in range(100):
+            try:
+                value = Base.max_inclination(
+                    {k: v[n] for k, v in size.items()},
+                    {k: v[n] for k, v in wheels.items()})
+                self.assertTrue(valid[n])
+                self.assertAlmostEqual(incline[n], value)
+            except ConfigurationError:
+                self.assertFalse(valid[n])
+
+    def test_screen(self):
+        up = Stair([{'N': 2, 'w': 280.0, 'h': 175.0, 'd': 1000.0}], 1000.0)
+        down = Stair([{'N': 2, 'w': 280.0, 'h': -175.0, 'd': 1000.0}],
+                     1000.0)
+        narrow = Stair([{'N': 3, 'w': 50.0, 'h': 175.0, 'd': 1000.0}],
+                       1000.0)
+        self.check(up, [('a', 90.0), ('r4', -1.0)], CONFIGURATION)
+        self.check(up, [('b', 900.0)], LANDING)
+        self.check(down, [('d', 50.0)], RISER)
+        self.assertEqual(screen_list([self.design], narrow), [TREAD])
+        self.assertIsNone(evaluate_design(self.design, narrow, self.dynamics,
+                                          self.sample)[0])
+        # Array version.
+        designs = {k: numpy.full((2, 3), self.design[k]) for k in DESIGN_KEYS}
+        designs['d'][1, 2] = 50.0
+        feasible, reasons = screen_designs(designs, up)
+        self.assertEqual(feasible.tolist(),
+                         [[True, True, True], [True, True, False]])
+        self.assertTrue(reasons[RISER][1, 2])
+        self.assertFalse(reasons[LANDING].any())
+
+    def test_tolerance(self):
+        # The simulation allows the wheels a small margin (MAX_GAP), so the
+        # designs just inside this margin must not be rejected.
+        design = self.design
+        width = design['a'] + design['b'] + design['c'] + design['r4']
+        stair = Stair([{'N': 2, 'w': 280.0, 'h': 175.0, 'd': 1000.0}],
+                      width - 0.8 * MAX_GAP)
+        self.assertEqual(screen_list([design], stair), [None])
+        total_time, error = evaluate_design(design, stair, self.dynamics,
+                                            self.sample)
+        self.assertIsNotNone(total_time, error)
+        # Riser just above the lift of the actuators.
+        incline = Base.max_inclination(
+            {k: design[k] for k in 'abcdhvgn'},
+            {k: design[k] for k in ('r1', 'r2', 'r3', 'r4')})
+        lift = design['d'] + incline * min(design['a'], design['c']) / \
+            (design['a'] + design['b'] + design['c'])
+        stair = Stair([{'N': 2, 'w': 280.0, 'h': lift + 0.8 * MAX_GAP,
+                        'd': 1000.0}], 1000.0)
+        self.assertEqual(screen_list([design], stair), [None])
+        stair = Stair([{'N': 2, 'w': 280.0, 'h': lift + 2 * MAX_GAP,
+                        'd': 1000.0}], 1000.0)
+        self.assertEqual(screen_list([design], stair), [RISER])
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
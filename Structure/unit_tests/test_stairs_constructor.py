@@ -7,6 +7,7 @@ Test stairs constructor.
 import unittest
 
 from physics import stairs
+from physics.wheel_state import MAX_GAP
 
 class StairTest(unittest.TestCase):
 
@@ -105,7 +106,52 @@ class StairTest(unittest.TestCase):
         self.assertEqual(yr, -75.0, "Error: Find Step failed.")
         # Out of the stair definition
         self.assertRaises(ValueError, stairs_test.find_step, (600, 0))
-                         
+
+    def testFindStepIndex(self):
+        """Check the indexed search against a linear search of the steps.
+        """
+        def linear_find_step(stair, p):
+            # Original implementation, walking the whole list of corners.
+            xc = p[0]
+            yc = 0.0
+            yl = 0.0
+            xl = 0.0
+            for xs, ys in stair:
+                if ys > yc:
+                    if xs > xc + MAX_GAP:
+                        return yc, xl, xs, yl, ys
+                else:
+                    if xs > xc - MAX_GAP:
+                        return yc, xl, xs, yl, ys
+                xl = xs
+                yl = yc
+                yc = ys
+            return yc, xl, xc, yl, ys
+
+        landing = 100.0
+        # Mixed stair, including steps with zero width.
+        stair_list = [
+            {'N': 3, 'd': 0.0, 'w': 50.0, 'h': +25.0},
+            {'N': 2, 'd': 100.0, 'w': 0.0, 'h': +10.0},
+            {'N': 4, 'd': 0.0, 'w': 40.0, 'h': -20.0},
+            {'N': 2, 'd': 250.0, 'w': 60.0, 'h': +30.0}
+            ]
+        stairs_test = stairs.Stair(stair_list, landing)
+        hint = None
+        x = -10.0
+        while x < 1000.0:
+            expected = linear_find_step(stairs_test.STAIR, (x, 0))
+            self.assertEqual(stairs_test.find_step((x, 0)), expected,
+                             "Error: Find Step failed.")
+            # The result must be the same using a hint.
+            hint = stairs_test.step_index(x, hint)
+            self.assertEqual(stairs_test.find_step((x, 0), hint), expected,
+                             "Error: Find Step failed.")
+            # And also with a wrong hint.
+            self.assertEqual(stairs_test.find_step((x, 0), 0), expected,
+                             "Error: Find Step failed.")
+            x += 0.025
+
 ###############################################################################
 # End of file.
 ###############################################################################
\ No newline at end of file
@@ -0,0 +1,79 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the evaluation of a design on a set of stairs: the times must be the
+same as the ones computed for each stair, with any number of processes, and
+the stairs that can not be crossed must be reported.
+'''
+import unittest
+
+from physics.stairs import Stair
+from simulator.sweep import evaluate_design
+from simulator.suite import evaluate_suite
+
+
+class SuiteTest(unittest.TestCase):
+
+    def setUp(self):
+        self.design = {
+            'a': 134.156314355056,
+            'b': 340.0,
+            'c': 134.15631435510588,
+            'd': 203.7850166967259,
+            'h': 5.0,
+            'v': 5.0,
+            'g': 200.0,
+            'n': 700.0,
+            'r1': 60.0,
+            'r2': 43.53621745138805,
+            'r3': 56.2210075403636,
+            'r4': 30.0}
+        self.dynamics = {
+            'actuator_up': 20.0,
+            'actuator_dw': 30.0,
+            'elevate_up': 5.0,
+            'elevate_dw': 10.0,
+            'incline_up': 4.0,
+            'incline_dw': 8.0,
+            'speed': 30.0,
+            'acceleration': 0.8,
+            'decceleration': 1.8}
+        self.sample = {'sample_time': 0.5, 'time_units': 'seconds'}
+        self.suite = {
+            'up': ([{'N': 2, 'w': 280.0, 'h': 175.0, 'd': 1000.0}], 1000.0),
+            'down': ([{'N': 2, 'w': 280.0, 'h': -175.0, 'd': 1000.0}],
+                     1000.0),
+            # Steps too short for the structure.
+            'short': ([
+                {'N': 1, 'w': 150.0, 'h': -110.0, 'd': 0.0},
+                {'N': 1, 'w': 160.0, 'h': -90.0, 'd': 1000.0}], 1000.0)}
+
+    def test_suite(self):
+        results = evaluate_suite(self.design, self.dynamics, self.sample,
+                                 self.suite, 2)
+        self.assertEqual(results, evaluate_suite(
+            self.design, self.dynamics, self.sample, self.suite, 1))
+        self.assertEqual(list(results['times']), list(self.suite))
+        for name, (stairs_list, landing) in self.suite.items():
+            total_time, error = evaluate_design(
+                self.design, Stair(stairs_list, landing), self.dynamics,
+                self.sample)
+            self.assertEqual(results['times'][name], total_time)
+            self.assertEqual(results['errors'][name], error)
+        self.assertIsNone(results['times']['short'])
+        self.assertEqual(results['feasible'], 2)
+        self.assertEqual(results['worst'], float('inf'))
+        self.assertAlmostEqual(results['mean'], 0.5 * (
+            results['times']['up'] + results['times']['down']))
+        # Without the short stair.
+        del self.suite['short']
+        results = evaluate_suite(self.design, self.dynamics, self.sample,
+                                 self.suite, 1)
+        self.assertEqual(results['worst'], max(results['times'].values()))
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
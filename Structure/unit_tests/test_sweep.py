@@ -0,0 +1,132 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the evaluation of a set of designs: the results must be the same with
+any number of processes or taken from the cache, and the failures must be
+reported.
+'''
+import csv
+import os
+import tempfile
+import unittest
+
+from simulator.sweep import sweep, grid_designs, read_seeds
+from simulator.evaluations import EvaluationCache
+
+
+class SweepTest(unittest.TestCase):
+
+    def setUp(self):
+        self.size = {
+            'a': 134.156314355056,
+            'b': 340.0,
+            'c': 134.15631435510588,
+            'd': 203.7850166967259,
+            'h': 5.0,
+            'v': 5.0,
+            'g': 200.0,
+            'n': 700.0}
+        self.wheels = {
+            'r1': 60.0,
+            'r2': 43.53621745138805,
+            'r3': 56.2210075403636,
+            'r4': 30.0}
+        self.dynamics = {
+            'actuator_up': 20.0,
+            'actuator_dw': 30.0,
+            'elevate_up': 5.0,
+            'elevate_dw': 10.0,
+            'incline_up': 4.0,
+            'incline_dw': 8.0,
+            'speed': 30.0,
+            'acceleration': 0.8,
+            'decceleration': 1.8}
+        self.sample = {'sample_time': 0.5, 'time_units': 'seconds'}
+        self.stair_list = [{'N': 2, 'w': 280.0, 'h': 175.0, 'd': 1000.0}]
+
+    def run_sweep(self, directory, workers, cache=None, cached=0):
+        # The first value of a is too short for the wheels.
+        ranges = {'a': (50.0, 134.156314355056), 'n': (500.0, 700.0)}
+        output = os.path.join(directory, "sweep%i.csv" % workers)
+        res = sweep(grid_designs(self.size, self.wheels, ranges),
+                    self.stair_list, 1000.0, self.dynamics, self.sample,
+                    output, workers, 1, cache)
+        self.assertEqual(res, (4, 2, cached))
+        with open(output, newline='') as f:
+            return sorted(tuple(row.values()) for row in csv.DictReader(f))
+
+    def test_sweep(self):
+        with tempfile.TemporaryDirectory() as directory:
+            rows = self.run_sweep(directory, 1)
+            self.assertEqual(rows, self.run_sweep(directory, 2))
+        for row in rows:
+            if float(row[0]) < 100.0:
+                self.assertEqual(row[-2], "")
+                self.assertTrue(row[-1].startswith("ConfigurationError"))
+            else:
+                self.assertGreater(float(row[-2]), 0.0)
+                self.assertEqual(row[-1], "")
+
+    def test_seeds(self):
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "sweep.csv")
+            with open(file_name, "w", newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(('a', 'n', 'time', 'error'))
+                writer.writerow((134.0, 600.0, 300.0, ""))
+                writer.writerow((50.0, 700.0, "", "ConfigurationError"))
+                writer.writerow((134.0, 500.0, 250.0, ""))
+            seeds = read_seeds(file_name, self.size, self.wheels)
+        # Only the designs that cross the stair, from the fastest.
+        self.assertEqual([seed['n'] for seed in seeds], [500.0, 600.0])
+        self.assertEqual(seeds[0]['r1'], self.wheels['r1'])
+
+    def test_cache(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = os.path.join(directory, "cache.db")
+            rows = self.run_sweep(directory, 2, cache)
+            # All the designs are already in the cache, except the ones
+            # rejected by the screen, that are not evaluated.
+            self.assertEqual(self.run_sweep(directory, 1, cache, 2), rows)
+            # Other dynamics give other results.
+            self.dynamics['speed'] = 20.0
+            self.run_sweep(directory, 1, cache)
+
+    def test_limits(self):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "sweep.csv")
+            cache = os.path.join(directory, "cache.db")
+            designs = list(grid_designs(self.size, self.wheels,
+                                        {'n': (500.0, 700.0)}))
+            for __ in range(2):
+                # The designs stalled are not stored in the cache.
+                res = sweep(designs, self.stair_list, 1000.0, self.dynamics,
+                            self.sample, output, 1, 1, cache,
+                            limits={'max_instructions': 3})
+                self.assertEqual(res, (2, 2, 0))
+            with open(output, newline='') as f:
+                for row in csv.DictReader(f):
+                    self.assertTrue(
+                        row['error'].startswith("EvaluationStalled"))
+
+    def test_not_stored(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = EvaluationCache(os.path.join(directory, "cache.db"))
+            for error in ("RuntimeError: Can not move structure.",
+                          "TimeBudgetExceeded: 10.0",
+                          "ValueError: Stair can not be crossed"):
+                result = cache.evaluate(error, lambda: (None, error))
+                self.assertEqual(result, (None, error, False))
+            self.assertIsNone(cache.get("RuntimeError: Can not move "
+                                        "structure."))
+            self.assertIsNone(cache.get("TimeBudgetExceeded: 10.0"))
+            self.assertIsNotNone(cache.get("ValueError: Stair can not be "
+                                           "crossed"))
+            cache.close()
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,137 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the simulation of a complete instruction at once: the trajectory must be
+the same as the one obtained simulating the instruction step by step.
+'''
+import os
+import tempfile
+import unittest
+
+import numpy
+
+from physics.stairs import Stair
+from structure.base import Base
+from simulator.simulator import Simulator
+from simulator import control
+from simulator.recorder import Recorder, record_simulation
+
+
+class TrajectoryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.size = {
+            'a': 134.156314355056,
+            'b': 340.0,
+            'c': 134.15631435510588,
+            'd': 203.7850166967259,
+            'h': 5.0,
+            'v': 5.0,
+            'g': 200.0,
+            'n': 700.0}
+        self.wheels = {
+            'r1': 60.0,
+            'r2': 43.53621745138805,
+            'r3': 56.2210075403636,
+            'r4': 30.0}
+        self.dynamics = {
+            'actuator_up': 20.0,
+            'actuator_dw': 30.0,
+            'elevate_up': 5.0,
+            'elevate_dw': 10.0,
+            'incline_up': 4.0,
+            'incline_dw': 8.0,
+            'speed': 30.0,
+            'acceleration': 0.8,
+            'decceleration': 1.8}
+        self.sample = {'sample_time': 0.5, 'time_units': 'seconds'}
+
+    def simulate(self, vectorized):
+        # Simulate the complete stair, and return the time, position of the
+        # actuators and wheels for all the samples.
+        stair_list = [{'N': 3, 'w': 280.0, 'h': 175.0, 'd': 1000.0}]
+        structure = Base(self.size, self.wheels, Stair(stair_list, 1000.0))
+        simulator = Simulator(self.dynamics, self.sample)
+        samples = []
+        while True:
+            instruction, st_aux = control.next_instruction(structure)
+            if instruction is None:
+                break
+            stop_distance = simulator.stop_distance(instruction)
+            next_instructions = control.compute_distance(st_aux,
+                                                         stop_distance)
+            simulator.compute_time(instruction, next_instructions)
+            if vectorized:
+                trajectory = simulator.simulate_trajectory(structure,
+                                                           instruction)
+                if trajectory is not None:
+                    samples += [numpy.hstack((t, a, w.ravel())) for t, a, w in
+                                zip(trajectory['time'],
+                                    trajectory['actuators'],
+                                    trajectory['wheels'])]
+            else:
+                for __ in simulator.simulate_step(structure, instruction):
+                    wheels = [a.JOINT.position(a.HEIGHT + a.d)
+                              for a in structure.actuators()]
+                    samples.append(numpy.hstack((
+                        simulator.get_time(),
+                        [a.d for a in structure.actuators()],
+                        numpy.ravel(wheels))))
+            structure = st_aux
+            if instruction.get('end', False):
+                break
+        return numpy.array(samples)
+
+    def test_trajectory(self):
+        step = self.simulate(False)
+        vectorized = self.simulate(True)
+        self.assertEqual(step.shape, vectorized.shape)
+        self.assertTrue(numpy.allclose(step, vectorized, 0.0, 1e-6))
+
+    def test_check_trajectory(self):
+        stair_list = [{'N': 3, 'w': 280.0, 'h': 175.0, 'd': 1000.0}]
+        structure = Base(self.size, self.wheels, Stair(stair_list, 1000.0))
+        # Move the structure forwards, until the front wheel goes into the
+        # first step.
+        horizontal = numpy.linspace(0.0, 500.0, 11)
+        vertical = numpy.full(11, structure.position.vertical)
+        inclination = numpy.zeros(11)
+        shifts = numpy.zeros((11, 4))
+        valid, __ = structure.check_trajectory(
+            horizontal, vertical, inclination, shifts)
+        for index, value in enumerate(horizontal):
+            aux = structure.fork()
+            self.assertEqual(bool(aux.advance(value)), valid[index])
+
+    def test_recorder(self):
+        # Both simulation modes must record the same data, and the data saved
+        # must be the same as the data recorded.
+        stair_list = [{'N': 3, 'w': 280.0, 'h': 175.0, 'd': 1000.0}]
+        data = []
+        for vectorized in (False, True):
+            structure = Base(self.size, self.wheels, Stair(stair_list, 1000.0))
+            recorder = Recorder(self.sample['sample_time'], 16)
+            self.assertTrue(record_simulation(
+                structure, Simulator(self.dynamics, self.sample), recorder,
+                vectorized))
+            data.append(recorder.data())
+        for key, value in data[0].items():
+            self.assertEqual(value.shape, data[1][key].shape)
+            self.assertTrue(numpy.allclose(value, data[1][key], 0.0, 1e-6))
+        with tempfile.TemporaryDirectory() as directory:
+            file_name = os.path.join(directory, "data.npz")
+            recorder.save(file_name)
+            saved = numpy.load(file_name)
+            for key, value in data[1].items():
+                self.assertTrue(numpy.array_equal(saved[key], value))
+            recorder.save(directory, mmap=True)
+            saved = numpy.load(os.path.join(directory, "wheels.npy"),
+                               mmap_mode='r')
+            self.assertTrue(numpy.array_equal(saved, data[1]['wheels']))
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
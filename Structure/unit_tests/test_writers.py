@@ -0,0 +1,179 @@
+'''
+Created on 17 oct. 2026
+
+@author: pedro.gil@uah.es
+
+Test the objects that save the images generated by the graphics module.
+'''
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy
+import cv2
+
+from graphics.writers import frame_writer, ImageSequence, VideoFile
+from graphics.writers import AsyncWriter, BufferPool
+from graphics.graphics import Graphics
+from physics.stairs import Stair
+from structure.base import Base
+
+
+class WritersTest(unittest.TestCase):
+
+    def setUp(self):
+        self.size = (40, 60)
+        self.images = [numpy.full(self.size + (3,), 40 * n, numpy.uint8)
+                       for n in range(5)]
+
+    def test_frame_writer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Video file.
+            writer = frame_writer(directory, "video.avi", "MJPG", 2.0,
+                                  self.size)
+            self.assertIsInstance(writer, VideoFile)
+            for n, image in enumerate(self.images):
+                writer.write(image, n)
+            writer.close()
+            video = cv2.VideoCapture(os.path.join(directory, "video.avi"))
+            self.assertEqual(video.get(cv2.CAP_PROP_FRAME_COUNT),
+                             len(self.images))
+            video.release()
+            # If the codec is not available, the images are saved as an
+            # image sequence.
+            sub_dir = os.path.join(directory, "sequence")
+            writer = frame_writer(sub_dir, "video.avi", "ZZZZ", 2.0,
+                                  self.size)
+            self.assertIsInstance(writer, ImageSequence)
+            for n, image in enumerate(self.images):
+                writer.write(image, n)
+            writer.close()
+            self.assertFalse(os.path.exists(os.path.join(sub_dir,
+                                                         "video.avi")))
+            for n, image in enumerate(self.images):
+                saved = cv2.imread(os.path.join(sub_dir, "image%05i.png" % n))
+                numpy.testing.assert_array_equal(saved, image)
+
+    def test_async_writer(self):
+        # The functions are called in order.
+        saved = []
+        writer = AsyncWriter(2)
+        for n in range(50):
+            writer.submit(saved.append, n)
+        writer.close()
+        self.assertEqual(saved, list(range(50)))
+
+    def test_backpressure(self):
+        # When the queue is full, submit waits until the writer goes on.
+        release = threading.Event()
+        submitted = threading.Event()
+        writer = AsyncWriter(1)
+        # The first function blocks the writer, and the second one fills the
+        # queue.
+        writer.submit(release.wait)
+        writer.submit(len, "")
+
+        def submit():
+            writer.submit(len, "")
+            submitted.set()
+        thread = threading.Thread(target=submit)
+        thread.start()
+        self.assertFalse(submitted.wait(0.2))
+        release.set()
+        self.assertTrue(submitted.wait(5.0))
+        thread.join()
+        writer.close()
+
+    def test_async_error(self):
+        # An error in the writer is raised in the next call to submit.
+        def fail():
+            raise OSError("disk full")
+        writer = AsyncWriter(2)
+        writer.submit(fail)
+        with self.assertRaises(OSError):
+            for __ in range(100):
+                writer.submit(len, "")
+        with self.assertRaises(OSError):
+            writer.close()
+        # And in close, if there are no more calls to submit.
+        writer = AsyncWriter(2)
+        writer.submit(fail)
+        with self.assertRaises(OSError):
+            writer.close()
+
+    def test_buffer_pool(self):
+        pool = BufferPool(self.size + (3,), 2)
+        first = pool.get()
+        second = pool.get()
+        self.assertEqual(first.shape, self.size + (3,))
+        self.assertIsNot(first, second)
+        # No buffer free: get waits until one is released.
+        result = []
+        thread = threading.Thread(target=lambda: result.append(pool.get()))
+        thread.start()
+        thread.join(0.2)
+        self.assertEqual(result, [])
+        pool.release(first)
+        thread.join(5.0)
+        self.assertIs(result[0], first)
+
+    def test_pool_error(self):
+        # If the writer fails, get does not wait for a buffer that is never
+        # released.
+        def fail():
+            raise OSError("disk full")
+        writer = AsyncWriter(2)
+        pool = BufferPool(self.size + (3,), 1, writer)
+        pool.get()
+        writer.submit(fail)
+        with self.assertRaises(OSError):
+            pool.get()
+        with self.assertRaises(OSError):
+            writer.close()
+
+    def test_draw_error(self):
+        # An error saving the images is raised in draw, that does not hang.
+        size = {'a': 134.156314355056, 'b': 340.0, 'c': 134.15631435510588,
+                'd': 203.7850166967259, 'h': 5.0, 'v': 5.0, 'g': 200.0,
+                'n': 700.0}
+        wheels = {'r1': 60.0, 'r2': 43.53621745138805,
+                  'r3': 56.2210075403636, 'r4': 30.0}
+        stair = Stair([{'N': 3, 'w': 280.0, 'h': 175.0, 'd': 1000.0}],
+                      1000.0)
+        structure = Base(size, wheels, stair)
+
+        def fail(image, counter):
+            # Slow enough for draw to take all the buffers before the first
+            # error.
+            time.sleep(0.1)
+            raise OSError("disk full")
+        with tempfile.TemporaryDirectory() as directory:
+            video_data = {'video_dir': directory, 'display': False,
+                          'composition': None, 'queue_size': 4}
+            graphics = Graphics({'size': (120, 200), 'shift': 0,
+                                 'scale': None}, video_data,
+                                {'csv_dir': None},
+                                {'sample_time': 0.5, 'time_units': 's'})
+            graphics.video.write = fail
+            errors = []
+
+            def draw():
+                try:
+                    for n in range(20):
+                        graphics.draw(stair, structure, n)
+                except OSError as error:
+                    errors.append(error)
+            thread = threading.Thread(target=draw, daemon=True)
+            thread.start()
+            thread.join(10.0)
+            self.assertFalse(thread.is_alive())
+            self.assertEqual(len(errors), 1)
+            with self.assertRaises(OSError):
+                graphics.close()
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()